@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AppRttmConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_rttm'
+
+    def ready(self):
+        from . import views  # noqa: F401 - view lar bog'liq modellarini ro'yxatdan o'tkazadi
+        from .response_cache import connect_invalidation_signals
+
+        connect_invalidation_signals()
@@ -0,0 +1,174 @@
+"""
+Auth natijalari uchun ikki darajali cache:
+- L1: har bir worker (process) ichidagi kichik LRU
+- L2: barcha gunicorn worker lar uchun umumiy cache (settings.CACHES dagi alias)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional
+
+from django.core.cache import caches
+
+_MISSING = object()
+
+
+class CacheEntry(NamedTuple):
+    """
+    Cache dagi auth natijasi: stale_at (soft TTL) dan keyin fonda yangilanadi,
+    expires_at (hard TTL) dan keyin faqat auth API ishlamay qolganda qaytariladi
+    """
+    data: Any
+    stale_at: float
+    expires_at: float = float('inf')
+
+    def is_stale(self) -> bool:
+        return time.time() >= self.stale_at
+
+    def is_expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+
+class LocalLRUCache:
+    """
+    Process ichidagi thread-safe LRU cache (har bir yozuv TTL bilan)
+    """
+
+    def __init__(self, max_size: int = 1024, timeout: float = 30):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, timeout: Optional[float] = None):
+        if self.max_size <= 0:
+            return
+        # L1 dagi yozuv hech qachon L2 dagidan uzoq yashamasligi kerak
+        if timeout is None or timeout > self.timeout:
+            timeout = self.timeout
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + timeout)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TwoLevelCache:
+    """
+    L1 (LocalLRUCache) + L2 (Django cache alias) kombinatsiyasi.
+    Bitta worker tekshirgan token natijasi L2 orqali qolgan worker larga ham yetib boradi.
+    """
+
+    def __init__(self, alias: str = 'default', local_size: int = 1024, local_timeout: float = 30):
+        self.alias = alias
+        self.local = LocalLRUCache(max_size=local_size, timeout=local_timeout)
+        self.stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+
+    @property
+    def shared(self):
+        # caches[alias] har bir thread uchun alohida connection qaytaradi
+        return caches[self.alias]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            self.stats['local_hits'] += 1
+            return value
+
+        value = self.shared.get(key, _MISSING)
+        if value is _MISSING:
+            self.stats['misses'] += 1
+            return default
+
+        self.stats['shared_hits'] += 1
+        self.local.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any, timeout: Optional[float] = None):
+        self.shared.set(key, value, timeout)
+        self.local.set(key, value, timeout)
+
+    def delete(self, key: str):
+        self.local.delete(key)
+        self.shared.delete(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Cache statistikasi (counter lar taxminiy - lock siz yangilanadi)
+        """
+        stats = dict(self.stats)
+        stats['local_size'] = len(self.local)
+        stats['alias'] = self.alias
+        return stats
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Bir xil kalit uchun parallel chaqiruvlarni bitta chaqiruvga birlashtirish.
+    Birinchi thread (leader) funksiyani bajaradi, qolganlari uning natijasini kutadi.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        return len(self._calls)
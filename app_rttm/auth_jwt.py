@@ -0,0 +1,180 @@
+"""
+JWT tokenlarni auth API ga murojaat qilmasdan (offline) tekshirish.
+Issuer ning ochiq kalitlari (JWKS) bir marta olinib, cache da saqlanadi.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import jwt
+except ImportError:  # PyJWT o'rnatilmagan - faqat online tekshiruv ishlaydi
+    jwt = None
+
+logger = logging.getLogger(__name__)
+
+JWKS_CACHE_KEY = "auth_jwks"
+
+
+class TokenRejected(Exception):
+    """
+    Token lokal tekshiruvda rad etildi (imzo noto'g'ri, muddati o'tgan va h.k.)
+    """
+
+
+class JWTVerifier:
+    """
+    JWT imzosi, muddati va claim larini process ichida tekshirish
+    """
+
+    def __init__(self, jwks_url: str, http_get: Callable, cache, algorithms=None, issuer: str = None,
+                 audience: str = None, leeway: int = 30, jwks_cache_timeout: int = 3600,
+                 jwks_min_refresh: int = 60, enabled: bool = True):
+        self.jwks_url = jwks_url
+        self.http_get = http_get
+        self.cache = cache
+        self.algorithms = list(algorithms or ['RS256'])
+        self.issuer = issuer
+        self.audience = audience
+        self.leeway = leeway
+        self.jwks_cache_timeout = jwks_cache_timeout
+        self.jwks_min_refresh = jwks_min_refresh
+        self.enabled = enabled and jwt is not None
+
+        self._keys: Dict[str, Any] = {}
+        self._keys_expire_at = 0.0
+        self._last_fetch = 0.0
+        self._lock = threading.Lock()
+
+        if enabled and jwt is None:
+            logger.warning("AUTH_JWT_VERIFY yoqilgan, lekin PyJWT o'rnatilmagan - online tekshiruv ishlatiladi")
+
+    def _load_keys(self, jwks: Dict[str, Any]) -> Dict[str, Any]:
+        keys = {}
+        for jwk in jwks.get('keys', []):
+            if not isinstance(jwk, dict):
+                logger.warning("JWKS dagi kalit obyekt emas - o'tkazib yuborildi")
+                continue
+            try:
+                key = jwt.PyJWK(jwk)
+            except jwt.PyJWTError as e:
+                logger.warning(f"JWKS dagi kalit o'qilmadi: {e}")
+                continue
+            keys[jwk.get('kid')] = key
+        return keys
+
+    def _fetch_jwks(self) -> Optional[Dict[str, Any]]:
+        try:
+            response = self.http_get(self.jwks_url)
+        except Exception as e:
+            logger.error(f"JWKS olishda xatolik: {e}")
+            return None
+        if response.status_code != 200:
+            logger.warning(f"JWKS olinmadi: {response.status_code}")
+            return None
+        try:
+            jwks = response.json()
+        except ValueError as e:
+            logger.error(f"JWKS javobi JSON emas: {e}")
+            return None
+        if not isinstance(jwks, dict) or not isinstance(jwks.get('keys'), list):
+            # Noto'g'ri JWKS - lokal tekshiruv o'rniga online (/my-role) tekshiruv ishlatiladi
+            logger.error("JWKS javobida 'keys' ro'yxati yo'q")
+            return None
+        return jwks
+
+    def get_keys(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Imzo kalitlarini olish: process xotirasi -> umumiy cache -> JWKS endpoint
+        """
+        now = time.monotonic()
+        if not force and self._keys and now < self._keys_expire_at:
+            return self._keys
+
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._keys and now < self._keys_expire_at:
+                return self._keys
+
+            jwks = None if force else self.cache.get(JWKS_CACHE_KEY)
+            if jwks is None:
+                # Noma'lum kid bilan kelgan token lar JWKS endpoint ni zo'riqtirmasligi uchun
+                if force and now - self._last_fetch < self.jwks_min_refresh:
+                    return self._keys
+                self._last_fetch = now
+                jwks = self._fetch_jwks()
+                if jwks is None:
+                    return self._keys
+                self.cache.set(JWKS_CACHE_KEY, jwks, self.jwks_cache_timeout)
+
+            self._keys = self._load_keys(jwks)
+            self._keys_expire_at = now + self.jwks_cache_timeout
+            return self._keys
+
+    def _get_signing_key(self, token: str):
+        header = jwt.get_unverified_header(token)
+        kid = header.get('kid')
+        keys = self.get_keys()
+        if kid not in keys and (kid is not None or not keys):
+            keys = self.get_keys(force=True)
+        if kid in keys:
+            return keys[kid]
+        if kid is None and len(keys) == 1:
+            return next(iter(keys.values()))
+        return None
+
+    def verify(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Tokenni lokal tekshirish.
+        Returns: claim lar (dict), None - lokal tekshirib bo'lmaydi (online tekshiruv kerak).
+        Raises: TokenRejected - token aniq yaroqsiz.
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            signing_key = self._get_signing_key(token)
+        except jwt.DecodeError:
+            # JWT emas (masalan, opaque token) - online tekshiruvga qoldiramiz
+            return None
+        if signing_key is None:
+            logger.warning("JWT imzo kaliti topilmadi - online tekshiruv ishlatiladi")
+            return None
+
+        options = {'require': ['exp'], 'verify_aud': self.audience is not None}
+        try:
+            return jwt.decode(
+                token,
+                key=signing_key.key,
+                algorithms=self.algorithms,
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.leeway,
+                options=options,
+            )
+        except jwt.ExpiredSignatureError:
+            raise TokenRejected("Token muddati o'tgan")
+        except jwt.InvalidTokenError as e:
+            raise TokenRejected(str(e))
+
+
+def claims_to_user_data(claims: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    JWT claim laridan /api/auth/my-role javobi bilan bir xil formatdagi dict yasash.
+    Kerakli claim lar yo'q bo'lsa None qaytaradi (role endpoint ga fallback).
+    """
+    role = claims.get('role')
+    user_id = claims.get('userId') or claims.get('id') or claims.get('sub')
+    username = claims.get('username') or claims.get('preferred_username')
+    if not role or user_id is None or not username:
+        return None
+
+    return {
+        'userId': user_id,
+        'username': username,
+        'email': claims.get('email', ''),
+        'role': role,
+        'permissions': claims.get('permissions', []),
+    }
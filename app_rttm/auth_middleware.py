@@ -2,6 +2,8 @@ import logging
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 from .auth_service import auth_service
+from .principal import AuthPrincipal, get_access_token, set_principal
+from .role_permissions import ADMIN_ROLES
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +31,7 @@ class AuthMiddleware(MiddlewareMixin):
             return None
 
         # Access token ni olish
-        access_token = self._get_access_token(request)
+        access_token = get_access_token(request)
 
         if not access_token:
             logger.warning(f"Access token topilmadi: {request.path}")
@@ -48,38 +50,20 @@ class AuthMiddleware(MiddlewareMixin):
                 'message': 'Token noto\'g\'ri yoki muddati o\'tgan'
             }, status=401)
 
-        # Request ga ma'lumotlarni qo'shish
-        request.auth_user_id = user_role_data.get('userId') or user_role_data.get('id')
-        request.auth_username = user_role_data.get('username', 'Unknown')
-        request.auth_email = user_role_data.get('email', '')
-        request.auth_role = user_role_data.get('role', '').lower()
-        request.auth_permissions = user_role_data.get('permissions', [])
+        # Principal bir marta yasaladi - permission class lar va Main.save shuni o'qiydi
+        principal = AuthPrincipal.from_user_data(user_role_data, access_token)
+        set_principal(request, principal)
+
+        # Eski kod bilan moslik uchun (auth_role, auth_username va h.k.)
+        request.auth_user_id = principal.id
+        request.auth_username = principal.username
+        request.auth_email = principal.email
+        request.auth_role = principal.role
+        request.auth_permissions = principal.permissions
         request.access_token = access_token
         request.auth_user_data = user_role_data  # To'liq ma'lumot
 
-        logger.info(f"Auth middleware: User authenticated - {request.auth_username} (Role: {request.auth_role})")
-        return None
-
-    def _get_access_token(self, request):
-        """
-        Access token ni olish - header yoki parameter dan
-        """
-        # Authorization header dan olish
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        if auth_header.startswith('Bearer '):
-            return auth_header[7:]  # "Bearer " ni olib tashlash
-
-        # Query parameter dan olish
-        access_token = request.GET.get('access_token')
-        if access_token:
-            return access_token
-
-        # POST data dan olish
-        if hasattr(request, 'data') and isinstance(request.data, dict):
-            access_token = request.data.get('access_token')
-            if access_token:
-                return access_token
-
+        logger.info(f"Auth middleware: User authenticated - {principal.username} (Role: {principal.role})")
         return None
 
 
@@ -93,19 +77,20 @@ class RolePermissionMiddleware(MiddlewareMixin):
         Role permission tekshirish
         """
         # Auth middleware dan keyin ishlaydi
-        if not hasattr(request, 'auth_role'):
+        principal = getattr(request, 'auth_principal', None)
+        if principal is None:
             return None
 
         # Admin va creator uchun barcha endpoint lar ochiq
-        if request.auth_role in ['admin', 'creator', 'creater']:
-            logger.info(f"Admin/Creator user: {request.auth_username} - Full access granted")
+        if principal.role in ADMIN_ROLES:
+            logger.info(f"Admin/Creator user: {principal.username} - Full access granted")
             return None
 
         # Boshqa role lar uchun cheklovlar
-        if request.auth_role == 'user':
+        if principal.role == 'user':
             # Faqat o'qish ruxsati
             if request.method not in ['GET', 'HEAD', 'OPTIONS']:
-                logger.warning(f"User {request.auth_username} tried to {request.method} {request.path}")
+                logger.warning(f"User {principal.username} tried to {request.method} {request.path}")
                 return JsonResponse({
                     'error': 'Permission denied',
                     'message': 'Sizda faqat o\'qish ruxsati bor'
@@ -1,10 +1,18 @@
 import requests
 import logging
 import hashlib
+import os
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Optional, Dict, Any
 from django.conf import settings
-from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+from .auth_cache import CacheEntry, LocalLRUCache, SingleFlight, TwoLevelCache
+from .circuit_breaker import CircuitBreaker
+from .role_permissions import ADMIN_ROLES
+from .auth_jwt import JWTVerifier, TokenRejected, claims_to_user_data
 
 logger = logging.getLogger(__name__)
 
@@ -17,16 +25,325 @@ class AuthService:
     def __init__(self):
         self.auth_base_url = getattr(settings, 'AUTH_BASE_URL', 'https://auth.uzswlu.uz')
         self.timeout = getattr(settings, 'AUTH_TIMEOUT', 10)
-        self.cache_timeout = getattr(settings, 'AUTH_CACHE_TIMEOUT', 300)  # 5 minut
+        self.cache_timeout = getattr(settings, 'AUTH_CACHE_TIMEOUT', 300)  # 5 minut (hard TTL)
+        # Soft TTL dan keyin cache dagi natija darhol qaytariladi va fonda yangilanadi
+        self.cache_soft_timeout = getattr(settings, 'AUTH_CACHE_SOFT_TIMEOUT', int(self.cache_timeout * 0.8))
+        self.refresh_workers = getattr(settings, 'AUTH_REFRESH_WORKERS', 2)
+        self._executors = {}
+        self._executors_pid = None
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
         self.max_retries = 3
+        # Bitta auth tekshiruviga (barcha retry lar bilan) ajratilgan umumiy vaqt (soniya)
+        self.deadline = getattr(settings, 'AUTH_DEADLINE', 5)
+        self.retry_backoff = getattr(settings, 'AUTH_RETRY_BACKOFF', 0.1)
+        # Hard TTL dan keyin ham shuncha vaqt eski natija saqlanadi - auth API ishlamasa qaytariladi
+        self.stale_if_error = getattr(settings, 'AUTH_CACHE_STALE_IF_ERROR', 300)
+
+        # Hedged so'rov: /me javobi AUTH_HEDGE_DELAY ichida kelmasa role endpoint ham so'raladi (0 - darhol)
+        self.hedge_enabled = getattr(settings, 'AUTH_HEDGE_ENABLED', False)
+        self.hedge_delay = getattr(settings, 'AUTH_HEDGE_DELAY', 0.3)
+        self.hedge_workers = getattr(settings, 'AUTH_HEDGE_WORKERS', 4)
+
+        # Ulanish va javob o'qish timeout lari alohida (connect, read)
+        self.connect_timeout = getattr(settings, 'AUTH_CONNECT_TIMEOUT', min(3, self.timeout))
+        self.read_timeout = getattr(settings, 'AUTH_READ_TIMEOUT', self.timeout)
+
+        # Keep-alive connection pool sozlamalari
+        self.pool_connections = getattr(settings, 'AUTH_POOL_CONNECTIONS', 4)
+        self.pool_maxsize = getattr(settings, 'AUTH_POOL_MAXSIZE', 10)
+        self._session = None
+        self._session_pid = None
+        self._session_lock = threading.Lock()
+        self.request_count = 0
+
+        # L1 (worker ichidagi LRU) + L2 (barcha worker lar uchun umumiy cache)
+        cache_alias = getattr(settings, 'AUTH_CACHE_ALIAS', 'default')
+        if cache_alias not in settings.CACHES:
+            cache_alias = 'default'
+        self.cache = TwoLevelCache(
+            alias=cache_alias,
+            local_size=getattr(settings, 'AUTH_LOCAL_CACHE_SIZE', 1024),
+            local_timeout=getattr(settings, 'AUTH_LOCAL_CACHE_TIMEOUT', 30),
+        )
+
+        # Auth API ishlamay qolsa worker larni band qilmaslik uchun (holat barcha worker lar uchun umumiy)
+        self.circuit_breaker = CircuitBreaker(
+            'auth_api',
+            cache_alias=cache_alias,
+            failure_threshold=getattr(settings, 'AUTH_CIRCUIT_FAILURE_THRESHOLD', 5),
+            recovery_timeout=getattr(settings, 'AUTH_CIRCUIT_RECOVERY_TIMEOUT', 30),
+            failure_window=getattr(settings, 'AUTH_CIRCUIT_FAILURE_WINDOW', 60),
+            probe_timeout=int(self.deadline) + 1,
+        )
+
+        # Rad etilgan token lar: qisqa muddatli negative cache (L2) + worker ichidagi LRU (L1)
+        self.negative_cache_timeout = getattr(settings, 'AUTH_NEGATIVE_CACHE_TIMEOUT', 30)
+        self.rejected_tokens = LocalLRUCache(
+            max_size=getattr(settings, 'AUTH_REJECTED_TOKENS_SIZE', 4096),
+            timeout=self.negative_cache_timeout,
+        )
+
+        # Bir token uchun bir vaqtda faqat bitta upstream so'rov (thread va worker lar orasida)
+        self.single_flight = SingleFlight()
+        self.single_flight_wait = getattr(settings, 'AUTH_SINGLE_FLIGHT_WAIT', self.deadline)
+        self.single_flight_poll_interval = getattr(settings, 'AUTH_SINGLE_FLIGHT_POLL_INTERVAL', 0.05)
+
+        # JWT larni lokal tekshirish (JWKS cache bilan) - auth API ga murojaatsiz
+        self.jwt_verifier = JWTVerifier(
+            jwks_url=getattr(settings, 'AUTH_JWKS_URL', None) or f"{self.auth_base_url}/.well-known/jwks.json",
+            http_get=lambda url: self.session.get(url, timeout=(self.connect_timeout, self.read_timeout)),
+            cache=self.cache,
+            algorithms=getattr(settings, 'AUTH_JWT_ALGORITHMS', ['RS256']),
+            issuer=getattr(settings, 'AUTH_JWT_ISSUER', None),
+            audience=getattr(settings, 'AUTH_JWT_AUDIENCE', None),
+            leeway=getattr(settings, 'AUTH_JWT_LEEWAY', 30),
+            jwks_cache_timeout=getattr(settings, 'AUTH_JWKS_CACHE_TIMEOUT', 3600),
+            enabled=getattr(settings, 'AUTH_JWT_VERIFY', False),
+        )
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        Process uchun bitta keep-alive session (fork dan keyin qayta yaratiladi)
+        """
+        pid = os.getpid()
+        if self._session is None or self._session_pid != pid:
+            with self._session_lock:
+                if self._session is None or self._session_pid != pid:
+                    session = requests.Session()
+                    # Retry larni o'zimiz boshqaramiz - adapter darajasida retry yo'q
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_connections,
+                        pool_maxsize=self.pool_maxsize,
+                        max_retries=0,
+                    )
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+                    self._session_pid = pid
+        return self._session
+
+    def _http_get(self, path: str, access_token: str, timeout=None) -> requests.Response:
+        """
+        Auth API ga pool dagi connection orqali GET so'rov yuborish
+        """
+        headers = {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+        self.request_count += 1
+        return self.session.get(
+            f"{self.auth_base_url}{path}",
+            headers=headers,
+            timeout=timeout or (self.connect_timeout, self.read_timeout)
+        )
+
+    def _call_auth_api(self, path: str, access_token: str, deadline: float = None) -> Optional[requests.Response]:
+        """
+        Auth API ga so'rov: retry lar umumiy deadline ichida, circuit breaker ochiq bo'lsa darhol None.
+        None - servis mavjud emas (timeout, connection error, 5xx, JSON bo'lmagan 200 yoki breaker ochiq).
+        Qaytgan 200 javobning tanasi doim JSON obyekt
+        """
+        if deadline is None:
+            deadline = time.monotonic() + self.deadline
+
+        for attempt in range(self.max_retries):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.error(f"Auth API: deadline tugadi ({path})")
+                return None
+            if not self.circuit_breaker.allow_request():
+                logger.warning(f"Auth API: circuit breaker ochiq - so'rov yuborilmadi ({path})")
+                return None
+
+            try:
+                response = self._http_get(path, access_token, timeout=(
+                    min(self.connect_timeout, remaining),
+                    min(self.read_timeout, remaining),
+                ))
+            except requests.exceptions.Timeout:
+                logger.error(f"Auth API timeout (attempt {attempt + 1}/{self.max_retries})")
+                self.circuit_breaker.record_failure()
+            except requests.exceptions.ConnectionError:
+                logger.error(f"Auth API connection error (attempt {attempt + 1}/{self.max_retries})")
+                self.circuit_breaker.record_failure()
+            except Exception as e:
+                logger.error(f"Auth API so'rovida kutilmagan xatolik: {e}")
+                return None
+            else:
+                if response.status_code >= 500:
+                    logger.warning(f"Auth API xatosi: {response.status_code} (attempt {attempt + 1}/{self.max_retries})")
+                    self.circuit_breaker.record_failure()
+                elif response.status_code == 200 and not self._has_json_payload(response):
+                    # Masalan proxy ning HTML xato sahifasi - servis xatosi kabi hisoblanadi
+                    logger.error(f"Auth API noto'g'ri javob qaytardi ({path}, attempt {attempt + 1}/{self.max_retries}): "
+                                 f"{response.text[:200]}")
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.record_success()
+                    return response
+
+            # Qisqa backoff - faqat deadline ichida qolgan vaqt doirasida
+            if attempt < self.max_retries - 1:
+                time.sleep(max(min(self.retry_backoff * (attempt + 1), deadline - time.monotonic()), 0))
+
+        return None
+
+    @staticmethod
+    def _has_json_payload(response: requests.Response) -> bool:
+        try:
+            return isinstance(response.json(), dict)
+        except ValueError:
+            return False
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        Connection pool statistikasi: ochilgan connection lar va qayta ishlatilganlar soni
+        """
+        stats = {'requests': self.request_count, 'connections': 0, 'pool_requests': 0, 'reused': 0}
+        if self._session is None:
+            return stats
+        for adapter in set(self._session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                stats['connections'] += pool.num_connections
+                stats['pool_requests'] += pool.num_requests
+        stats['reused'] = max(stats['pool_requests'] - stats['connections'], 0)
+        return stats
+
+    def _get_executor(self, name: str, max_workers: int) -> ThreadPoolExecutor:
+        """
+        Nomlangan thread pool (har bir process uchun alohida - fork dan keyin qayta yaratiladi)
+        """
+        pid = os.getpid()
+        executor = self._executors.get(name)
+        if executor is None or self._executors_pid != pid:
+            with self._refresh_lock:
+                if self._executors_pid != pid:
+                    self._executors = {}
+                    self._refreshing = set()
+                    self._executors_pid = pid
+                executor = self._executors.get(name)
+                if executor is None:
+                    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'auth-{name}')
+                    self._executors[name] = executor
+        return executor
+
+    @property
+    def refresh_executor(self) -> ThreadPoolExecutor:
+        """
+        Fondagi yangilashlar uchun thread pool
+        """
+        return self._get_executor('refresh', self.refresh_workers)
 
-    def _get_cache_key(self, prefix: str, access_token: str) -> str:
+    @property
+    def hedge_executor(self) -> ThreadPoolExecutor:
+        """
+        Hedged so'rovlar uchun kichik thread pool
+        """
+        return self._get_executor('hedge', self.hedge_workers)
+
+    def _store(self, cache_key: str, data: Dict[str, Any], timeout: int = None, stale_if_error: bool = True,
+               revalidate: bool = True):
+        """
+        Natijani soft/hard TTL bilan cache ga yozish.
+        stale_if_error - hard TTL dan keyin ham auth API ishlamasa qaytarish uchun saqlab turish
+        revalidate - soft TTL dan keyin fonda auth API dan yangilash (lokal tekshirilgan JWT uchun kerak emas)
+        """
+        timeout = self.cache_timeout if timeout is None else timeout
+        now = time.time()
+        stale_at = now + min(self.cache_soft_timeout, timeout) if revalidate else now + timeout
+        entry = CacheEntry(data, stale_at, now + timeout)
+        grace = self.stale_if_error if stale_if_error else 0
+        self.cache.set(cache_key, entry, timeout + grace)
+
+    def _get_cached(self, cache_key: str, refresh) -> Optional[Dict[str, Any]]:
+        """
+        Cache dan natija olish; soft TTL o'tgan bo'lsa fonda yangilashni boshlash
+        """
+        entry = self.cache.get(cache_key)
+        if not isinstance(entry, CacheEntry) or entry.is_expired():
+            return None
+        if entry.is_stale():
+            self._schedule_refresh(cache_key, refresh)
+        return entry.data
+
+    def _get_stale(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Auth API mavjud bo'lmaganda hard TTL o'tgan bo'lsa ham cache dagi natijani qaytarish
+        """
+        entry = self.cache.get(cache_key)
+        if not isinstance(entry, CacheEntry):
+            return None
+        logger.warning("Auth API mavjud emas - cache dagi eskirgan natija ishlatildi")
+        return entry.data
+
+    def _schedule_refresh(self, cache_key: str, refresh):
+        """
+        Eskirgan yozuvni fonda yangilash - har bir kalit uchun faqat bitta worker va bitta thread
+        """
+        executor = self.refresh_executor
+        with self._refresh_lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+
+        refresh_lock_key = f"{cache_key}_refresh"
+        if not self.cache.shared.add(refresh_lock_key, os.getpid(), int(self.read_timeout) + 1):
+            # Boshqa worker allaqachon yangilayapti
+            with self._refresh_lock:
+                self._refreshing.discard(cache_key)
+            return
+
+        def run():
+            try:
+                refresh()
+            except Exception as e:
+                logger.error(f"Auth cache ni fonda yangilashda xatolik: {e}")
+            finally:
+                self.cache.shared.delete(refresh_lock_key)
+                with self._refresh_lock:
+                    self._refreshing.discard(cache_key)
+
+        executor.submit(run)
+
+    @staticmethod
+    def _hash_token(access_token: str) -> str:
+        return hashlib.sha256(access_token.encode()).hexdigest()[:16]
+
+    def _get_cache_key(self, prefix: str, access_token: str, token_hash: str = None) -> str:
         """
         Cache key ni xavfsiz tarzda hosil qilish (tokenni hash qilish)
         """
-        token_hash = hashlib.sha256(access_token.encode()).hexdigest()[:16]
+        token_hash = token_hash or self._hash_token(access_token)
         return f"{prefix}_{token_hash}"
 
+    def mark_rejected(self, token_hash: str):
+        """
+        Auth API rad etgan token ni qisqa muddatga eslab qolish (barcha worker lar uchun)
+        """
+        self.rejected_tokens.set(token_hash, True)
+        self.cache.shared.set(f"auth_rejected_{token_hash}", True, self.negative_cache_timeout)
+        # Fonda yangilash paytida rad etilgan bo'lsa - eski natija endi berilmasin
+        for prefix in ("auth_user_role", "auth_user_info"):
+            self.cache.delete(f"{prefix}_{token_hash}")
+
+    def is_token_rejected(self, access_token: str, token_hash: str = None) -> bool:
+        """
+        Token yaqinda rad etilganmi - avval worker xotirasi, keyin umumiy cache
+        """
+        token_hash = token_hash or self._hash_token(access_token)
+        if self.rejected_tokens.get(token_hash):
+            return True
+        if self.cache.shared.get(f"auth_rejected_{token_hash}"):
+            self.rejected_tokens.set(token_hash, True)
+            return True
+        return False
+
     def invalidate_cache(self, access_token: str):
         """
         Token uchun cache ni tozalash (logout da ishlatiladi)
@@ -36,74 +353,118 @@ class AuthService:
             self._get_cache_key("auth_user_info", access_token),
         ]
         for key in keys:
-            cache.delete(key)
+            self.cache.delete(key)
         logger.info("Cache tozalandi")
 
-    def get_current_user_role(self, access_token: str) -> Optional[Dict[str, Any]]:
+    def _coalesce(self, cache_key: str, fetch, token_hash: str):
+        """
+        Bir xil cache_key uchun parallel cache miss larni bitta upstream so'rovga birlashtirish
+        """
+        return self.single_flight.do(cache_key, lambda: self._fetch_with_shared_lock(cache_key, fetch, token_hash))
+
+    def _fetch_with_shared_lock(self, cache_key: str, fetch, token_hash: str):
+        """
+        Umumiy cache dagi lock orqali worker lar orasida coalescing (best-effort).
+        Lock ni olgan worker so'rov yuboradi, qolganlari natija cache ga tushishini kutadi.
+        """
+        shared = self.cache.shared
+        lock_key = f"{cache_key}_lock"
+        lock_timeout = int(self.single_flight_wait) + 1
+
+        if shared.add(lock_key, os.getpid(), lock_timeout):
+            try:
+                # Lock olinguncha boshqa worker natijani yozib qo'ygan bo'lishi mumkin
+                entry = shared.get(cache_key)
+                if isinstance(entry, CacheEntry) and not entry.is_stale():
+                    return entry.data
+                return fetch()
+            finally:
+                shared.delete(lock_key)
+
+        deadline = time.monotonic() + self.single_flight_wait
+        while time.monotonic() < deadline:
+            time.sleep(self.single_flight_poll_interval)
+            entry = shared.get(cache_key)
+            if isinstance(entry, CacheEntry) and not entry.is_stale():
+                logger.info("Boshqa worker natijasi cache dan olindi")
+                return entry.data
+            if not shared.has_key(lock_key):
+                if self.is_token_rejected(None, token_hash):
+                    return None
+                break
+
+        # Lock egasi natija qoldirmadi (401, xatolik) yoki kutish vaqti tugadi
+        return fetch()
+
+    def get_current_user_role(self, access_token: str, deadline: float = None) -> Optional[Dict[str, Any]]:
         """
-        Access token orqali user role olish (retry mexanizmi bilan)
+        Access token orqali user role olish.
+        deadline - time.monotonic() bo'yicha auth ga ajratilgan vaqt chegarasi
         """
         if not access_token:
             return None
 
+        token_hash = self._hash_token(access_token)
+
+        # Yaqinda rad etilgan token - auth API ga murojaatsiz rad etamiz
+        if self.rejected_tokens.get(token_hash):
+            return None
+
         # Cache dan tekshirish
-        cache_key = self._get_cache_key("auth_user_role", access_token)
-        cached_result = cache.get(cache_key)
+        cache_key = self._get_cache_key("auth_user_role", access_token, token_hash)
+        cached_result = self._get_cached(
+            cache_key, lambda: self._fetch_user_role(access_token, cache_key, token_hash)
+        )
         if cached_result is not None:
             logger.info(f"Cache dan user role olindi")
             return cached_result
 
-        # Retry mexanizmi
-        for attempt in range(self.max_retries):
-            try:
-                headers = {
-                    'Authorization': f'Bearer {access_token}',
-                    'Content-Type': 'application/json'
-                }
-
-                url = f"{self.auth_base_url}/api/auth/my-role"
-
-                response = requests.get(
-                    url,
-                    headers=headers,
-                    timeout=self.timeout
-                )
-
-                if response.status_code == 200:
-                    user_data = response.json()
-                    logger.info(f"Auth API dan user role olindi: {user_data.get('username', 'Unknown')}")
-
-                    # Cache ga saqlash
-                    cache.set(cache_key, user_data, self.cache_timeout)
-                    return user_data
-                elif response.status_code == 401:
-                    # Token noto'g'ri - retry qilmaslik
-                    logger.warning(f"Auth API: Unauthorized token")
-                    return None
-                else:
-                    logger.warning(f"Auth API xatosi: {response.status_code} - {response.text}")
-                    if attempt < self.max_retries - 1:
-                        time.sleep(0.5 * (attempt + 1))  # Exponential backoff
-                        continue
-                    return None
+        if self.is_token_rejected(access_token, token_hash):
+            return None
 
-            except requests.exceptions.Timeout:
-                logger.error(f"Auth API timeout (attempt {attempt + 1}/{self.max_retries})")
-                if attempt < self.max_retries - 1:
-                    time.sleep(0.5 * (attempt + 1))
-                    continue
-                return None
-            except requests.exceptions.ConnectionError:
-                logger.error(f"Auth API connection error (attempt {attempt + 1}/{self.max_retries})")
-                if attempt < self.max_retries - 1:
-                    time.sleep(1)
-                    continue
-                return None
-            except Exception as e:
-                logger.error(f"User role olishda kutilmagan xatolik: {e}")
+        if self.jwt_verifier.enabled:
+            try:
+                claims = self.jwt_verifier.verify(access_token)
+            except TokenRejected as e:
+                logger.warning(f"JWT lokal tekshiruvdan o'tmadi: {e}")
+                self.mark_rejected(token_hash)
                 return None
+            user_data = claims_to_user_data(claims) if claims else None
+            if user_data is not None:
+                # Cache yozuvi token muddatidan uzoq yashamasligi kerak. Fonda yangilash yo'q - muddat tugagach
+                # token yana lokal tekshiriladi (my-role ga murojaat qilinmaydi)
+                timeout = min(self.cache_timeout, max(int(claims['exp'] - time.time()), 1))
+                self._store(cache_key, user_data, timeout, stale_if_error=False, revalidate=False)
+                return user_data
+
+        return self._coalesce(
+            cache_key, lambda: self._fetch_user_role(access_token, cache_key, token_hash, deadline), token_hash
+        )
+
+    def _fetch_user_role(self, access_token: str, cache_key: str, token_hash: str,
+                         deadline: float = None) -> Optional[Dict[str, Any]]:
+        """
+        Auth API dan user role olish (deadline va circuit breaker bilan)
+        """
+        response = self._call_auth_api('/api/auth/my-role', access_token, deadline)
+        if response is None:
+            return self._get_stale(cache_key)
+
+        if response.status_code == 200:
+            user_data = response.json()
+            logger.info(f"Auth API dan user role olindi: {user_data.get('username', 'Unknown')}")
+
+            # Cache ga saqlash
+            self._store(cache_key, user_data)
+            return user_data
+        elif response.status_code == 401:
+            # Token noto'g'ri - retry qilmaslik
+            logger.warning(f"Auth API: Unauthorized token")
+            self.mark_rejected(token_hash)
+            return None
 
-        return None
+        logger.warning(f"Auth API xatosi: {response.status_code} - {response.text}")
+        return self._get_stale(cache_key)
 
     def verify_token(self, access_token: str) -> bool:
         """
@@ -124,71 +485,107 @@ class AuthService:
         if not access_token:
             return None
 
+        token_hash = self._hash_token(access_token)
+        if self.rejected_tokens.get(token_hash):
+            return None
+
         # Cache dan tekshirish
-        cache_key = self._get_cache_key("auth_user_info", access_token)
-        cached_result = cache.get(cache_key)
+        cache_key = self._get_cache_key("auth_user_info", access_token, token_hash)
+        cached_result = self._get_cached(
+            cache_key, lambda: self._fetch_user_info(access_token, cache_key, token_hash)
+        )
         if cached_result is not None:
             logger.info(f"Cache dan user info olindi")
             return cached_result
 
-        for attempt in range(self.max_retries):
-            try:
-                headers = {
-                    'Authorization': f'Bearer {access_token}',
-                    'Content-Type': 'application/json'
-                }
-
-                # To'g'ri URL - auth servisingizga qarab o'zgartiring
-                url = f"{self.auth_base_url}/api/auth/me"  # yoki /api/auth/current-user
-
-                response = requests.get(
-                    url,
-                    headers=headers,
-                    timeout=self.timeout
-                )
-
-                if response.status_code == 200:
-                    user_data = response.json()
-                    logger.info(f"Auth API dan user info olindi")
-
-                    # Cache ga saqlash
-                    cache.set(cache_key, user_data, self.cache_timeout)
-                    return user_data
-                elif response.status_code == 401:
-                    logger.warning(f"User info API: Unauthorized")
-                    return None
-                elif response.status_code == 404:
-                    # Endpoint mavjud emas - get_current_user_role dan ma'lumot olamiz
-                    logger.info("User info endpoint mavjud emas, role endpoint ishlatiladi")
-                    return self.get_current_user_role(access_token)
-                else:
-                    logger.warning(f"User info API xatosi: {response.status_code} - {response.text}")
-                    if attempt < self.max_retries - 1:
-                        time.sleep(0.5 * (attempt + 1))
-                        continue
-                    # Fallback - role endpoint ishlatish
-                    return self.get_current_user_role(access_token)
+        if self.is_token_rejected(access_token, token_hash):
+            return None
 
-            except requests.exceptions.Timeout:
-                logger.error(f"User info API timeout (attempt {attempt + 1}/{self.max_retries})")
-                if attempt < self.max_retries - 1:
-                    continue
-                # Fallback
-                return self.get_current_user_role(access_token)
-            except requests.exceptions.ConnectionError:
-                logger.error(f"User info API connection error (attempt {attempt + 1}/{self.max_retries})")
-                if attempt < self.max_retries - 1:
-                    time.sleep(1)
-                    continue
-                # Fallback
-                return self.get_current_user_role(access_token)
-            except Exception as e:
-                logger.error(f"User info olishda kutilmagan xatolik: {e}")
-                # Fallback
-                return self.get_current_user_role(access_token)
+        return self._coalesce(cache_key, lambda: self._fetch_user_info(access_token, cache_key, token_hash), token_hash)
+
+    def _fetch_me(self, access_token: str, cache_key: str, token_hash: str,
+                  deadline: float) -> Optional[Dict[str, Any]]:
+        """
+        /api/auth/me endpoint idan user info olish (muvaffaqiyatli bo'lsa cache ga yoziladi)
+        """
+        # To'g'ri URL - auth servisingizga qarab o'zgartiring
+        response = self._call_auth_api('/api/auth/me', access_token, deadline)  # yoki /api/auth/current-user
+        if response is None:
+            return None
+
+        if response.status_code == 200:
+            user_data = response.json()
+            logger.info(f"Auth API dan user info olindi")
+
+            # Cache ga saqlash
+            self._store(cache_key, user_data)
+            return user_data
+        elif response.status_code == 401:
+            logger.warning(f"User info API: Unauthorized")
+            self.mark_rejected(token_hash)
+        elif response.status_code == 404:
+            # Endpoint mavjud emas - get_current_user_role dan ma'lumot olamiz
+            logger.info("User info endpoint mavjud emas, role endpoint ishlatiladi")
+        else:
+            logger.warning(f"User info API xatosi: {response.status_code} - {response.text}")
+        return None
+
+    def _fetch_user_info(self, access_token: str, cache_key: str, token_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Auth API ning /me endpoint idan user info olish, bo'lmasa role endpoint ga fallback
+        """
+        # /me va role endpoint lari birgalikda bitta deadline ichida
+        deadline = time.monotonic() + self.deadline
+
+        if self.hedge_enabled:
+            return self._fetch_user_info_hedged(access_token, cache_key, token_hash, deadline)
+
+        user_data = self._fetch_me(access_token, cache_key, token_hash, deadline)
+        if user_data is not None:
+            return user_data
+        if self.rejected_tokens.get(token_hash):
+            return None
+
+        stale_result = self._get_stale(cache_key)
+        if stale_result is not None:
+            return stale_result
+
+        # Fallback - role endpoint ishlatish
+        return self.get_current_user_role(access_token, deadline=deadline)
+
+    def _fetch_user_info_hedged(self, access_token: str, cache_key: str, token_hash: str,
+                                deadline: float) -> Optional[Dict[str, Any]]:
+        """
+        Hedged so'rov: /me javobi AUTH_HEDGE_DELAY ichida kelmasa role endpoint ham parallel chaqiriladi,
+        birinchi kelgan yaroqli javob qaytariladi. Kechikkan so'rov fonda tugab, natijasini cache ga yozadi.
+        """
+        executor = self.hedge_executor
+        primary = executor.submit(self._fetch_me, access_token, cache_key, token_hash, deadline)
+        pending = {primary}
+
+        done, _ = wait(pending, timeout=self.hedge_delay)
+        if primary in done:
+            pending.discard(primary)
+            user_data = primary.result()
+            if user_data is not None or self.rejected_tokens.get(token_hash):
+                return user_data
+
+        logger.info("User info: role endpoint parallel so'raldi (hedge)")
+        pending.add(executor.submit(self.get_current_user_role, access_token, deadline))
+
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                user_data = future.result()
+                if user_data is not None:
+                    return user_data
+            if self.rejected_tokens.get(token_hash):
+                return None
 
-        # Agar barcha urinishlar muvaffaqiyatsiz bo'lsa
-        return self.get_current_user_role(access_token)
+        return self._get_stale(cache_key)
 
     def has_permission(self, access_token: str, required_roles: list = None) -> bool:
         """
@@ -208,11 +605,10 @@ class AuthService:
         user_role = user_role_data.get('role', '').lower()
         logger.info(f"User role: {user_role}, Required roles: {required_roles}")
 
-        # Admin va creator role larini tekshirish
-        allowed_roles = ['admin', 'creator', 'creater']  # creator va creater ikkalasini ham qo'llab-quvvatlash
+        # Admin va creator role lari har doim ruxsatga ega
         required_roles_lower = [role.lower() for role in required_roles]
 
-        return user_role in required_roles_lower or user_role in allowed_roles
+        return user_role in required_roles_lower or user_role in ADMIN_ROLES
 
 
 # Global instance
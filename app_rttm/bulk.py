@@ -0,0 +1,363 @@
+"""
+ViewSet lar uchun ommaviy (bulk) yozish: /<resource>/bulk/
+- POST   [{...}, ...]            - bulk_create
+- PATCH  [{"id": 1, ...}, ...]   - bulk_update (faqat berilgan maydonlar)
+- DELETE [1, 2, ...]             - bitta DELETE ... WHERE id IN (...)
+Validatsiya many=True serializer bilan bitta o'tishda: bog'langan obyektlar (PrimaryKeyRelatedField)
+va unique tekshiruvlari har bir qator uchun emas, butun paket uchun bitta so'rov bilan.
+?on_error=abort (standart) - birorta xato bo'lsa hech narsa yozilmaydi, skip - yaroqli qatorlar yoziladi.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import ProtectedError
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
+
+from .conditional import VersionConflict
+from .models import VersionedModel
+from .response_cache import invalidate_models
+from .serializers import BulkQuerySerializer
+
+ON_ERROR_ABORT = 'abort'
+ON_ERROR_SKIP = 'skip'
+
+
+def to_pk(model, value):
+    """
+    So'rovdagi ID ni model pk turiga keltirish, yaroqsiz bo'lsa None
+    """
+    if value is None or isinstance(value, (bool, dict, list)):
+        return None
+    try:
+        return model._meta.pk.to_python(value)
+    except DjangoValidationError:
+        return None
+
+
+def to_pks(model, values: Iterable) -> set:
+    return {pk for pk in (to_pk(model, value) for value in values) if pk is not None}
+
+
+class PrefetchedQuerySet:
+    """
+    PrimaryKeyRelatedField.queryset o'rniga: paketdagi barcha ID lar oldindan bitta so'rov bilan olingan,
+    field esa faqat .get(pk=...) ni chaqiradi
+    """
+
+    def __init__(self, model, objects: Dict[Any, Any]):
+        self.model = model
+        self.objects = objects
+
+    def get(self, pk):
+        key = to_pk(self.model, pk)
+        if key is None:
+            raise ValueError(pk)
+        try:
+            return self.objects[key]
+        except KeyError:
+            raise self.model.DoesNotExist from None
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    many=True validatsiya: xatoli qator qolganlarini to'xtatmaydi.
+    validated_data - [(qator indeksi, attrs), ...], xatolar - row_errors.
+    instances ({pk: obj}) berilsa (PATCH) har bir qator "id" bo'yicha o'z obyekti bilan tekshiriladi.
+    """
+
+    def __init__(self, *args, instances: Optional[Dict[Any, Any]] = None, **kwargs):
+        self.instances = instances
+        self.row_instances: Dict[int, Any] = {}
+        self.row_errors: Dict[int, Any] = {}
+        # Versiyasi mos kelmagan qatorlar: {indeks: joriy versiya}
+        self.conflicts: Dict[int, int] = {}
+        kwargs.setdefault('max_length', settings.API_BULK_MAX_ITEMS)
+        kwargs.setdefault('allow_empty', False)
+        super().__init__(*args, **kwargs)
+
+    def run_child_validation(self, data):
+        if self.instances is not None:
+            pk = data.get('id') if isinstance(data, dict) else None
+            instance = self.instances.get(to_pk(self.child.Meta.model, pk))
+            if instance is None:
+                raise serializers.ValidationError({'id': ["id majburiy" if pk is None else "Obyekt topilmadi"]})
+            self.child.instance = instance
+        self.child.initial_data = data
+        return super().run_child_validation(data)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list) or not data or len(data) > self.max_length:
+            # Ro'yxat / bo'sh / max_length xatolari ListSerializer dagidek
+            return super().to_internal_value(data)
+
+        valid = []
+        for index, item in enumerate(data):
+            try:
+                attrs = self.run_child_validation(item)
+            except serializers.ValidationError as exc:
+                self.row_errors[index] = serializers.as_serializer_error(exc)
+            else:
+                valid.append((index, attrs))
+                if self.instances is not None:
+                    self.row_instances[index] = self.child.instance
+        return valid
+
+    def add_error(self, index: int, field: str, message):
+        self.row_errors.setdefault(index, {}).setdefault(field, []).append(message)
+
+    def get_row_errors(self) -> List[Dict[str, Any]]:
+        errors = []
+        for index, detail in sorted(self.row_errors.items()):
+            item = {'row': index + 1, 'errors': detail}
+            if index in self.conflicts:
+                item['version'] = self.conflicts[index]
+            errors.append(item)
+        return errors
+
+    def prefetch_related_fields(self, rows):
+        """
+        Yoziladigan PrimaryKeyRelatedField lar: paketdagi ID lar bitta so'rov bilan (har bir qator uchun emas)
+        """
+        for name, field in self.child.fields.items():
+            if field.read_only or not isinstance(field, serializers.PrimaryKeyRelatedField):
+                continue
+            queryset = field.get_queryset()
+            ids = to_pks(queryset.model, (row.get(name) for row in rows if isinstance(row, dict)))
+            field.queryset = PrefetchedQuerySet(queryset.model, queryset.in_bulk(ids) if ids else {})
+
+    def detach_unique_validators(self) -> List[tuple]:
+        """
+        Har bir qator uchun so'rov yuboradigan UniqueValidator / UniqueTogetherValidator larni olib tashlash.
+        Natija: [(xato kaliti, (model maydonlari, ...)), ...] - check_unique uchun
+        """
+        checks = []
+        for field in self.child.fields.values():
+            if any(isinstance(validator, UniqueValidator) for validator in field.validators):
+                field.validators = [v for v in field.validators if not isinstance(v, UniqueValidator)]
+                checks.append((field.field_name, (field.source,)))
+        validators = self.child.validators
+        for validator in validators:
+            if isinstance(validator, UniqueTogetherValidator):
+                checks.append((api_settings.NON_FIELD_ERRORS_KEY, tuple(validator.fields)))
+        self.child.validators = [v for v in validators if not isinstance(v, UniqueTogetherValidator)]
+        return checks
+
+    def check_unique(self, checks: List[tuple]):
+        """
+        Unique maydonlar (va unique_together): paket ichida va bazada, har bir tekshiruv bitta so'rov
+        """
+        model = self.child.Meta.model
+
+        def value(index, attrs, source):
+            if source in attrs:
+                return getattr(attrs[source], 'pk', attrs[source])
+            # PATCH: maydon berilmagan - obyektdagi joriy qiymat
+            return getattr(self.row_instances[index], model._meta.get_field(source).attname)
+
+        for error_key, sources in checks:
+            keys = {}
+            for index, attrs in self.validated_data:
+                if not any(source in attrs for source in sources):
+                    continue
+                key = tuple(value(index, attrs, source) for source in sources)
+                if None not in key:
+                    keys[index] = key
+            if not keys:
+                continue
+
+            lookup = {f'{source}__in': {key[i] for key in keys.values()} for i, source in enumerate(sources)}
+            existing = {
+                tuple(row[1:]): row[0]
+                for row in model._default_manager.filter(**lookup).values_list('pk', *sources)
+            }
+            seen = {}
+            for index, key in keys.items():
+                instance = self.row_instances.get(index)
+                if key in seen:
+                    self.add_error(index, error_key, f"Paketda takrorlangan ({seen[key] + 1}-qator bilan)")
+                elif key in existing and (instance is None or existing[key] != instance.pk):
+                    self.add_error(index, error_key, "Bu qiymat allaqachon mavjud" if len(sources) == 1
+                                   else f"{', '.join(sources)} birikmasi allaqachon mavjud")
+                seen.setdefault(key, index)
+
+        self._drop_failed_rows()
+
+    def check_versions(self):
+        """
+        Qatorda "version" berilgan bo'lsa - obyektning joriy versiyasi bilan solishtirish (optimistic concurrency).
+        Obyektlar select_for_update bilan olingan - tekshiruvdan yozishgacha o'zgarmaydi.
+        """
+        version_field = serializers.IntegerField(min_value=1)
+        for index, attrs in self.validated_data:
+            expected = self.initial_data[index].get('version')
+            if expected is None:
+                continue
+            try:
+                expected = version_field.run_validation(expected)
+            except serializers.ValidationError as exc:
+                self.row_errors.setdefault(index, {})['version'] = exc.detail
+                continue
+            current = self.row_instances[index].version
+            if expected != current:
+                self.add_error(index, 'version', VersionConflict.default_detail)
+                self.conflicts[index] = current
+        self._drop_failed_rows()
+
+    def _drop_failed_rows(self):
+        self._validated_data = [(index, attrs) for index, attrs in self.validated_data
+                                if index not in self.row_errors]
+
+
+class BulkModelMixin:
+    """
+    ViewSet uchun /bulk/ action. Yozish bulk_create / bulk_update bilan, audit maydonlari
+    (created_by_*, updated_by_*, updated_at, version) paket uchun bir marta hisoblanadi.
+    Natija: {"created" | "updated" | "deleted": soni, "results": [...], "errors": [{"row", "errors"}]}
+    """
+
+    def get_bulk_serializer(self, rows, instances=None) -> BulkListSerializer:
+        context = self.get_serializer_context()
+        context['bulk'] = True
+        partial = instances is not None
+        child = self.get_serializer_class()(context=context, partial=partial)
+        serializer = BulkListSerializer(child=child, data=rows, context=context, partial=partial,
+                                        instances=instances)
+        serializer.prefetch_related_fields(rows if isinstance(rows, list) else [])
+        checks = serializer.detach_unique_validators()
+        serializer.is_valid(raise_exception=True)
+        serializer.check_unique(checks)
+        return serializer
+
+    def get_bulk_results(self, objects) -> list:
+        # Javob odatdagi serializer bilan - select_related li get_queryset dan bitta so'rov
+        saved = self.get_queryset().in_bulk([obj.pk for obj in objects])
+        return self.get_serializer([saved[obj.pk] for obj in objects if obj.pk in saved], many=True).data
+
+    def _bulk_response(self, key, objects, errors, success_status):
+        return Response(
+            {key: len(objects), 'results': self.get_bulk_results(objects) if objects else [], 'errors': errors},
+            status=success_status if objects else status.HTTP_400_BAD_REQUEST,
+        )
+
+    def bulk_create(self, request, on_error):
+        serializer = self.get_bulk_serializer(request.data)
+        errors = serializer.get_row_errors()
+        if errors and on_error == ON_ERROR_ABORT:
+            return Response({'created': 0, 'results': [], 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        model = self.queryset.model
+        # created_by_* / updated_by_* - AuditUserField.pre_save
+        objects = [model(**attrs) for _, attrs in serializer.validated_data]
+        if objects:
+            with transaction.atomic():
+                model._default_manager.bulk_create(objects, batch_size=settings.API_BULK_BATCH_SIZE)
+            # bulk_create signal chiqarmaydi
+            invalidate_models(model)
+        return self._bulk_response('created', objects, errors, status.HTTP_201_CREATED)
+
+    def bulk_update(self, request, on_error):
+        model = self.queryset.model
+        versioned = issubclass(model, VersionedModel)
+        rows = request.data if isinstance(request.data, list) else []
+        ids = to_pks(model, (row.get('id') for row in rows if isinstance(row, dict)))
+
+        with transaction.atomic():
+            queryset = self.get_queryset()
+            if versioned:
+                # Versiya tekshiruvidan bulk_update gacha qatorlarni boshqa so'rov o'zgartira olmaydi
+                queryset = queryset.select_for_update(of=('self',))
+            instances = queryset.in_bulk(ids) if ids else {}
+            serializer = self.get_bulk_serializer(request.data, instances=instances)
+            if versioned:
+                serializer.check_versions()
+            errors = serializer.get_row_errors()
+            if errors and on_error == ON_ERROR_ABORT:
+                return Response(
+                    {'updated': 0, 'results': [], 'errors': errors},
+                    status=status.HTTP_409_CONFLICT if serializer.conflicts else status.HTTP_400_BAD_REQUEST,
+                )
+
+            # updated_at va updated_by_* - AuditQuerySet.update (bulk_update uni chaqiradi)
+            fields = {'version'} if versioned else set()
+            objects = []
+            for index, attrs in serializer.validated_data:
+                instance = serializer.row_instances[index]
+                for name, value in attrs.items():
+                    setattr(instance, name, value)
+                fields.update(attrs)
+                if versioned:
+                    # Qator qulflangan - yangi versiya aniq ma'lum
+                    instance.version += 1
+                objects.append(instance)
+
+            if objects:
+                model._default_manager.bulk_update(objects, sorted(fields), batch_size=settings.API_BULK_BATCH_SIZE)
+                invalidate_models(model)
+
+        if not objects and serializer.conflicts:
+            return Response({'updated': 0, 'results': [], 'errors': errors}, status=status.HTTP_409_CONFLICT)
+        return self._bulk_response('updated', objects, errors, status.HTTP_200_OK)
+
+    def bulk_destroy(self, request, on_error):
+        values = request.data
+        if not isinstance(values, list) or not values or len(values) > settings.API_BULK_MAX_ITEMS:
+            raise serializers.ValidationError(
+                {'detail': f"1 dan {settings.API_BULK_MAX_ITEMS} tagacha ID dan iborat ro'yxat kutilgan"}
+            )
+
+        model = self.queryset.model
+        existing = set(self.get_queryset().filter(pk__in=to_pks(model, values)).values_list('pk', flat=True))
+        errors, found = [], []
+        for index, value in enumerate(values):
+            pk = to_pk(model, value)
+            if pk in existing:
+                found.append(pk)
+            else:
+                errors.append({'row': index + 1, 'errors': {'id': ["Obyekt topilmadi"]}})
+        if errors and on_error == ON_ERROR_ABORT:
+            return Response({'deleted': 0, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                _, deleted = model._default_manager.filter(pk__in=found).delete()
+        except ProtectedError as exc:
+            return Response(
+                {'detail': "Bog'langan yozuvlar bor - o'chirib bo'lmaydi",
+                 'protected': sorted({str(obj) for obj in exc.protected_objects})[:20]},
+                status=status.HTTP_409_CONFLICT,
+            )
+        count = deleted.get(model._meta.label, 0)
+        return Response({'deleted': count, 'errors': errors},
+                        status=status.HTTP_200_OK if count else status.HTTP_400_BAD_REQUEST)
+
+    @extend_schema(
+        summary="Ommaviy yaratish / yangilash / o'chirish",
+        description="POST - obyektlar ro'yxati, PATCH - id li obyektlar ro'yxati (faqat berilgan maydonlar; "
+                    "versiyali modellarda qatordagi version mos kelmasa - 409 / errors), "
+                    "DELETE - ID lar ro'yxati. on_error=abort - birorta xato bo'lsa hech narsa yozilmaydi, "
+                    "on_error=skip - yaroqli qatorlar yoziladi, xatolar 'errors' da (qator raqami bilan)",
+        parameters=[BulkQuerySerializer],
+        request={'application/json': {'type': 'array', 'items': {'type': 'object'}}},
+        responses={200: OpenApiTypes.OBJECT, 201: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT,
+                   409: OpenApiTypes.OBJECT},
+    )
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request):
+        query = BulkQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        on_error = query.validated_data['on_error']
+
+        if request.method == 'POST':
+            return self.bulk_create(request, on_error)
+        if request.method == 'PATCH':
+            return self.bulk_update(request, on_error)
+        return self.bulk_destroy(request, on_error)
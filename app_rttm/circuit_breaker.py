@@ -0,0 +1,96 @@
+"""
+Tashqi servis (auth API) uchun circuit breaker.
+Holat umumiy cache da saqlanadi - barcha gunicorn worker lar bir xil holatni ko'radi.
+
+Xatolar soni taxminiy (best-effort): DatabaseCache va FileBasedCache da incr() jarayonlar orasida atomar emas,
+parallel xatolarning bir qismi yo'qolishi mumkin - circuit chegaradan biroz kechroq ochiladi.
+Yagona half_open sinovi cache.add() ga tayanadi - DatabaseCache da atomar, FileBasedCache da best-effort.
+Ochiq/half_open holatining o'zi esa bitta kalit bilan saqlanadi va yo'qolmaydi.
+"""
+
+import logging
+import os
+import time
+
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    closed    - so'rovlar odatdagidek yuboriladi
+    open      - so'rovlar yuborilmaydi (fail fast), recovery_timeout kutiladi
+    half_open - bitta sinov so'rovi yuboriladi: muvaffaqiyatli bo'lsa closed, aks holda yana open.
+                Sinov muvaffaqiyatli bo'lmaguncha half_open saqlanadi - vaqt o'tishi bilan o'zi yopilmaydi
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, cache_alias: str = 'default', failure_threshold: int = 5,
+                 recovery_timeout: int = 30, failure_window: int = 60, probe_timeout: int = 10):
+        self.name = name
+        self.cache_alias = cache_alias
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failure_window = failure_window
+        # Sinov so'rovi shu vaqt ichida tugamasa boshqa worker yangi sinov yuborishi mumkin
+        self.probe_timeout = probe_timeout
+
+        self._failures_key = f"circuit_{name}_failures"
+        self._opened_key = f"circuit_{name}_opened_at"
+        self._probe_key = f"circuit_{name}_probe"
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def get_state(self) -> str:
+        opened_at = self.cache.get(self._opened_key)
+        if opened_at is None:
+            return self.CLOSED
+        if time.time() - opened_at < self.recovery_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow_request(self) -> bool:
+        """
+        So'rov yuborish mumkinmi. half_open holatda faqat bitta worker sinov so'rovini yuboradi
+        """
+        state = self.get_state()
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN:
+            return self.cache.add(self._probe_key, os.getpid(), self.probe_timeout)
+        return False
+
+    def record_success(self):
+        if self.cache.get(self._opened_key) is not None:
+            logger.info(f"Circuit '{self.name}' yopildi (servis tiklandi)")
+            self.cache.delete_many([self._opened_key, self._probe_key])
+        self.cache.delete(self._failures_key)
+
+    def record_failure(self):
+        if self.get_state() == self.HALF_OPEN:
+            # Sinov so'rovi muvaffaqiyatsiz - yana open
+            self._open()
+            return
+
+        self.cache.add(self._failures_key, 0, self.failure_window)
+        try:
+            failures = self.cache.incr(self._failures_key)
+        except ValueError:
+            # Kalit shu orada muddati o'tib ketdi
+            self.cache.set(self._failures_key, 1, self.failure_window)
+            failures = 1
+
+        if failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        logger.error(f"Circuit '{self.name}' ochildi - {self.recovery_timeout} soniya so'rov yuborilmaydi")
+        # Muddatsiz: opened_at faqat record_success() da o'chiriladi - sinovsiz closed ga qaytmaydi
+        self.cache.set(self._opened_key, time.time(), None)
+        self.cache.delete_many([self._failures_key, self._probe_key])
@@ -0,0 +1,176 @@
+"""
+ViewSet lar uchun shartli so'rovlar (conditional requests):
+- GET: ETag / Last-Modified yuboriladi, If-None-Match / If-Modified-Since mos kelsa 304 (serializer ishlamaydi)
+- PUT/PATCH/DELETE va detail action lar: If-Match / If-Unmodified-Since mos kelmasa 412
+- versiya ustuni bo'yicha shartli UPDATE muvaffaqiyatsiz bo'lsa 409 (VersionConflict)
+"""
+
+import hashlib
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag, urlencode
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .principal import get_principal
+from .response_cache import get_dependency_models, get_generations, register_dependent_view
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "Obyekt siz olgan versiyadan keyin o'zgargan (If-Match mos kelmadi)"
+    default_code = 'precondition_failed'
+
+
+class VersionConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Obyekt boshqa so'rov tomonidan o'zgartirildi - qayta o'qib, yana urinib ko'ring"
+    default_code = 'version_conflict'
+
+    def __init__(self, current_version: Optional[int] = None, detail=None, code=None):
+        super().__init__(detail, code)
+        if current_version is not None:
+            self.detail = {'detail': self.detail, 'version': current_version}
+
+
+def _make_etag(*parts) -> str:
+    return quote_etag(hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest())
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[int]:
+    return int(value.timestamp()) if value is not None else None
+
+
+class ConditionalGetMixin:
+    """
+    ETag/Last-Modified validator lari:
+    - list: filtrlangan queryset bo'yicha MAX(last_modified_field) + COUNT (bitta aggregate so'rov)
+      va bog'langan modellar generation lari (bir cache get_many).
+      ?cursor= rejimida hisoblanmaydi - keyset pagination COUNT dan qochish uchun ishlatiladi.
+    - detail: yozuvning pk + last_modified_field qiymati
+    Strong ETag bitta aniq javobni bildiradi: list da (va query parametrli detail da) query parametrlar
+    (sahifa, ?fields=, ordering ...) va role ham qo'shiladi
+    """
+    last_modified_field = 'updated_at'
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        register_dependent_view(cls, include_own_model=False)
+
+    def get_related_labels(self) -> List[str]:
+        """
+        Javobda ko'rinadigan bog'langan modellar (building_name, device_info ...) - o'z modelisiz
+        """
+        own_model = self.queryset.model
+        return sorted(
+            model._meta.label_lower for model in get_dependency_models(type(self)) if model is not own_model
+        )
+
+    def get_representation_parts(self) -> List[str]:
+        """
+        Javob ko'rinishini belgilaydigan qismlar: tartiblangan query parametrlar va role
+        """
+        principal = get_principal(self.request)
+        query = urlencode(sorted(self.request.query_params.lists()), doseq=True)
+        return [query, principal.role if principal else '']
+
+    def get_required_columns(self, queryset) -> List[str]:
+        columns = super().get_required_columns(queryset)
+        # ?fields= bilan only() qilinganda validator ustuni alohida so'rov bilan yuklanmasligi uchun
+        if self._has_last_modified_field():
+            columns.append(self.last_modified_field)
+        return columns
+
+    def _has_last_modified_field(self) -> bool:
+        model = self.queryset.model
+        return any(field.name == self.last_modified_field for field in model._meta.concrete_fields)
+
+    def get_list_validators(self, queryset) -> Tuple[str, Optional[int]]:
+        stats = queryset.order_by().aggregate(last_modified=Max(self.last_modified_field), count=Count('*'))
+        last_modified = stats['last_modified']
+        # Bog'langan modellar o'zgarishi (masalan, bino nomi) - generation token lari (response_cache) orqali
+        related = get_generations(self.get_related_labels())
+        etag = _make_etag(queryset.model._meta.label, stats['count'],
+                          last_modified.isoformat() if last_modified else '',
+                          *(f'{label}={token}' for label, token in related), *self.get_representation_parts())
+        # Last-Modified bog'langan modellar o'zgarishini ko'rsatmaydi - bunday ro'yxatlarda faqat ETag
+        return etag, None if related else _timestamp(last_modified)
+
+    def get_object_validators(self, instance, *representation) -> Tuple[str, Optional[int]]:
+        """
+        representation - retrieve dagi get_representation_parts(); If-Match tekshiruvi uchun bo'sh
+        """
+        last_modified = getattr(instance, self.last_modified_field)
+        etag = _make_etag(instance._meta.label, instance.pk, last_modified.isoformat() if last_modified else '',
+                          *representation)
+        return etag, _timestamp(last_modified)
+
+    def set_validator_headers(self, response, etag, last_modified):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # Auth talab qilinadi - faqat brauzer cache, har safar qayta tekshiriladi
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def _conditional_response(self, etag, last_modified):
+        not_modified = get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return self.set_validator_headers(not_modified, etag, last_modified)
+        return None
+
+    def _uses_cursor(self) -> bool:
+        paginator = self.paginator
+        return paginator is not None and hasattr(paginator, 'use_cursor') and paginator.use_cursor(self.request, self)
+
+    def list(self, request, *args, **kwargs):
+        if not self._has_last_modified_field() or self._uses_cursor():
+            return super().list(request, *args, **kwargs)
+
+        etag, last_modified = self.get_list_validators(self.filter_queryset(self.get_queryset()))
+        not_modified = self._conditional_response(etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return self.set_validator_headers(super().list(request, *args, **kwargs), etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self._has_last_modified_field():
+            return super().retrieve(request, *args, **kwargs)
+
+        instance = self.get_object()
+        # Query parametrsiz detail ETag i yozish so'rovlaridagi If-Match bilan bir xil
+        representation = self.get_representation_parts() if request.query_params else ()
+        etag, last_modified = self.get_object_validators(instance, *representation)
+        not_modified = self._conditional_response(etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(instance)
+        return self.set_validator_headers(Response(serializer.data), etag, last_modified)
+
+    def get_object(self):
+        instance = super().get_object()
+        # Yozish so'rovlari (update, destroy, move ...) - If-Match / If-Unmodified-Since tekshiruvi
+        if self.request.method not in SAFE_METHODS and self._has_last_modified_field():
+            etag, last_modified = self.get_object_validators(instance)
+            if get_conditional_response(self.request, etag=etag, last_modified=last_modified) is not None:
+                raise PreconditionFailed()
+        return instance
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self._updated_instance = serializer.instance
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        instance = getattr(self, '_updated_instance', None)
+        if instance is not None and self._has_last_modified_field():
+            # Yangi versiya ETag i (auto_now save() da yangilangan) - keyingi If-Match uchun
+            self.set_validator_headers(response, *self.get_object_validators(instance))
+        return response
+
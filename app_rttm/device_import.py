@@ -0,0 +1,183 @@
+"""
+Qurilmalarni ommaviy import qilish (JSON massiv yoki CSV fayl).
+Tekshiruvlar butun paket uchun to'plam (set) sifatida: inventar raqamlari, qurilma turlari,
+xonalar va mas'ul shaxslar - har biri bitta so'rov. Yozish bulk_create bilan, bitta tranzaksiyada.
+"""
+
+import csv
+import io
+import logging
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework import serializers
+
+from .models import Device, DeviceLocation, DeviceType, ResponsiblePerson, Room
+from .response_cache import invalidate_models
+from .serializers import DeviceImportRowSerializer
+
+logger = logging.getLogger(__name__)
+
+ON_ERROR_ABORT = 'abort'
+ON_ERROR_SKIP = 'skip'
+
+LOCATION_FIELDS = ('room', 'responsible_person', 'position_description')
+
+# Bir xil nomli bir nechta qurilma turi
+_AMBIGUOUS = object()
+
+
+class ImportConflict(Exception):
+    """Tekshiruvdan keyin parallel so'rov xuddi shu inventar raqamini yozib ulgurdi"""
+
+
+def read_rows(request) -> List[Dict[str, Any]]:
+    """
+    So'rovdan qatorlar: multipart `file` (CSV, birinchi qator - sarlavha) yoki JSON massiv
+    """
+    upload = request.FILES.get('file')
+    if upload is not None:
+        text = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        try:
+            # Bo'sh katakcha - qiymat berilmagan
+            return [
+                {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+                for row in csv.DictReader(text)
+            ]
+        except UnicodeDecodeError:
+            raise serializers.ValidationError({'file': "Fayl UTF-8 kodlashda bo'lishi kerak"})
+        except csv.Error as e:
+            raise serializers.ValidationError({'file': f"CSV formati noto'g'ri: {e}"})
+
+    data = request.data
+    if not isinstance(data, list):
+        raise serializers.ValidationError({'detail': "JSON massiv yoki CSV fayl (file) kutilgan"})
+    return data
+
+
+class DeviceImporter:
+    """
+    Bitta import paketi: validate() -> (yaroqli qatorlar, xatolar), save() -> yaratilgan qurilmalar
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]], create_locations: bool = True):
+        self.rows = rows
+        self.create_locations = create_locations
+        self.errors: Dict[int, Dict[str, Any]] = {}
+        self.valid: List[tuple] = []
+
+    def add_error(self, index: int, field: str, message):
+        self.errors.setdefault(index, {}).setdefault(field, []).append(message)
+
+    def validate(self):
+        if len(self.rows) > settings.DEVICE_IMPORT_MAX_ROWS:
+            raise serializers.ValidationError(
+                {'detail': f"Bir martada ko'pi bilan {settings.DEVICE_IMPORT_MAX_ROWS} ta qator import qilinadi"}
+            )
+
+        # 1. Har bir qator formati (bazaga murojaatsiz)
+        # Maydonlar bir marta quriladi (ListSerializer.to_internal_value kabi)
+        row_serializer = DeviceImportRowSerializer()
+        parsed = {}
+        for index, row in enumerate(self.rows):
+            try:
+                parsed[index] = row_serializer.run_validation(row)
+            except serializers.ValidationError as exc:
+                self.errors[index] = serializers.as_serializer_error(exc)
+
+        # 2. Paket ichida va bazada takrorlangan inventar raqamlari - bitta so'rov
+        seen = {}
+        for index, attrs in parsed.items():
+            number = attrs['inventory_number']
+            if number in seen:
+                self.add_error(index, 'inventory_number', f"Paketda takrorlangan ({seen[number] + 1}-qator bilan)")
+            else:
+                seen[number] = index
+        existing = set(
+            Device.objects.filter(inventory_number__in=list(seen)).values_list('inventory_number', flat=True)
+        )
+        for index, attrs in parsed.items():
+            if attrs['inventory_number'] in existing:
+                self.add_error(index, 'inventory_number', "Bu inventar raqam allaqachon mavjud")
+
+        # 3. Bog'langan obyektlar - har bir model uchun bitta so'rov
+        device_types = self._resolve_device_types(parsed)
+        rooms = self._fetch(Room, parsed, 'room')
+        responsibles = self._fetch(ResponsiblePerson, parsed, 'responsible_person')
+
+        for index, attrs in parsed.items():
+            device_type = device_types.get(attrs['device_type'])
+            if device_type is None:
+                self.add_error(index, 'device_type', "Qurilma turi topilmadi")
+            elif device_type is _AMBIGUOUS:
+                self.add_error(index, 'device_type', "Bu nomli qurilma turi bir nechta - ID ni ko'rsating")
+            if attrs.get('room') and attrs['room'] not in rooms:
+                self.add_error(index, 'room', "Xona topilmadi")
+            if attrs.get('responsible_person') and attrs['responsible_person'] not in responsibles:
+                self.add_error(index, 'responsible_person', "Mas'ul shaxs topilmadi")
+            if index not in self.errors:
+                self.valid.append((index, attrs, device_type))
+
+    def _resolve_device_types(self, parsed) -> Dict[str, Any]:
+        references = {attrs['device_type'] for attrs in parsed.values()}
+        ids = {int(value) for value in references if value.isdigit()}
+        names = references - {str(pk) for pk in ids}
+        resolved = {}
+        if not references:
+            return resolved
+        for device_type in DeviceType.objects.filter(Q(pk__in=ids) | Q(name__in=names)).only('id', 'name'):
+            if device_type.pk in ids:
+                resolved[str(device_type.pk)] = device_type
+            if device_type.name in names:
+                resolved[device_type.name] = _AMBIGUOUS if device_type.name in resolved else device_type
+        return resolved
+
+    @staticmethod
+    def _fetch(model, parsed, field) -> set:
+        ids = {attrs[field] for attrs in parsed.values() if attrs.get(field)}
+        return set(model.objects.filter(pk__in=ids).values_list('pk', flat=True)) if ids else set()
+
+    def get_errors(self) -> List[Dict[str, Any]]:
+        return [{'row': index + 1, 'errors': errors} for index, errors in sorted(self.errors.items())]
+
+    def save(self) -> List[tuple]:
+        """
+        Yaroqli qatorlarni yozish. Natija: [(qator indeksi, Device), ...]
+        """
+        if not self.valid:
+            return []
+
+        batch_size = settings.DEVICE_IMPORT_BATCH_SIZE
+        devices = []
+        for index, attrs, device_type in self.valid:
+            fields = {name: value for name, value in attrs.items() if name not in LOCATION_FIELDS}
+            fields['device_type'] = device_type
+            devices.append(Device(**fields))
+
+        try:
+            with transaction.atomic():
+                Device.objects.bulk_create(devices, batch_size=batch_size)
+                locations = [
+                    DeviceLocation(
+                        device=device,
+                        room_id=attrs['room'],
+                        responsible_person_id=attrs.get('responsible_person'),
+                        position_description=attrs.get('position_description') or None,
+                    )
+                    for (index, attrs, _), device in zip(self.valid, devices)
+                    if self.create_locations and attrs.get('room')
+                ]
+                if locations:
+                    DeviceLocation.objects.bulk_create(locations, batch_size=batch_size)
+        except IntegrityError as exc:
+            raise ImportConflict(str(exc)) from exc
+
+        # bulk_create signal chiqarmaydi
+        invalidate_models(Device, DeviceLocation)
+        # created_by_* / updated_by_* - AuditUserField.pre_save
+        logger.info(f"Device import: {len(devices)} ta qurilma, {len(locations)} ta joylashuv yaratildi "
+                    f"({devices[0].created_by_name or 'nomalum'})")
+        return [(index, device) for (index, _, _), device in zip(self.valid, devices)]
+
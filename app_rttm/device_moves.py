@@ -0,0 +1,192 @@
+"""
+Qurilmani ko'chirish va holatini o'zgartirish - tarix yozuvlari haqiqatga mos bo'lishi uchun.
+- bitta qurilma: versiya bo'yicha shartli UPDATE (UPDATE ... WHERE version = ?), qulf faqat
+  birinchi joylashtirishda (yangilanadigan qator hali yo'q)
+- bir nechta qurilma: qatorlar bir marta qulflanadi, DeviceLocation upsert (INSERT ... ON CONFLICT)
+  va DeviceLocationHistory bulk_create - so'rovlar soni qurilmalar soniga bog'liq emas
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from .conditional import VersionConflict
+from .models import Device, DeviceConditionHistory, DeviceLocation, DeviceLocationHistory
+from .response_cache import invalidate_models
+
+logger = logging.getLogger(__name__)
+
+
+def move_device(device, room, responsible_person=None, reason: str = '', moved_by=None,
+                expected_version: Optional[int] = None) -> DeviceLocation:
+    """
+    Qurilmani room ga ko'chirish. expected_version - mijoz ko'rgan joylashuv versiyasi (joylashuv yo'q bo'lsa 0).
+    Oradan boshqa so'rov joylashuvni o'zgartirgan bo'lsa VersionConflict (409).
+    """
+    with transaction.atomic():
+        location = DeviceLocation.objects.select_related('room').filter(device=device).first()
+        if location is None:
+            # UPDATE qiladigan qator yo'q - parallel birinchi joylashtirishlar qurilma qatori qulfi bilan ketma-ket
+            Device.objects.select_for_update().filter(pk=device.pk).values_list('pk').first()
+            location = DeviceLocation.objects.select_related('room').filter(device=device).first()
+
+        current_version = location.version if location else 0
+        if expected_version is not None and expected_version != current_version:
+            raise VersionConflict(current_version)
+
+        if location is None:
+            old_room = None
+            location = DeviceLocation.objects.create(device=device, room=room, responsible_person=responsible_person)
+        else:
+            old_room = location.room
+            now = timezone.now()
+            updated = DeviceLocation.objects.filter(pk=location.pk, version=current_version).update(
+                room=room,
+                responsible_person=responsible_person,
+                version=F('version') + 1,
+                updated_at=now,
+            )
+            if not updated:
+                raise VersionConflict()
+            location.room = room
+            location.responsible_person = responsible_person
+            location.version = current_version + 1
+            location.updated_at = now
+
+        DeviceLocationHistory.objects.create(
+            device=device,
+            old_building_id=old_room.building_id if old_room else None,
+            old_room=old_room,
+            new_building_id=room.building_id,
+            new_room=room,
+            moved_by=moved_by,
+            reason=reason,
+        )
+
+    # QuerySet.update signal chiqarmaydi
+    invalidate_models(DeviceLocation)
+    return location
+
+
+def change_device_condition(device, new_condition: str, reason: str = '', changed_by=None,
+                            expected_version: Optional[int] = None) -> DeviceConditionHistory:
+    """
+    Holatni faqat device o'qilgan versiyada bo'lsa o'zgartirish - old_condition har doim haqiqiy oldingi holat
+    """
+    current_version = device.version
+    if expected_version is not None and expected_version != current_version:
+        raise VersionConflict(current_version)
+
+    now = timezone.now()
+    with transaction.atomic():
+        updated = Device.objects.filter(pk=device.pk, version=current_version).update(
+            condition=new_condition,
+            version=F('version') + 1,
+            updated_at=now,
+        )
+        if not updated:
+            raise VersionConflict()
+        history = DeviceConditionHistory.objects.create(
+            device=device,
+            old_condition=device.condition,
+            new_condition=new_condition,
+            changed_by=changed_by,
+            reason=reason,
+        )
+
+    device.condition = new_condition
+    device.version = current_version + 1
+    device.updated_at = now
+    invalidate_models(Device)
+    return history
+
+
+def split_references(references: Iterable) -> tuple:
+    """
+    (ID lar, inventar raqamlari) - son ID, satr inventar raqami
+    """
+    ids, numbers = set(), set()
+    for reference in references:
+        (ids if isinstance(reference, int) else numbers).add(reference)
+    return ids, numbers
+
+
+def bulk_move_devices(references: List, room, responsible_person=None, reason: str = '',
+                      moved_by=None) -> Dict[str, Any]:
+    """
+    references dagi qurilmalarni room ga ko'chirish (birortasi topilmasa hech narsa o'zgarmaydi).
+    Allaqachon shu xona va mas'ul shaxsda turgan qurilmalar tarixga yozilmaydi.
+    """
+    ids, numbers = split_references(references)
+    responsible_id = responsible_person.pk if responsible_person else None
+
+    with transaction.atomic():
+        # ID tartibida qulflash - parallel bulk ko'chirishlar bir-birini deadlock qilmasligi uchun
+        devices = list(
+            Device.objects
+            .filter(Q(pk__in=ids) | Q(inventory_number__in=numbers))
+            .order_by('pk')
+            .select_for_update(of=('self',))
+            .values_list('pk', 'inventory_number')
+        )
+        found_ids = {pk for pk, _ in devices}
+        found_numbers = {number for _, number in devices}
+        not_found = [ref for ref in references if ref not in found_ids and ref not in found_numbers]
+        if not_found:
+            raise serializers.ValidationError({'devices': [f"Qurilma topilmadi: {ref}" for ref in not_found]})
+
+        # Joylashuv qatorlari ham qulflanadi - move_device ning shartli UPDATE i commit gacha kutadi
+        current = {
+            row['device_id']: row
+            for row in DeviceLocation.objects.filter(device_id__in=found_ids)
+            .select_for_update(of=('self',))
+            .values('device_id', 'room_id', 'room__building_id', 'responsible_person_id', 'version')
+        }
+        moved = [
+            pk for pk, _ in devices
+            if pk not in current
+            or current[pk]['room_id'] != room.pk
+            or current[pk]['responsible_person_id'] != responsible_id
+        ]
+
+        if moved:
+            # created_by_* / updated_by_* - AuditUserField.pre_save, ON CONFLICT dagi updated_* - AuditQuerySet
+            DeviceLocation.objects.bulk_create(
+                [
+                    DeviceLocation(device_id=pk, room=room, responsible_person=responsible_person,
+                                   version=current[pk]['version'] + 1 if pk in current else 1)
+                    for pk in moved
+                ],
+                update_conflicts=True,
+                unique_fields=['device'],
+                update_fields=['room', 'responsible_person', 'version'],
+            )
+            DeviceLocationHistory.objects.bulk_create([
+                DeviceLocationHistory(
+                    device_id=pk,
+                    old_building_id=current[pk]['room__building_id'] if pk in current else None,
+                    old_room_id=current[pk]['room_id'] if pk in current else None,
+                    new_building_id=room.building_id,
+                    new_room=room,
+                    moved_by=moved_by,
+                    reason=reason,
+                )
+                for pk in moved
+            ])
+
+    if moved:
+        # bulk_create signal chiqarmaydi
+        invalidate_models(DeviceLocation, DeviceLocationHistory)
+        logger.info(f"Bulk move: {len(moved)} ta qurilma {room.pk}-xonaga ko'chirildi")
+
+    return {
+        'room': room.pk,
+        'responsible_person': responsible_id,
+        'moved': len(moved),
+        'unchanged': len(devices) - len(moved),
+        'devices': moved,
+    }
@@ -0,0 +1,138 @@
+"""
+Ro'yxat endpoint lari uchun tezkor o'qish rejimi.
+Model instance va ModelSerializer o'rniga values() qatorlaridan oldindan kompilyatsiya qilingan
+konvertorlar bilan javob yasaladi. JSON serializer bilan bir xil (bayt-bayt) chiqadi.
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .fieldsets import resolve_source
+from .pagination import get_cursor_columns
+
+# Konvertor None ni qaytarsa - tezkor rejim bu serializer uchun ishlatilmaydi
+_UNSUPPORTED_FIELDS = (
+    serializers.FileField,
+    serializers.SerializerMethodField,
+    serializers.ManyRelatedField,
+    serializers.HyperlinkedRelatedField,
+    serializers.JSONField,
+)
+
+
+def _identity(value):
+    return value
+
+
+def _get_converter(field) -> Optional[Callable[[Any], Any]]:
+    """
+    Serializer maydoni uchun qiymat konvertori (qiymat None bo'lmaganda chaqiriladi)
+    """
+    if isinstance(field, _UNSUPPORTED_FIELDS):
+        return None
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        # values() FK id sini qaytaradi - PKOnlyObject(pk).pk bilan bir xil
+        return _identity if field.pk_field is None else field.pk_field.to_representation
+    if isinstance(field, serializers.RelatedField):
+        return None
+    field_type = type(field)
+    if field_type is serializers.CharField:
+        return str
+    if field_type is serializers.IntegerField:
+        return int
+    # Sana, decimal, choice, IP va h.k. - maydonning o'z to_representation i (format/timezone sozlamalari bilan)
+    return field.to_representation
+
+
+class RowReader:
+    """
+    Bitta serializer (va uning maydonlar to'plami) uchun kompilyatsiya qilingan o'qish rejasi
+    """
+
+    def __init__(self, columns: List[str], plan: List[tuple]):
+        self.columns = columns
+        self.plan = plan
+
+    @classmethod
+    def compile(cls, serializer) -> Optional['RowReader']:
+        model = serializer.Meta.model
+        columns = []
+        plan = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.BaseSerializer) or field.source == '*':
+                return None
+            convert = _get_converter(field)
+            if convert is None:
+                return None
+            resolved = resolve_source(model, field.source_attrs)
+            if resolved is None:
+                return None
+            column, relation = resolved
+            if relation and isinstance(field, serializers.RelatedField):
+                return None
+            # Bog'langan obyekt yo'q bo'lsa (null FK) serializer bu kalitni tashlab ketadi (SkipField)
+            guard = relation
+            columns.append(column)
+            if guard:
+                columns.append(guard)
+            plan.append((name, column, guard, convert))
+        return cls(list(dict.fromkeys(columns)), plan)
+
+    def values(self, queryset, extra_columns=()):
+        return queryset.values(*dict.fromkeys([*self.columns, *extra_columns]))
+
+    def to_representation(self, rows) -> List[Dict[str, Any]]:
+        plan = self.plan
+        data = []
+        for row in rows:
+            item = {}
+            for name, column, guard, convert in plan:
+                if guard is not None and row[guard] is None:
+                    continue
+                value = row[column]
+                item[name] = None if value is None else convert(value)
+            data.append(item)
+        return data
+
+
+class FastListMixin:
+    """
+    ViewSet uchun: list() javobini values() + RowReader orqali yasash.
+    Serializer da qo'llab-quvvatlanmaydigan maydon bo'lsa (rasm, method field, nested) oddiy list() ishlatiladi.
+    """
+    fast_list = True
+
+    _readers: Dict[tuple, Optional[RowReader]] = {}
+    _readers_lock = threading.Lock()
+
+    def get_row_reader(self) -> Optional[RowReader]:
+        if not self.fast_list:
+            return None
+        serializer = self.get_serializer()
+        key = (type(serializer), tuple(serializer.fields))
+        reader = self._readers.get(key, False)
+        if reader is False:
+            reader = RowReader.compile(serializer)
+            with self._readers_lock:
+                self._readers[key] = reader
+        return reader
+
+    def list(self, request, *args, **kwargs):
+        reader = self.get_row_reader()
+        if reader is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        # Cursor pagination pozitsiyani qatordagi ordering ustunidan oladi
+        rows = reader.values(queryset, get_cursor_columns(self, queryset))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(reader.to_representation(page))
+        return Response(reader.to_representation(rows))
+
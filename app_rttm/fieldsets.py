@@ -0,0 +1,126 @@
+"""
+Sparse fieldsets: ?fields=id,name yoki ?omit=notes.
+Serializer faqat so'ralgan maydonlarni qaytaradi, view esa queryset ga only() va
+kerakli select_related larnigina qo'llaydi - keraksiz ustun va JOIN lar bazadan o'qilmaydi.
+"""
+
+from typing import List, Optional, Set, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+from .pagination import get_cursor_columns
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def _parse_param(request, name: str) -> Optional[Set[str]]:
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+def get_requested_fields(request) -> Tuple[Optional[Set[str]], Set[str]]:
+    """
+    (fields, omit) - fields None bo'lsa barcha maydonlar so'ralgan
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None, set()
+    return _parse_param(request, FIELDS_PARAM), _parse_param(request, OMIT_PARAM) or set()
+
+
+class SparseFieldsetMixin:
+    """
+    ModelSerializer uchun: GET so'rovlarda ?fields= / ?omit= bo'yicha maydonlarni qisqartirish.
+    Faqat yuqori darajadagi serializer ga (yoki list ning child iga) qo'llanadi, nested larga emas.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        root = self.root
+        if root is not self and root is not self.parent:
+            return fields
+
+        requested, omit = get_requested_fields(self.context.get('request'))
+        if requested is not None:
+            fields = {name: field for name, field in fields.items() if name in requested}
+        for name in omit:
+            fields.pop(name, None)
+        return fields
+
+
+def resolve_source(model, source_attrs: List[str]) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Serializer maydoni manbasini ORM yo'liga aylantirish: (only() uchun ustun, select_related yo'li).
+    Aniqlab bo'lmasa (method field, reverse relation, property) - None.
+    """
+    path = []
+    for index, attr in enumerate(source_attrs):
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        last = index == len(source_attrs) - 1
+        if field.is_relation:
+            if not (field.many_to_one or field.one_to_one) or not field.concrete:
+                return None
+            if last:
+                # Faqat FK id si kerak - JOIN shart emas
+                return '__'.join(path + [attr]), '__'.join(path) or None
+            path.append(attr)
+            model = field.related_model
+        else:
+            if not last:
+                return None
+            return '__'.join(path + [attr]), '__'.join(path) or None
+    return None
+
+
+def narrow_queryset(queryset, serializer, extra_columns=()):
+    """
+    Serializer dagi maydonlarga mos only() va select_related.
+    Birorta maydon manbasini aniqlab bo'lmasa queryset o'zgarmaydi.
+    """
+    columns = {queryset.model._meta.pk.name, *extra_columns}
+    relations = set()
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*' or isinstance(field, serializers.BaseSerializer):
+            return queryset
+        resolved = resolve_source(queryset.model, field.source_attrs)
+        if resolved is None:
+            return queryset
+        column, relation = resolved
+        columns.add(column)
+        if relation:
+            relations.add(relation)
+
+    queryset = queryset.select_related(None)
+    if relations:
+        # select_related() argumentsiz chaqirilsa barcha FK lar JOIN qilinadi
+        queryset = queryset.select_related(*sorted(relations))
+    return queryset.only(*sorted(columns))
+
+
+class SparseFieldsetViewMixin:
+    """
+    ViewSet uchun: ?fields= / ?omit= berilgan GET so'rovlarda queryset ni toraytirish
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        requested, omit = get_requested_fields(self.request)
+        if requested is None and not omit:
+            return queryset
+        return narrow_queryset(queryset, self.get_serializer(), self.get_required_columns(queryset))
+
+    def get_required_columns(self, queryset) -> List[str]:
+        """
+        Serializer da bo'lmasa ham only() ga qo'shiladigan ustunlar
+        """
+        # Cursor pagination pozitsiyani oxirgi yozuvning ordering maydonlaridan oladi
+        return list(get_cursor_columns(self, queryset))
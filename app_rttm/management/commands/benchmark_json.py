@@ -0,0 +1,82 @@
+"""
+DeviceSerializer chiqishida standart va tezkor JSON renderer/parser tezligini solishtirish.
+Bazaga murojaat qilmaydi - qurilmalar xotirada yasaladi.
+
+    python manage.py benchmark_json --rows 5000 --repeat 20
+"""
+
+import datetime
+import timeit
+from decimal import Decimal
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from app_rttm.models import Category, Device, DeviceType
+from app_rttm.parsers import FastJSONParser
+from app_rttm.renderers import FastJSONRenderer, orjson
+from app_rttm.serializers import DeviceSerializer
+
+
+class Command(BaseCommand):
+    help = "DeviceSerializer chiqishida standart va tezkor JSON renderer/parser ni solishtirish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help="Qurilmalar soni")
+        parser.add_argument('--repeat', type=int, default=20, help="Har bir o'lchov necha marta takrorlanadi")
+
+    def build_payload(self, rows):
+        category = Category(id=1, name='Kompyuterlar')
+        device_type = DeviceType(id=1, category=category, name='Noutbuk')
+        now = timezone.now()
+        conditions = [value for value, _ in Device.CONDITION_CHOICES]
+        devices = [
+            Device(
+                id=i,
+                device_type=device_type,
+                inventory_number=f'INV-{i:06d}',
+                serial_number=f'SN{i:08d}',
+                condition=conditions[i % len(conditions)],
+                purchase_date=datetime.date(2024, 1, 1) + datetime.timedelta(days=i % 365),
+                purchase_price=Decimal('1234.50') + i,
+                ip_address=f'10.0.{i // 256 % 256}.{i % 256}',
+                mac_address='00:1B:44:11:3A:B7',
+                notes="Xona 101, o'qituvchi stoli yonida" if i % 3 else None,
+                created_at=now,
+                updated_at=now,
+            )
+            for i in range(1, rows + 1)
+        ]
+        return {'count': rows, 'next': None, 'previous': None, 'results': DeviceSerializer(devices, many=True).data}
+
+    def measure(self, fn, repeat):
+        return min(timeit.repeat(fn, number=1, repeat=repeat)) * 1000
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        payload = self.build_payload(rows)
+
+        default_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+        default_parser, fast_parser = JSONParser(), FastJSONParser()
+
+        body = default_renderer.render(payload)
+        if fast_renderer.render(payload) != body:
+            self.stderr.write(self.style.ERROR("Tezkor renderer natijasi standart renderer dan farq qiladi"))
+        if fast_parser.parse(BytesIO(body)) != default_parser.parse(BytesIO(body)):
+            self.stderr.write(self.style.ERROR("Tezkor parser natijasi standart parser dan farq qiladi"))
+
+        results = [
+            ('render', self.measure(lambda: default_renderer.render(payload), repeat),
+             self.measure(lambda: fast_renderer.render(payload), repeat)),
+            ('parse', self.measure(lambda: default_parser.parse(BytesIO(body)), repeat),
+             self.measure(lambda: fast_parser.parse(BytesIO(body)), repeat)),
+        ]
+
+        backend = f"orjson {orjson.__version__}" if orjson else "orjson o'rnatilmagan (standart json)"
+        self.stdout.write(f"DeviceSerializer: {rows} ta qator, {len(body) / 1024:.1f} KB, {backend}")
+        self.stdout.write(f"{'':8}{'standart, ms':>14}{'tezkor, ms':>14}{'tezlanish':>12}")
+        for name, default_ms, fast_ms in results:
+            self.stdout.write(f"{name:8}{default_ms:14.2f}{fast_ms:14.2f}{default_ms / fast_ms:11.1f}x")
@@ -25,24 +25,28 @@ def get_current_user():
     return None
 
 
+def get_current_principal():
+    """
+    Joriy so'rov principal ini olish (AuthMiddleware yasagan)
+    Returns: AuthPrincipal yoki None
+    """
+    return getattr(get_current_request(), 'auth_principal', None)
+
+
 def get_current_user_id():
     """
     Joriy foydalanuvchi ID'sini olish
     """
-    request = get_current_request()
-    if request and hasattr(request, 'auth_user_id'):
-        return request.auth_user_id
-    return None
+    principal = get_current_principal()
+    return principal.id if principal else None
 
 
 def get_current_username():
     """
     Joriy foydalanuvchi username'ini olish
     """
-    request = get_current_request()
-    if request and hasattr(request, 'auth_username'):
-        return request.auth_username
-    return None
+    principal = get_current_principal()
+    return principal.username if principal else None
 
 
 class CurrentUserMiddleware(MiddlewareMixin):
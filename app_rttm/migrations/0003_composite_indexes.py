@@ -0,0 +1,87 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_rttm', '0002_remove_building_created_by_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(fields=['-created_at', 'id'], name='device_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(fields=['condition', '-created_at'], name='device_condition_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(fields=['device_type', '-created_at'], name='device_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deviceconditionhistory',
+            index=models.Index(fields=['-changed_at', 'id'], name='condhist_changed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deviceconditionhistory',
+            index=models.Index(fields=['device', '-changed_at'], name='condhist_device_changed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deviceconditionhistory',
+            index=models.Index(fields=['new_condition', '-changed_at'], name='condhist_new_cond_changed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='devicelocationhistory',
+            index=models.Index(fields=['-moved_at', 'id'], name='lochist_moved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='devicelocationhistory',
+            index=models.Index(fields=['device', '-moved_at'], name='lochist_device_moved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='devicelocationhistory',
+            index=models.Index(fields=['new_room', '-moved_at'], name='lochist_new_room_moved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repairrequest',
+            index=models.Index(fields=['-created_at', 'id'], name='repair_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repairrequest',
+            index=models.Index(fields=['request_status', '-created_at'], name='repair_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repairrequest',
+            index=models.Index(fields=['priority', '-created_at'], name='repair_priority_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repairrequest',
+            index=models.Index(fields=['assigned_to', '-created_at'], name='repair_assignee_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repairrequest',
+            index=models.Index(condition=models.Q(('request_status__in', ['new', 'assigned', 'in_progress'])), fields=['-created_at', 'id'], name='repair_open_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicelog',
+            index=models.Index(fields=['-service_date'], name='servicelog_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicelog',
+            index=models.Index(fields=['-created_at', 'id'], name='servicelog_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicelog',
+            index=models.Index(fields=['device', '-service_date'], name='servicelog_device_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicelog',
+            index=models.Index(fields=['service_type', '-service_date'], name='servicelog_type_date_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:54
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_rttm', '0003_composite_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector(django.db.models.functions.text.Replace('inventory_number', models.Value('-'), models.Value(' '), output_field=models.TextField()), config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector(django.db.models.functions.text.Replace('serial_number', models.Value('-'), models.Value(' '), output_field=models.TextField()), config='simple', weight='A'), django.contrib.postgres.search.SearchConfig('simple')), '||', django.contrib.postgres.search.SearchVector(django.db.models.functions.text.Replace('notes', models.Value('-'), models.Value(' '), output_field=models.TextField()), config='simple', weight='C'), django.contrib.postgres.search.SearchConfig('simple')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddField(
+            model_name='repairrequest',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector(django.db.models.functions.text.Replace('problem_description', models.Value('-'), models.Value(' '), output_field=models.TextField()), config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector(django.db.models.functions.text.Replace('work_description', models.Value('-'), models.Value(' '), output_field=models.TextField()), config='simple', weight='B'), django.contrib.postgres.search.SearchConfig('simple')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='device',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='device_search_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='repairrequest',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='repair_search_gin'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:56
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import DatabaseError, migrations, models, transaction
+
+TRIGRAM_INDEXES = {
+    'device_inv_trgm': 'inventory_number',
+    'device_serial_trgm': 'serial_number',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """
+    pg_trgm serverda mavjud bo'lsagina kengaytma va GIN indekslarini yaratish.
+    Mavjud bo'lmasa lookup icontains ga qaytadi; kengaytma keyin o'rnatilsa migratsiyani qayta ishlatish mumkin.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+        try:
+            with transaction.atomic(using=connection.alias):
+                cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        except DatabaseError:
+            # Kengaytma yaratishga huquq yo'q
+            return
+        for name, column in TRIGRAM_INDEXES.items():
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS "{name}" ON "app_rttm_device" USING gin ("{column}" gin_trgm_ops)'
+            )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for name in TRIGRAM_INDEXES:
+            cursor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_rttm', '0004_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('inventory_number'), name='text_pattern_ops'), name='device_inv_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('serial_number'), name='text_pattern_ops'), name='device_serial_prefix_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
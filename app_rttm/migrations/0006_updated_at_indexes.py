@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_rttm', '0005_device_lookup_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(fields=['updated_at'], name='device_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repairrequest',
+            index=models.Index(fields=['updated_at'], name='repair_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicelog',
+            index=models.Index(fields=['updated_at'], name='servicelog_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_rttm', '0006_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='Versiya'),
+        ),
+        migrations.AddField(
+            model_name='devicelocation',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='Versiya'),
+        ),
+    ]
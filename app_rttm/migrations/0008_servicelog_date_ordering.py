@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_rttm', '0007_version_columns'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='servicelog',
+            options={'ordering': ['-service_date', 'id']},
+        ),
+        migrations.RemoveIndex(
+            model_name='servicelog',
+            name='servicelog_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='servicelog',
+            index=models.Index(fields=['-service_date', 'id'], name='servicelog_date_id_idx'),
+        ),
+    ]
@@ -5,14 +5,35 @@ from django.core.files.storage import FileSystemStorage
 from django.db import models, transaction
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db.models.functions import Replace, Upper
 
-from .middleware import get_current_user_id, get_current_username
+from .middleware import get_current_principal
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+# Full-text search konfiguratsiyasi: o'zbek/rus matnlari uchun stemming siz 'simple'
+SEARCH_CONFIG = 'simple'
+
+
+def search_vector_field(*weighted_fields):
+    """
+    Og'irlikli tsvector ustuni (PostgreSQL generated column).
+    Baza o'zi hisoblaydi - save(), bulk_create() va update() da ham doim dolzarb.
+    Chiziqcha probelga almashtiriladi: parser 'SW-100' ni 'sw' va '-100' (manfiy son) deb ajratadi.
+    """
+    vector = None
+    for field_name, weight in weighted_fields:
+        text = Replace(field_name, models.Value('-'), models.Value(' '), output_field=models.TextField())
+        part = SearchVector(text, weight=weight, config=SEARCH_CONFIG)
+        vector = part if vector is None else vector + part
+    return models.GeneratedField(expression=vector, output_field=SearchVectorField(), db_persist=True)
+
 class BuildingMediaStorage(FileSystemStorage):
     """building media ichidagi fayllarni boshqaradi"""
     def __init__(self, subfolder: str = '', *args, **kwargs):
@@ -29,6 +50,71 @@ def mac_address_validator(value):
         raise ValidationError(_('Noto\'g\'ri MAC manzil formati.'))
 
 
+def get_audit_values(creating: bool = True) -> dict:
+    """
+    Joriy principal bo'yicha audit maydonlari (QuerySet.update uchun)
+    """
+    principal = get_current_principal()
+    if not principal or not principal.id or not principal.username:
+        return {}
+    values = {'updated_by_id': str(principal.id), 'updated_by_name': principal.username}
+    if creating:
+        values.update(created_by_id=str(principal.id), created_by_name=principal.username)
+    return values
+
+
+class AuditUserField(models.CharField):
+    """
+    created_by_* / updated_by_* ustuni: qiymat pre_save() da joriy principal dan olinadi (auto_now kabi).
+    Django pre_save ni save() da ham, bulk_create() INSERT ida ham chaqiradi - alohida sikl kerak emas.
+    attr - principal atributi ('id' yoki 'username'), on_create - faqat yaratishda (created_by_*).
+    Yaratishda aniq berilgan qiymat ustun.
+    """
+
+    def __init__(self, *args, attr: str = 'id', on_create: bool = False, **kwargs):
+        self.attr = attr
+        self.on_create = on_create
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        # pre_save bazaga ta'sir qilmaydi - migratsiyalar uchun oddiy CharField
+        return name, 'django.db.models.CharField', args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = getattr(model_instance, self.attname)
+        if (self.on_create and not add) or (add and value is not None):
+            return value
+        principal = get_current_principal()
+        if principal and principal.id and principal.username:
+            value = str(getattr(principal, self.attr))
+            setattr(model_instance, self.attname, value)
+        return value
+
+
+class AuditQuerySet(models.QuerySet):
+    """
+    Main modellari uchun: save() dan tashqari yozishlarda ham audit maydonlari.
+    - update(): updated_by_* va updated_at - bitta SET, qatorlar bo'yicha Python ishi yo'q.
+      bulk_update() ham har bir paketni shu update() orqali yozadi.
+    - bulk_create(): qiymatlar AuditUserField.pre_save dan; ON CONFLICT DO UPDATE da updated_* ham yangilanadi
+    Aniq berilgan qiymatlar ustun.
+    """
+
+    def update(self, **kwargs):
+        return super().update(**{'updated_at': timezone.now(), **get_audit_values(creating=False), **kwargs})
+
+    def bulk_create(self, objs, batch_size=None, ignore_conflicts=False, update_conflicts=False,
+                    update_fields=None, unique_fields=None):
+        if update_conflicts and update_fields:
+            # Mavjud qator yangilanganda - kim va qachon
+            audit_fields = ['updated_at', *get_audit_values(creating=False)]
+            update_fields = list(dict.fromkeys([*update_fields, *audit_fields]))
+        return super().bulk_create(objs, batch_size=batch_size, ignore_conflicts=ignore_conflicts,
+                                   update_conflicts=update_conflicts, update_fields=update_fields,
+                                   unique_fields=unique_fields)
+
+
 class Main(models.Model):
     """
     Bazaviy model - created_by va updated_by AVTOMATIK (External Auth bilan ishlaydi)
@@ -47,14 +133,18 @@ class Main(models.Model):
     )
 
     # External auth uchun - string ID ishlatamiz
-    created_by_id = models.CharField(
+    created_by_id = AuditUserField(
+        attr='id',
+        on_create=True,
         max_length=255,
         null=True,
         blank=True,
         editable=False,
         verbose_name=_("Kim yaratdi (ID)")
     )
-    created_by_name = models.CharField(
+    created_by_name = AuditUserField(
+        attr='username',
+        on_create=True,
         max_length=255,
         null=True,
         blank=True,
@@ -63,14 +153,16 @@ class Main(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Yaratilgan sana"))
 
-    updated_by_id = models.CharField(
+    updated_by_id = AuditUserField(
+        attr='id',
         max_length=255,
         null=True,
         blank=True,
         editable=False,
         verbose_name=_("Kim yangiladi (ID)")
     )
-    updated_by_name = models.CharField(
+    updated_by_name = AuditUserField(
+        attr='username',
         max_length=255,
         null=True,
         blank=True,
@@ -79,32 +171,48 @@ class Main(models.Model):
     )
     updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Yangilangan sana"))
 
+    objects = AuditQuerySet.as_manager()
+
     class Meta:
         abstract = True
 
     def save(self, *args, **kwargs):
         """
-        AVTOMATIK USER SAQLASH - External auth bilan ishlash
+        AVTOMATIK USER SAQLASH - created_by_* / updated_by_* AuditUserField.pre_save da to'ldiriladi
         """
-        user_id = get_current_user_id()
-        user_name = get_current_username()
-
-        logger.debug(f"save() chaqirildi. User ID: {user_id}, Username: {user_name}")
-        logger.debug(f"Model: {self.__class__.__name__}, PK: {self.pk}")
-
-        if user_id and user_name:
-            if not self.pk:
-                self.created_by_id = str(user_id)
-                self.created_by_name = user_name
-                logger.info(f"✅ created_by o'rnatildi: {user_name} (ID: {user_id})")
-
-            self.updated_by_id = str(user_id)
-            self.updated_by_name = user_name
-            logger.info(f"✅ updated_by o'rnatildi: {user_name} (ID: {user_id})")
-        else:
+        audit = get_audit_values(creating=False)
+        if not audit:
             logger.warning(f"⚠️ User topilmadi! Model: {self.__class__.__name__}")
+        elif kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], *audit}
+
+        super().save(*args, **kwargs)
+
 
+class VersionedModel(models.Model):
+    """
+    Optimistic concurrency uchun versiya ustuni.
+    Har bir save() da bazada atomik oshiriladi (version = version + 1); shartli yangilash:
+    Model.objects.filter(pk=..., version=kutilgan).update(..., version=F('version') + 1)
+    """
+    version = models.PositiveIntegerField(default=1, editable=False, verbose_name=_("Versiya"))
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        bump = not self._state.adding and self.pk is not None
+        if bump:
+            expected = self.version
+            self.version = models.F('version') + 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'version'}
         super().save(*args, **kwargs)
+        if bump:
+            # refresh_from_db siz (move_device kabi). Parallel save bo'lgan bo'lsa bazadagi versiya kattaroq -
+            # shu obyekt bilan keyingi shartli yozish 409 beradi (xavfsiz tomonga)
+            self.version = expected + 1
 
 
 # ==================== BINOLAR ====================
@@ -211,7 +319,7 @@ class DeviceType(Main):
 hijoz_storage = BuildingMediaStorage('hijoz')
 
 
-class Device(Main):
+class Device(VersionedModel, Main):
     device_type = models.ForeignKey(DeviceType, on_delete=models.PROTECT, related_name="devices")
     inventory_number = models.CharField(max_length=100, unique=True)
     serial_number = models.CharField(max_length=255, blank=True, null=True)
@@ -234,8 +342,21 @@ class Device(Main):
 
     notes = models.TextField(blank=True, null=True)
 
+    search_vector = search_vector_field(('inventory_number', 'A'), ('serial_number', 'A'), ('notes', 'C'))
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='device_search_gin'),
+            # DeviceViewSet: ro'yxat va cursor pagination (-created_at, id)
+            models.Index(fields=['-created_at', 'id'], name='device_created_idx'),
+            models.Index(fields=['updated_at'], name='device_updated_idx'),
+            models.Index(fields=['condition', '-created_at'], name='device_condition_created_idx'),
+            models.Index(fields=['device_type', '-created_at'], name='device_type_created_idx'),
+            # lookup: istartswith -> UPPER(...) LIKE 'ABC%' (pg_trgm GIN indekslari 0005 migratsiyasida)
+            models.Index(OpClass(Upper('inventory_number'), name='text_pattern_ops'), name='device_inv_prefix_idx'),
+            models.Index(OpClass(Upper('serial_number'), name='text_pattern_ops'), name='device_serial_prefix_idx'),
+        ]
 
     def __str__(self):
         return f"{self.device_type.name} - {self.inventory_number}"
@@ -252,7 +373,7 @@ class DeviceImage(models.Model):
         return f"{self.device.inventory_number} - Rasm"
 
 
-class DeviceLocation(Main):
+class DeviceLocation(VersionedModel, Main):
     device = models.OneToOneField(Device, on_delete=models.CASCADE, related_name="location")
     room = models.ForeignKey(Room, on_delete=models.PROTECT, related_name="current_devices")
     responsible_person = models.ForeignKey('ResponsiblePerson', on_delete=models.SET_NULL, null=True, blank=True,
@@ -275,6 +396,11 @@ class DeviceLocationHistory(models.Model):
 
     class Meta:
         ordering = ['-moved_at']
+        indexes = [
+            models.Index(fields=['-moved_at', 'id'], name='lochist_moved_idx'),
+            models.Index(fields=['device', '-moved_at'], name='lochist_device_moved_idx'),
+            models.Index(fields=['new_room', '-moved_at'], name='lochist_new_room_moved_idx'),
+        ]
 
     def __str__(self):
         old = f"{self.old_building.name}" if self.old_building else "Yangi"
@@ -292,6 +418,11 @@ class DeviceConditionHistory(models.Model):
 
     class Meta:
         ordering = ['-changed_at']
+        indexes = [
+            models.Index(fields=['-changed_at', 'id'], name='condhist_changed_idx'),
+            models.Index(fields=['device', '-changed_at'], name='condhist_device_changed_idx'),
+            models.Index(fields=['new_condition', '-changed_at'], name='condhist_new_cond_changed_idx'),
+        ]
 
     def __str__(self):
         old = self.old_condition or "Yangi"
@@ -314,6 +445,8 @@ class RepairRequest(Main):
         ('completed', _("Bajarilgan")),
         ('cancelled', _("Bekor qilingan")),
     )
+    # Hali yopilmagan so'rovlar (ta'mirlash navbati)
+    OPEN_STATUSES = ('new', 'assigned', 'in_progress')
 
     device = models.ForeignKey(Device, on_delete=models.CASCADE, related_name="repair_requests")
     requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True,
@@ -330,8 +463,24 @@ class RepairRequest(Main):
     telegram_chat_id = models.BigIntegerField(blank=True, null=True)
     telegram_message_id = models.IntegerField(blank=True, null=True)
 
+    search_vector = search_vector_field(('problem_description', 'A'), ('work_description', 'B'))
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='repair_search_gin'),
+            models.Index(fields=['-created_at', 'id'], name='repair_created_idx'),
+            models.Index(fields=['updated_at'], name='repair_updated_idx'),
+            models.Index(fields=['request_status', '-created_at'], name='repair_status_created_idx'),
+            models.Index(fields=['priority', '-created_at'], name='repair_priority_created_idx'),
+            models.Index(fields=['assigned_to', '-created_at'], name='repair_assignee_created_idx'),
+            # Faqat ochiq so'rovlar - yopilganlari ko'paygan sari indeks kattalashmaydi
+            models.Index(
+                fields=['-created_at', 'id'],
+                condition=models.Q(request_status__in=['new', 'assigned', 'in_progress']),
+                name='repair_open_created_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"#{self.id} - {self.device.inventory_number}"
@@ -358,7 +507,15 @@ class ServiceLog(Main):
                                        related_name="service_logs")
 
     class Meta:
-        ordering = ['-service_date']
+        # id - bir kundagi yozuvlar ham barqaror tartibda (sahifa va cursor rejimlarida bir xil)
+        ordering = ['-service_date', 'id']
+        indexes = [
+            models.Index(fields=['-service_date', 'id'], name='servicelog_date_id_idx'),
+            models.Index(fields=['-created_at', 'id'], name='servicelog_created_idx'),
+            models.Index(fields=['updated_at'], name='servicelog_updated_idx'),
+            models.Index(fields=['device', '-service_date'], name='servicelog_device_date_idx'),
+            models.Index(fields=['service_type', '-service_date'], name='servicelog_type_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.device.inventory_number} - {self.service_date}"
\ No newline at end of file
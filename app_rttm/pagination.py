@@ -0,0 +1,89 @@
+"""
+API ro'yxatlari uchun pagination.
+Odatiy holatda sahifa raqami (?page=), katta jadvallarda esa ?cursor= bilan keyset (cursor) pagination.
+"""
+
+from typing import List
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    View dagi cursor_ordering bo'yicha keyset pagination.
+    COUNT(*) va OFFSET ishlatilmaydi - N-sahifa ham 1-sahifa kabi tez.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+    def get_ordering(self, request, queryset, view):
+        self.ordering = getattr(view, 'cursor_ordering', None) or self.ordering
+        return super().get_ordering(request, queryset, view)
+
+
+class HybridPagination(PageNumberPagination):
+    """
+    ?page= - oddiy sahifalash (count bilan), ?cursor= - keyset pagination.
+    Cursor rejimi faqat cursor_ordering belgilangan view larda ishlaydi.
+    Ikkala rejimda ham ?page_size= orqali sahifa hajmi (API_MAX_PAGE_SIZE gacha) tanlanadi.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+    cursor_query_param = 'cursor'
+    cursor_class = KeysetCursorPagination
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def use_cursor(self, request, view) -> bool:
+        return (
+            self.cursor_query_param in request.query_params
+            and bool(getattr(view, 'cursor_ordering', None))
+        )
+
+    def get_cursor_columns(self, request, queryset, view) -> List[str]:
+        """
+        Cursor rejimida pozitsiya olinadigan ustunlar - ?ordering= (OrderingFilter) hisobga olingan.
+        values() / only() bilan toraytirilgan queryset ga qo'shiladi.
+        """
+        if not self.use_cursor(request, view):
+            return []
+        ordering = self.cursor_class().get_ordering(request, queryset, view)
+        return [name.lstrip('-') for name in ordering]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request, view):
+            self.cursor_paginator = self.cursor_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+
+        self.cursor_paginator = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        if getattr(view, 'cursor_ordering', None):
+            parameters.append({
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': "Keyset pagination: birinchi sahifa uchun bo'sh qiymat, "
+                               "keyingilari uchun javobdagi next/previous havolasi",
+                'schema': {'type': 'string'},
+            })
+        return parameters
+
+
+def get_cursor_columns(view, queryset) -> List[str]:
+    """
+    View paginator i cursor rejimida bo'lsa - ordering ustunlari, aks holda bo'sh ro'yxat
+    """
+    paginator = view.paginator
+    if paginator is None or not hasattr(paginator, 'get_cursor_columns'):
+        return []
+    return paginator.get_cursor_columns(view.request, queryset, view)
@@ -0,0 +1,28 @@
+"""
+Tezkor JSON parser: orjson o'rnatilgan bo'lsa u bilan, aks holda DRF ning standart JSONParser i.
+"""
+
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import orjson
+
+
+class FastJSONParser(JSONParser):
+    """
+    orjson asosidagi JSONParser (faqat UTF-8 so'rovlar uchun, boshqa kodlashlar standart parser ga)
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
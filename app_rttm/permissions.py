@@ -4,6 +4,8 @@ from functools import wraps
 from rest_framework.response import Response
 from rest_framework import status
 
+from .role_permissions import ADMIN_ROLES
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,9 +18,10 @@ class AuthPermission(permissions.BasePermission):
         """
         Middleware tomonidan autentifikatsiya qilinganligini tekshirish
         """
-        # Middleware allaqachon auth tekshirgan va request ga ma'lumot qo'ygan
-        if hasattr(request, 'auth_user_id') and hasattr(request, 'auth_role'):
-            logger.info(f"AuthPermission: User {request.auth_username} authenticated with role {request.auth_role}")
+        # Middleware allaqachon auth tekshirgan va request ga principal qo'ygan
+        principal = getattr(request, 'auth_principal', None)
+        if principal is not None:
+            logger.info(f"AuthPermission: User {principal.username} authenticated with role {principal.role}")
             return True
 
         logger.warning("AuthPermission: No auth data found in request")
@@ -37,29 +40,30 @@ class SmartPermission(permissions.BasePermission):
         Request method va user role asosida ruxsat berish
         """
         # Auth tekshiruv
-        if not hasattr(request, 'auth_role'):
-            logger.warning("SmartPermission: No auth_role in request")
+        principal = getattr(request, 'auth_principal', None)
+        if principal is None:
+            logger.warning("SmartPermission: No auth principal in request")
             return False
 
-        user_role = request.auth_role
+        user_role = principal.role
         method = request.method
 
         # Admin va creator - full access
-        if user_role in ['admin', 'creator', 'creater']:
-            logger.info(f"SmartPermission: {request.auth_username} ({user_role}) - Full access granted for {method}")
+        if user_role in ADMIN_ROLES:
+            logger.info(f"SmartPermission: {principal.username} ({user_role}) - Full access granted for {method}")
             return True
 
         # User role - faqat o'qish
         if user_role == 'user':
             if method in permissions.SAFE_METHODS:  # GET, HEAD, OPTIONS
-                logger.info(f"SmartPermission: {request.auth_username} (user) - Read access granted for {method}")
+                logger.info(f"SmartPermission: {principal.username} (user) - Read access granted for {method}")
                 return True
             else:
-                logger.warning(f"SmartPermission: {request.auth_username} (user) - Write access DENIED for {method}")
+                logger.warning(f"SmartPermission: {principal.username} (user) - Write access DENIED for {method}")
                 return False
 
         # Boshqa role'lar - ruxsat yo'q
-        logger.warning(f"SmartPermission: {request.auth_username} ({user_role}) - Access DENIED")
+        logger.warning(f"SmartPermission: {principal.username} ({user_role}) - Access DENIED")
         return False
 
 
@@ -72,19 +76,20 @@ class AdminOnlyPermission(permissions.BasePermission):
         """
         Admin yoki creator ekanligini tekshirish (middleware ma'lumotlaridan)
         """
-        # Middleware tomonidan o'rnatilgan role'ni tekshirish
-        if not hasattr(request, 'auth_role'):
-            logger.warning("AdminOnlyPermission: No auth_role in request")
+        # Middleware tomonidan o'rnatilgan principal ni tekshirish
+        principal = getattr(request, 'auth_principal', None)
+        if principal is None:
+            logger.warning("AdminOnlyPermission: No auth principal in request")
             return False
 
-        user_role = request.auth_role
+        user_role = principal.role
 
         # Admin va creator uchun ruxsat
-        if user_role in ['admin', 'creator', 'creater']:
-            logger.info(f"AdminOnlyPermission: User {request.auth_username} has admin/creator role")
+        if user_role in ADMIN_ROLES:
+            logger.info(f"AdminOnlyPermission: User {principal.username} has admin/creator role")
             return True
 
-        logger.warning(f"AdminOnlyPermission: User {request.auth_username} has insufficient role: {user_role}")
+        logger.warning(f"AdminOnlyPermission: User {principal.username} has insufficient role: {user_role}")
         return False
 
 
@@ -98,16 +103,17 @@ class ReadOnlyPermission(permissions.BasePermission):
         Faqat GET, HEAD, OPTIONS ruxsat
         """
         # Middleware tomonidan autentifikatsiya tekshirilgan
-        if not hasattr(request, 'auth_role'):
-            logger.warning("ReadOnlyPermission: No auth_role in request")
+        principal = getattr(request, 'auth_principal', None)
+        if principal is None:
+            logger.warning("ReadOnlyPermission: No auth principal in request")
             return False
 
         # Faqat o'qish method lariga ruxsat
         if request.method in permissions.SAFE_METHODS:  # GET, HEAD, OPTIONS
-            logger.info(f"ReadOnlyPermission: User {request.auth_username} accessing read-only endpoint")
+            logger.info(f"ReadOnlyPermission: User {principal.username} accessing read-only endpoint")
             return True
 
-        logger.warning(f"ReadOnlyPermission: User {request.auth_username} tried unsafe method {request.method}")
+        logger.warning(f"ReadOnlyPermission: User {principal.username} tried unsafe method {request.method}")
         return False
 
 
@@ -120,7 +126,7 @@ def require_auth_token(view_func):
 
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
-        if not hasattr(request, 'auth_user_id'):
+        if getattr(request, 'auth_principal', None) is None:
             return Response({
                 'error': 'Authentication required',
                 'message': 'Middleware auth data not found'
@@ -138,16 +144,17 @@ def require_admin_role(view_func):
 
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
-        if not hasattr(request, 'auth_role'):
+        principal = getattr(request, 'auth_principal', None)
+        if principal is None:
             return Response({
                 'error': 'Authentication required',
                 'message': 'Middleware auth data not found'
             }, status=status.HTTP_401_UNAUTHORIZED)
 
-        if request.auth_role not in ['admin', 'creator', 'creater']:
+        if principal.role not in ADMIN_ROLES:
             return Response({
                 'error': 'Permission denied',
-                'message': f'Admin yoki creator ruxsati kerak. Sizning role: {request.auth_role}'
+                'message': f'Admin yoki creator ruxsati kerak. Sizning role: {principal.role}'
             }, status=status.HTTP_403_FORBIDDEN)
 
         return view_func(request, *args, **kwargs)
@@ -0,0 +1,94 @@
+"""
+So'rov uchun autentifikatsiya qilingan foydalanuvchi (principal).
+AuthMiddleware uni bir marta yasaydi, permission class lar va Main.save faqat o'qiydi.
+"""
+
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Mapping, Optional
+
+from .auth_service import auth_service
+
+
+@dataclass(frozen=True)
+class AuthPrincipal:
+    """
+    O'zgarmas principal: id, username, role va ruxsatlar to'plami
+    """
+    id: Any
+    username: str
+    email: str
+    role: str
+    permissions: FrozenSet[str]
+    access_token: str = field(repr=False)
+    data: Mapping[str, Any] = field(repr=False, compare=False)
+
+    @classmethod
+    def from_user_data(cls, user_data: Dict[str, Any], access_token: str) -> 'AuthPrincipal':
+        return cls(
+            id=user_data.get('userId') or user_data.get('id'),
+            username=user_data.get('username', 'Unknown'),
+            email=user_data.get('email', ''),
+            role=(user_data.get('role') or '').lower(),
+            permissions=frozenset(user_data.get('permissions') or ()),
+            access_token=access_token,
+            data=MappingProxyType(dict(user_data)),
+        )
+
+    def has_permission(self, permission: str) -> bool:
+        return permission in self.permissions
+
+
+def get_access_token(request) -> Optional[str]:
+    """
+    Access token ni olish - header, query parameter yoki POST data dan
+    """
+    # Authorization header dan olish
+    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+    if auth_header.startswith('Bearer '):
+        return auth_header[7:]  # "Bearer " ni olib tashlash
+
+    # Query parameter dan olish
+    access_token = request.GET.get('access_token')
+    if access_token:
+        return access_token
+
+    # POST data dan olish
+    if hasattr(request, 'data') and isinstance(request.data, dict):
+        access_token = request.data.get('access_token')
+        if access_token:
+            return access_token
+
+    return None
+
+
+def set_principal(request, principal: AuthPrincipal):
+    """
+    Principal ni request ga biriktirish (DRF Request bo'lsa - asl HttpRequest ga ham)
+    """
+    request.auth_principal = principal
+    django_request = getattr(request, '_request', None)
+    if django_request is not None:
+        django_request.auth_principal = principal
+
+
+def get_principal(request) -> Optional[AuthPrincipal]:
+    """
+    So'rov principal ini olish. Middleware allaqachon yasagan bo'lsa - tayyorini qaytaradi,
+    aks holda token bo'yicha bir marta aniqlab, request ga saqlab qo'yadi.
+    """
+    principal = getattr(request, 'auth_principal', None)
+    if principal is not None:
+        return principal
+
+    access_token = get_access_token(request)
+    if not access_token:
+        return None
+
+    user_data = auth_service.get_current_user_role(access_token)
+    if not user_data:
+        return None
+
+    principal = AuthPrincipal.from_user_data(user_data, access_token)
+    set_principal(request, principal)
+    return principal
@@ -0,0 +1,37 @@
+"""
+Tezkor JSON renderer: orjson o'rnatilgan bo'lsa u bilan, aks holda DRF ning standart JSONRenderer i.
+Natija DRF JSONRenderer bilan bir xil: Decimal, sana/vaqt va lazy tarjima satrlari DRF encoder i orqali.
+"""
+
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson o'rnatilmagan - standart json ishlatiladi
+    orjson = None
+
+# orjson o'zi bilmaydigan turlar (Decimal, lazy str, timedelta, QuerySet...) va sana/vaqt
+# DRF encoder iga beriladi - javob formati o'zgarmaydi (masalan, datetime millisekundgacha, 'Z' bilan)
+_encoder_default = JSONEncoder().default
+
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    orjson asosidagi JSONRenderer. indent so'ralsa (masalan, browsable API) standart renderer ishlatiladi
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        # orjson faqat ixcham, UTF-8 (ensure_ascii=False) chiqishni qo'llab-quvvatlaydi
+        if self.ensure_ascii or not self.compact or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_encoder_default, option=ORJSON_OPTIONS)
+        # JSONRenderer kabi: U+2028/U+2029 JavaScript satrlarida ruxsat etilmagan
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
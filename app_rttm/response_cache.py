@@ -0,0 +1,263 @@
+"""
+Ma'lumotnoma endpoint lari (binolar, xonalar, kategoriyalar, qurilma turlari) uchun server tomonidagi javob cache i.
+Kalit: host + yo'l + tartiblangan query parametrlar + role + bog'liq modellar "generation" lari.
+Yozishda (post_save/post_delete) model generation i yangilanadi - eski kalitlar o'z-o'zidan yaroqsiz bo'ladi.
+"""
+
+import hashlib
+import threading
+import uuid
+from functools import partial
+from typing import Any, Dict, FrozenSet, Iterable, List, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework import serializers, status
+from rest_framework.response import Response
+
+GENERATION_PREFIX = 'resp:gen:'
+# Cache dagi javob bilan birga saqlanadigan header lar (ConditionalGetMixin validator lari)
+STORED_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control', 'Vary')
+
+_stats = {'hits': 0, 'misses': 0, 'stores': 0, 'invalidations': 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name: str, amount: int = 1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def get_response_cache_stats() -> Dict[str, Any]:
+    """
+    Joriy worker dagi hit/miss counter lari
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+    stats['alias'] = settings.RESPONSE_CACHE_ALIAS
+    return stats
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _bump(labels: Iterable[str]):
+    # Yangi tasodifiy qiymat: generation kaliti cache dan o'chib ketsa ham eski javoblar qaytib kelmaydi
+    get_cache().set_many({GENERATION_PREFIX + label: uuid.uuid4().hex for label in labels}, None)
+
+
+def invalidate_models(*models, using: str = 'default'):
+    """
+    Berilgan modellarga bog'liq barcha cache langan javoblarni yaroqsiz qilish.
+    Signal chiqarmaydigan yozishlar (QuerySet.update, bulk_create, bulk_update) dan keyin chaqiriladi.
+    """
+    labels = {model._meta.label_lower for model in models}
+    if not labels:
+        return
+    _bump(labels)
+    _count('invalidations', len(labels))
+    connection = transaction.get_connection(using)
+    if connection.in_atomic_block:
+        # Commit dan oldin o'qigan so'rov eski ma'lumotni cache lab qo'ymasligi uchun commit da yana yangilanadi
+        transaction.on_commit(partial(_bump, labels), using=using)
+
+
+def get_generations(labels: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    Modellar generation lari [(label, token), ...] label bo'yicha tartiblangan - bitta get_many
+    """
+    cache = get_cache()
+    keys = [GENERATION_PREFIX + label for label in sorted(labels)]
+    generations = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in generations}
+    if missing:
+        for key, value in missing.items():
+            # Parallel worker allaqachon yozgan bo'lsa o'shanisi olinadi
+            cache.add(key, value, None)
+        generations.update(cache.get_many(list(missing)))
+    return [(key[len(GENERATION_PREFIX):], generations.get(key)) for key in keys]
+
+
+def invalidate_on_write(sender, using='default', **kwargs):
+    """
+    post_save / post_delete receiver i (connect_invalidation_signals)
+    """
+    if sender._meta.auto_created:
+        return
+    invalidate_models(sender, using=using)
+
+
+def _collect_serializer_models(model, serializer, found: set):
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.ListSerializer):
+            field = field.child
+        current = model
+        attrs = field.source_attrs
+        for position, attr in enumerate(attrs):
+            try:
+                model_field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                break
+            if not model_field.is_relation:
+                break
+            if position == len(attrs) - 1 and isinstance(field, serializers.PrimaryKeyRelatedField):
+                # Faqat FK qiymati - u o'z qatorida, bog'langan qator o'zgarishi javobga ta'sir qilmaydi
+                break
+            current = model_field.related_model
+            found.add(current)
+        if isinstance(field, serializers.ModelSerializer):
+            _collect_serializer_models(field.Meta.model, field, found)
+
+
+def _collect_lookup_models(model, paths: Iterable[str], found: set):
+    for path in paths:
+        current = model
+        for attr in path.lstrip('^=@$').split('__'):
+            try:
+                model_field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                break
+            if not model_field.is_relation:
+                break
+            current = model_field.related_model
+            found.add(current)
+
+
+_dependency_models: Dict[type, FrozenSet[type]] = {}
+# View klassi -> o'z modeli ham kuzatiladimi (ResponseCacheMixin - ha, ConditionalGetMixin - faqat bog'langanlar)
+_dependent_views: Dict[type, bool] = {}
+
+
+def get_dependency_models(view_class) -> FrozenSet[type]:
+    """
+    View javobi bog'liq modellar: o'z modeli, serializer dagi bog'langan obyekt maydonlari,
+    search_fields yo'llari va cache_dependencies
+    """
+    found = _dependency_models.get(view_class)
+    if found is None:
+        view = view_class()
+        model = view.queryset.model
+        found = {model, *getattr(view_class, 'cache_dependencies', ())}
+        _collect_serializer_models(model, view.get_serializer_class()(), found)
+        _collect_lookup_models(model, getattr(view_class, 'search_fields', None) or (), found)
+        found = frozenset(found)
+        _dependency_models[view_class] = found
+    return found
+
+
+def register_dependent_view(view_class, include_own_model: bool):
+    """
+    Mixin lar __init_subclass__ idan: view bog'liq modellarining yozishlari kuzatiladi
+    """
+    _dependent_views[view_class] = _dependent_views.get(view_class, False) or include_own_model
+
+
+def get_watched_models() -> set:
+    watched = set()
+    for view_class, include_own_model in _dependent_views.items():
+        if getattr(view_class, 'queryset', None) is None:
+            continue
+        own_model = view_class.queryset.model
+        watched.update(
+            model for model in get_dependency_models(view_class)
+            if include_own_model or model is not own_model
+        )
+    return watched
+
+
+def connect_invalidation_signals():
+    """
+    post_save / post_delete faqat kuzatiladigan modellarga (cache langan javoblar va ro'yxat ETag lari uchun) (apps.py ready() da, views import qilingandan keyin).
+    Sender siz ulanmaydi: har bir modeldagi post_delete listener Django fast-delete ini o'chiradi
+    (cascade qatorlari Python ga yuklanib, har biriga signal yuboriladi).
+    """
+    for model in get_watched_models():
+        label = model._meta.label_lower
+        post_save.connect(invalidate_on_write, sender=model, dispatch_uid=f'response_cache_post_save:{label}')
+        post_delete.connect(invalidate_on_write, sender=model, dispatch_uid=f'response_cache_post_delete:{label}')
+
+
+class ResponseCacheMixin:
+    """
+    ViewSet uchun: list/retrieve javoblarini RESPONSE_CACHE_ALIAS da saqlash.
+    Bog'liq modellar serializer maydonlari va search_fields yo'llaridan avtomatik aniqlanadi,
+    qo'shimchalari cache_dependencies da ko'rsatiladi.
+    Permission tekshiruvi (initial) cache dan oldin ishlaydi.
+    """
+    cache_dependencies = ()
+    cache_timeout = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        register_dependent_view(cls, include_own_model=True)
+
+    def get_cache_dependency_labels(self) -> FrozenSet[str]:
+        return frozenset(model._meta.label_lower for model in get_dependency_models(type(self)))
+
+    def get_response_cache_key(self, request) -> str:
+        generations = get_generations(self.get_cache_dependency_labels())
+
+        principal = getattr(request, 'auth_principal', None)
+        query = sorted((name, values) for name, values in request.query_params.lists())
+        raw = '|'.join([
+            request.get_host(),
+            request.path,
+            repr(query),
+            *(f'{label}={token}' for label, token in generations),
+        ])
+        digest = hashlib.md5(raw.encode()).hexdigest()
+        return f'resp:{type(self).__name__}:{self.action}:{principal.role}:{digest}'
+
+    def _cache_enabled(self, request) -> bool:
+        return settings.RESPONSE_CACHE_ENABLED and getattr(request, 'auth_principal', None) is not None
+
+    def _cached_response(self, request, entry):
+        data, headers = entry
+        etag = headers.get('ETag')
+        last_modified = parse_http_date_safe(headers['Last-Modified']) if 'Last-Modified' in headers else None
+        response = None
+        if etag or last_modified:
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = Response(data)
+        for name, value in headers.items():
+            response[name] = value
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def _cached(self, handler, request, *args, **kwargs):
+        if not self._cache_enabled(request):
+            return handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = self.get_response_cache_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            _count('hits')
+            return self._cached_response(request, entry)
+
+        _count('misses')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK and isinstance(response, Response):
+            headers = {name: response[name] for name in STORED_HEADERS if response.has_header(name)}
+            timeout = self.cache_timeout if self.cache_timeout is not None else settings.RESPONSE_CACHE_TIMEOUT
+            cache.set(key, (response.data, headers), timeout)
+            _count('stores')
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached(super().retrieve, request, *args, **kwargs)
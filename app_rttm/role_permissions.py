@@ -2,6 +2,8 @@
 Role va permission tizimi - keyingi qadamlar uchun
 """
 
+from functools import lru_cache
+
 # Role lar va ularning ruxsatlari
 ROLE_PERMISSIONS = {
     'admin': {
@@ -50,43 +52,125 @@ ROLE_PERMISSIONS = {
     }
 }
 
+# Cheklovsiz role lar ('creater' - creator ning eski yozilishi, ikkalasi ham qo'llab-quvvatlanadi)
+ADMIN_ROLES = frozenset({'admin', 'creator', 'creater'})
+MANAGER_ROLES = ADMIN_ROLES | {'manager'}
+TECHNICIAN_ROLES = MANAGER_ROLES | {'technician'}
+
+ROLE_ALIASES = {
+    'creater': 'creator',
+}
+
+# Ruxsat -> HTTP method lar
+PERMISSION_METHODS = {
+    'read': ('GET', 'HEAD', 'OPTIONS'),
+    'write': ('POST', 'PUT', 'PATCH'),
+    'delete': ('DELETE',),
+}
+METHOD_BITS = {
+    method: 1 << index
+    for index, method in enumerate(('GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE'))
+}
+
+_TERMINAL = ''
+
+
+class PrefixTrie:
+    """
+    Endpoint prefikslari uchun belgi (char) darajasidagi trie: tekshiruv O(path uzunligi)
+    """
+
+    def __init__(self, prefixes=()):
+        self.root = {}
+        for prefix in prefixes:
+            node = self.root
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node[_TERMINAL] = True
+
+    def match(self, path: str) -> bool:
+        """path trie dagi biror prefiks bilan boshlanadimi"""
+        node = self.root
+        if _TERMINAL in node:
+            return True
+        for char in path:
+            node = node.get(char)
+            if node is None:
+                return False
+            if _TERMINAL in node:
+                return True
+        return False
+
+
+class CompiledRole:
+    """
+    Bitta role uchun oldindan hisoblangan ruxsatlar
+    """
+    __slots__ = ('name', 'all_endpoints', 'endpoints', 'method_mask', 'methods')
+
+    def __init__(self, name, role_info):
+        endpoints = role_info.get('endpoints', [])
+        permissions = role_info.get('permissions', [])
+
+        self.name = name
+        self.all_endpoints = name in ADMIN_ROLES or '*' in endpoints
+        self.endpoints = PrefixTrie(e for e in endpoints if e != '*')
+        self.methods = tuple(
+            method for permission in ('read', 'write', 'delete') if permission in permissions
+            for method in PERMISSION_METHODS[permission]
+        )
+        self.method_mask = 0
+        for method in self.methods:
+            self.method_mask |= METHOD_BITS[method]
+
+    def allows_endpoint(self, endpoint):
+        return self.all_endpoints or self.endpoints.match(endpoint)
+
+    def allows_method(self, method):
+        return bool(self.method_mask & METHOD_BITS.get(method, 0))
+
+
+def compile_role_permissions(role_permissions):
+    """ROLE_PERMISSIONS ni startup da bir marta kompilyatsiya qilish"""
+    compiled = {name: CompiledRole(name, info) for name, info in role_permissions.items()}
+    for alias, target in ROLE_ALIASES.items():
+        if target in compiled and alias not in compiled:
+            compiled[alias] = compiled[target]
+    return compiled
+
+
+COMPILED_ROLES = compile_role_permissions(ROLE_PERMISSIONS)
+
+
 def get_role_permissions(role):
     """Role uchun ruxsatlarni olish"""
-    return ROLE_PERMISSIONS.get(role, {})
+    return ROLE_PERMISSIONS.get(ROLE_ALIASES.get(role, role), {})
+
 
 def check_endpoint_permission(role, endpoint, method='GET'):
     """Endpoint uchun ruxsat tekshirish"""
-    role_info = get_role_permissions(role)
-    if not role_info:
+    compiled = COMPILED_ROLES.get(role)
+    if compiled is None:
         return False
-    
-    # Admin va creator uchun barcha ruxsat
-    if role in ['admin', 'creator', 'creater']:
-        return True
-    
-    # Endpoint larni tekshirish
-    allowed_endpoints = role_info.get('endpoints', [])
-    if '*' in allowed_endpoints:
-        return True
-    
-    # Aniq endpoint tekshirish
-    for allowed_endpoint in allowed_endpoints:
-        if endpoint.startswith(allowed_endpoint):
-            return True
-    
-    return False
+    return compiled.allows_endpoint(endpoint)
+
 
 def get_allowed_methods(role):
-    """Role uchun ruxsatli method larni olish"""
-    role_info = get_role_permissions(role)
-    permissions = role_info.get('permissions', [])
-    
-    methods = []
-    if 'read' in permissions:
-        methods.extend(['GET', 'HEAD', 'OPTIONS'])
-    if 'write' in permissions:
-        methods.extend(['POST', 'PUT', 'PATCH'])
-    if 'delete' in permissions:
-        methods.append('DELETE')
-    
-    return methods
+    """Role uchun ruxsatli method larni olish (oldindan hisoblangan tuple)"""
+    compiled = COMPILED_ROLES.get(role)
+    return compiled.methods if compiled else ()
+
+
+def is_method_allowed(role, method):
+    """Method role uchun ruxsat etilganmi (bitmask orqali)"""
+    compiled = COMPILED_ROLES.get(role)
+    return compiled is not None and compiled.allows_method(method)
+
+
+@lru_cache(maxsize=4096)
+def is_request_allowed(role, endpoint, method):
+    """(role, endpoint, method) bo'yicha yakuniy qaror - LRU cache bilan"""
+    compiled = COMPILED_ROLES.get(role)
+    if compiled is None:
+        return False
+    return compiled.allows_method(method) and compiled.allows_endpoint(endpoint)
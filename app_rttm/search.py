@@ -0,0 +1,119 @@
+"""
+PostgreSQL qidiruvi:
+- full-text search uchun DRF filter backend (SearchFilter o'rniga, GIN indeksli tsvector ustuni bo'yicha)
+- inventar/seriya raqami bo'yicha tezkor prefiks va pg_trgm (xatoga chidamli) qidiruv
+"""
+
+import logging
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+
+from rest_framework import filters
+
+from .models import SEARCH_CONFIG, Device
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_FIELDS = ('id', 'inventory_number', 'serial_number', 'condition')
+
+# alias -> pg_trgm o'rnatilganmi (process ichida bir marta tekshiriladi)
+_trigram_available = {}
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    ?search= bo'yicha view.search_vector_field (standart: 'search_vector') ustunidan qidirish.
+    Har bir so'z prefiks sifatida qidiriladi (INV-00 -> inv:* & 00:*), natijalar rank bo'yicha saralanadi.
+    ?ordering= berilsa OrderingFilter tartibi ustun turadi.
+    """
+    rank_annotation = 'search_rank'
+
+    def get_search_query(self, request):
+        terms = []
+        for param in self.get_search_terms(request):
+            terms.extend(term.lower() for term in _TERM_RE.findall(param))
+        if not terms:
+            return None
+        raw = ' & '.join(f"{term}:*" for term in terms)
+        return SearchQuery(raw, search_type='raw', config=SEARCH_CONFIG)
+
+    def filter_queryset(self, request, queryset, view):
+        vector_field = getattr(view, 'search_vector_field', 'search_vector')
+        if connections[queryset.db].vendor != 'postgresql' or not hasattr(queryset.model, vector_field):
+            return super().filter_queryset(request, queryset, view)
+
+        query = self.get_search_query(request)
+        if query is None:
+            return queryset
+
+        return (
+            queryset
+            .filter(**{vector_field: query})
+            .annotate(**{self.rank_annotation: SearchRank(F(vector_field), query)})
+            .order_by(f'-{self.rank_annotation}', *(queryset.query.order_by or queryset.model._meta.ordering))
+        )
+
+
+def trigram_available(using: str = 'default') -> bool:
+    """
+    pg_trgm kengaytmasi o'rnatilganmi (0005 migratsiyasi uni faqat mavjud bo'lsa o'rnatadi)
+    """
+    if using not in _trigram_available:
+        connection = connections[using]
+        available = False
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                available = cursor.fetchone() is not None
+        if not available:
+            logger.warning("pg_trgm o'rnatilmagan - lookup da fuzzy qidiruv o'rniga icontains ishlatiladi")
+        _trigram_available[using] = available
+    return _trigram_available[using]
+
+
+def lookup_devices(query: str, limit: int = 10, queryset=None):
+    """
+    Inventar yoki seriya raqami bo'yicha eng mos `limit` ta qurilma (kompakt dict lar).
+    Avval prefiks (UPPER(...) text_pattern_ops indeksi), yetmasa pg_trgm o'xshashlik (GIN indeksi) bo'yicha.
+    """
+    if queryset is None:
+        queryset = Device.objects.all()
+    queryset = queryset.order_by()
+
+    prefix = Q(inventory_number__istartswith=query) | Q(serial_number__istartswith=query)
+    results = [
+        dict(row, match='prefix')
+        for row in queryset.filter(prefix).order_by('inventory_number').values(*LOOKUP_FIELDS)[:limit]
+    ]
+    if len(results) >= limit:
+        return results
+
+    found = [row['id'] for row in results]
+    rest = queryset.exclude(id__in=found)
+    remaining = limit - len(results)
+
+    if trigram_available(queryset.db):
+        fuzzy = (
+            rest
+            .filter(Q(inventory_number__trigram_similar=query) | Q(serial_number__trigram_similar=query))
+            .annotate(similarity=Greatest(
+                TrigramSimilarity('inventory_number', query),
+                TrigramSimilarity('serial_number', query),
+            ))
+            .order_by('-similarity', 'inventory_number')
+        )
+    else:
+        fuzzy = (
+            rest
+            .filter(Q(inventory_number__icontains=query) | Q(serial_number__icontains=query))
+            .order_by('inventory_number')
+        )
+
+    results.extend(dict(row, match='fuzzy') for row in fuzzy.values(*LOOKUP_FIELDS)[:remaining])
+    return results
@@ -1,6 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from drf_spectacular.utils import extend_schema_field
+from .fieldsets import SparseFieldsetMixin
 from .models import (
     Building, BuildingImage,
     Room, RoomImage,
@@ -29,15 +31,120 @@ class DeviceMoveSerializer(serializers.Serializer):
         allow_null=True
     )
     reason = serializers.CharField(required=False, allow_blank=True)
+    # Mijoz ko'rgan joylashuv versiyasi (joylashuv hali yo'q bo'lsa 0)
+    version = serializers.IntegerField(required=False, min_value=0)
+
+
+@extend_schema_field({'oneOf': [{'type': 'integer'}, {'type': 'string'}]})
+class DeviceReferenceField(serializers.Field):
+    """Qurilma ID si (son) yoki inventar raqami (satr)"""
+    default_error_messages = {'invalid': "Qurilma ID si (son) yoki inventar raqami (satr) kutilgan"}
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool) or not isinstance(data, (int, str)):
+            self.fail('invalid')
+        if isinstance(data, str):
+            data = data.strip()
+            if not data:
+                self.fail('invalid')
+        return data
+
+    def to_representation(self, value):
+        return value
+
+
+class DeviceBulkMoveSerializer(serializers.Serializer):
+    """Device bulk move action"""
+    devices = serializers.ListField(
+        child=DeviceReferenceField(),
+        allow_empty=False,
+        max_length=settings.API_BULK_MAX_ITEMS,
+    )
+    room = serializers.PrimaryKeyRelatedField(queryset=Room.objects.select_related('building'))
+    responsible_person = serializers.PrimaryKeyRelatedField(
+        queryset=ResponsiblePerson.objects.all(),
+        required=False,
+        allow_null=True
+    )
+    reason = serializers.CharField(required=False, allow_blank=True)
 
 
 class DeviceChangeConditionSerializer(serializers.Serializer):
     """Device condition change action"""
     new_condition = serializers.ChoiceField(choices=Device.CONDITION_CHOICES)
     reason = serializers.CharField(required=False, allow_blank=True)
+    # Mijoz ko'rgan qurilma versiyasi
+    version = serializers.IntegerField(required=False, min_value=1)
+
+
+class DeviceLookupQuerySerializer(serializers.Serializer):
+    """Device lookup query params"""
+    q = serializers.CharField(min_length=2, max_length=100, trim_whitespace=True)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=50, default=10)
+
+
+class DeviceExportQuerySerializer(serializers.Serializer):
+    """Device export query params"""
+    export_format = serializers.ChoiceField(choices=('csv', 'ndjson'), required=False, default='csv')
+
+
+class BulkQuerySerializer(serializers.Serializer):
+    """Bulk write query params"""
+    on_error = serializers.ChoiceField(choices=('abort', 'skip'), required=False, default='abort')
+
+
+class DeviceImportQuerySerializer(BulkQuerySerializer):
+    """Device import query params"""
+
+
+class DeviceImportRowSerializer(serializers.ModelSerializer):
+    """
+    Import qatori: faqat format tekshiruvi (bazaga murojaat yo'q).
+    Inventar raqami takrorlanishi, device_type / room / responsible_person mavjudligi
+    butun paket uchun bitta so'rov bilan device_import.py da tekshiriladi.
+    """
+    inventory_number = serializers.CharField(max_length=100)
+    # ID yoki qurilma turi nomi
+    device_type = serializers.CharField(max_length=255)
+    room = serializers.IntegerField(required=False, allow_null=True, min_value=1)
+    responsible_person = serializers.IntegerField(required=False, allow_null=True, min_value=1)
+    position_description = serializers.CharField(max_length=255, required=False, allow_blank=True, allow_null=True)
+
+    class Meta:
+        model = Device
+        fields = (
+            'device_type',
+            'inventory_number',
+            'serial_number',
+            'condition',
+            'purchase_date',
+            'purchase_price',
+            'warranty_until',
+            'ip_address',
+            'mac_address',
+            'notes',
+            'status',
+            'room',
+            'responsible_person',
+            'position_description',
+        )
+
+    def validate(self, attrs):
+        if attrs.get('responsible_person') and not attrs.get('room'):
+            raise serializers.ValidationError({'room': "Mas'ul shaxs faqat xona bilan birga beriladi"})
+        return attrs
+
 
+class DeviceLookupSerializer(serializers.Serializer):
+    """Compact device lookup result"""
+    id = serializers.IntegerField()
+    inventory_number = serializers.CharField()
+    serial_number = serializers.CharField(allow_null=True)
+    condition = serializers.CharField()
+    match = serializers.ChoiceField(choices=('prefix', 'fuzzy'))
 
-class BuildingSerializer(serializers.ModelSerializer):
+
+class BuildingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Bino ma'lumotlari"""
 
     class Meta:
@@ -54,7 +161,7 @@ class BuildingSerializer(serializers.ModelSerializer):
 
 
 
-class BuildingImageSerializer(serializers.ModelSerializer):
+class BuildingImageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Bino rasmlari"""
 
     class Meta:
@@ -69,7 +176,7 @@ class BuildingImageSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ('id', 'uploaded_at')
 
-class BuildingImageCreateSerializer(serializers.ModelSerializer):
+class BuildingImageCreateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for creating building images.
 
@@ -97,7 +204,7 @@ class BuildingImageCreateSerializer(serializers.ModelSerializer):
             )
         return building_image
 
-class RoomSerializer(serializers.ModelSerializer):
+class RoomSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Xona ma'lumotlari"""
     building_name = serializers.CharField(source='building.name', read_only=True)
 
@@ -116,7 +223,7 @@ class RoomSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_by', 'updated_by', 'created_at', 'updated_at')
 
 
-class RoomImageSerializer(serializers.ModelSerializer):
+class RoomImageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Xona rasmlari"""
 
     class Meta:
@@ -131,7 +238,7 @@ class RoomImageSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'uploaded_at')
 
 
-class ResponsiblePersonSerializer(serializers.ModelSerializer):
+class ResponsiblePersonSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Mas'ul shaxslar"""
     user_username = serializers.CharField(source='user.username', read_only=True)
     building_name = serializers.CharField(source='building.name', read_only=True)
@@ -155,7 +262,7 @@ class ResponsiblePersonSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_by', 'updated_by', 'created_at', 'updated_at')
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Qurilma kategoriyalari"""
     parent_name = serializers.CharField(source='parent.name', read_only=True)
 
@@ -174,7 +281,7 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_by', 'updated_by', 'created_at', 'updated_at')
 
 
-class DeviceTypeSerializer(serializers.ModelSerializer):
+class DeviceTypeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Qurilma turlari"""
     category_name = serializers.CharField(source='category.name', read_only=True)
 
@@ -194,7 +301,7 @@ class DeviceTypeSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_by', 'updated_by', 'created_at', 'updated_at')
 
 
-class DeviceSerializer(serializers.ModelSerializer):
+class DeviceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Qurilmalar"""
     device_type_name = serializers.CharField(source='device_type.name', read_only=True)
     category_name = serializers.CharField(source='device_type.category.name', read_only=True)
@@ -214,13 +321,17 @@ class DeviceSerializer(serializers.ModelSerializer):
             'ip_address',
             'mac_address',
             'notes',
+            'version',
             'created_at',
             'updated_at',
         )
-        read_only_fields = ('id', 'created_by', 'updated_by', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'created_by', 'updated_by', 'created_at', 'updated_at', 'version')
 
     def validate_inventory_number(self, value):
         """Inventar raqamini tekshirish"""
+        if self.context.get('bulk'):
+            # /bulk/ da butun paket uchun bitta so'rov bilan tekshiriladi (bulk.py)
+            return value
         if self.instance:  # Update paytida
             if Device.objects.exclude(pk=self.instance.pk).filter(inventory_number=value).exists():
                 raise serializers.ValidationError("Bu inventar raqam allaqachon mavjud")
@@ -230,7 +341,7 @@ class DeviceSerializer(serializers.ModelSerializer):
         return value
 
 
-class DeviceImageSerializer(serializers.ModelSerializer):
+class DeviceImageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Qurilma rasmlari"""
 
     class Meta:
@@ -245,7 +356,7 @@ class DeviceImageSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'uploaded_at')
 
 
-class DeviceLocationSerializer(serializers.ModelSerializer):
+class DeviceLocationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Qurilma joylashuvi"""
     device_info = serializers.CharField(source='device.inventory_number', read_only=True)
     room_name = serializers.CharField(source='room.name', read_only=True)
@@ -263,13 +374,14 @@ class DeviceLocationSerializer(serializers.ModelSerializer):
             'building_name',
             'responsible_person',
             'responsible_name',
+            'version',
             'created_at',
             'updated_at',
         )
-        read_only_fields = ('id', 'created_by', 'updated_by', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'created_by', 'updated_by', 'created_at', 'updated_at', 'version')
 
 
-class DeviceLocationHistorySerializer(serializers.ModelSerializer):
+class DeviceLocationHistorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Qurilma ko'chirish tarixi"""
     device_info = serializers.CharField(source='device.inventory_number', read_only=True)
     old_building_name = serializers.CharField(source='old_building.name', read_only=True)
@@ -303,7 +415,7 @@ class DeviceLocationHistorySerializer(serializers.ModelSerializer):
         )
 
 
-class DeviceConditionHistorySerializer(serializers.ModelSerializer):
+class DeviceConditionHistorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Qurilma holati tarixi"""
     device_info = serializers.CharField(source='device.inventory_number', read_only=True)
     changed_by_username = serializers.CharField(source='changed_by.username', read_only=True)
@@ -327,7 +439,7 @@ class DeviceConditionHistorySerializer(serializers.ModelSerializer):
         )
 
 
-class RepairRequestSerializer(serializers.ModelSerializer):
+class RepairRequestSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Ta'mirlash so'rovlari"""
     device_info = serializers.CharField(source='device.inventory_number', read_only=True)
     requested_by_username = serializers.CharField(source='requested_by.username', read_only=True)
@@ -354,7 +466,7 @@ class RepairRequestSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_by', 'updated_by', 'created_at', 'updated_at')
 
 
-class ServiceLogSerializer(serializers.ModelSerializer):
+class ServiceLogSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Xizmat ko'rsatish jurnali"""
     device_info = serializers.CharField(source='device.inventory_number', read_only=True)
     performed_by_username = serializers.CharField(source='performed_by.username', read_only=True)
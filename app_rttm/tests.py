@@ -1,13 +1,82 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import threading
+import time
+import uuid
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock, skipIf
+
+import requests
+from django.test import TestCase, SimpleTestCase, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from rest_framework.test import APITestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APITestCase, APIRequestFactory
 from rest_framework import status
+from django.core.cache import caches
 from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_delete, post_save
+from django.test.utils import CaptureQueriesContext
+
+from .auth_cache import LocalLRUCache, TwoLevelCache
+from .auth_jwt import jwt
+from .auth_service import AuthService, auth_service
+from .advanced_permissions import AdvancedAuthPermission, TechnicianOnlyPermission
+from .conditional import VersionConflict
+from .device_moves import change_device_condition
+from .fast_read import FastListMixin
+from .models import (
+    Building, Category, Device, DeviceConditionHistory, DeviceLocation, DeviceLocationHistory, DeviceType,
+    RepairRequest, ResponsiblePerson, Room, ServiceLog,
+)
+from .views import DeviceTypeViewSet, DeviceViewSet
+from .pagination import HybridPagination, KeysetCursorPagination
+from .parsers import FastJSONParser
+from .renderers import FastJSONRenderer
+from .response_cache import get_response_cache_stats
+from .search import trigram_available
+from .principal import AuthPrincipal, get_principal
+from .role_permissions import (
+    ROLE_PERMISSIONS, check_endpoint_permission, get_allowed_methods, is_request_allowed,
+)
+from .circuit_breaker import CircuitBreaker
 
 User = get_user_model()
 
 
+# Standart DatabaseCache so'rovlari API testlaridagi so'rovlar sonini o'zgartirmasligi uchun
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'auth': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'auth-test'},
+    'responses': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'responses-test'},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AuthenticatedTestCase(TestCase):
+    """
+    Auth servisi mock langan API testlari uchun asos: get_current_user_role token bo'yicha
+    role_for_token() natijasini qaytaradi (standart - auth_payload)
+    """
+
+    auth_payload = {'userId': 1, 'username': 'admin', 'role': 'admin'}
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(auth_service, 'get_current_user_role', side_effect=self.role_for_token)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def role_for_token(self, token):
+        return self.auth_payload
+
+
 class BasicTestCase(TestCase):
     """Basic tests for the Building API"""
     
@@ -84,3 +153,1532 @@ class ManagementCommandTestCase(TestCase):
             self.assertTrue(True)
         except Exception as e:
             self.fail(f"Check command failed: {e}")
+
+
+AUTH_TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-default'},
+    'auth': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-auth'},
+}
+
+
+def make_auth_response(status_code=200, payload=None):
+    response = mock.Mock()
+    response.status_code = status_code
+    response.json.return_value = payload or {}
+    response.text = ''
+    return response
+
+
+@override_settings(CACHES=AUTH_TEST_CACHES, AUTH_CACHE_ALIAS='auth')
+class AuthCacheTestCase(SimpleTestCase):
+    """Auth natijalari uchun ikki darajali cache testlari"""
+
+    def setUp(self):
+        caches['auth'].clear()
+
+    def test_local_lru_evicts_oldest(self):
+        lru = LocalLRUCache(max_size=2, timeout=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('c'), 3)
+
+    def test_local_lru_expires(self):
+        lru = LocalLRUCache(max_size=2, timeout=60)
+        lru.set('a', 1, timeout=0)
+        self.assertIsNone(lru.get('a'))
+
+    def test_two_level_cache_fills_local_from_shared(self):
+        first = TwoLevelCache(alias='auth')
+        second = TwoLevelCache(alias='auth')
+        first.set('key', {'role': 'admin'}, 60)
+
+        self.assertEqual(second.get('key'), {'role': 'admin'})
+        self.assertEqual(second.get('key'), {'role': 'admin'})
+        self.assertEqual(second.stats['shared_hits'], 1)
+        self.assertEqual(second.stats['local_hits'], 1)
+
+    def test_role_is_shared_between_workers(self):
+        """Bitta worker tekshirgan token boshqa worker da qayta tekshirilmaydi"""
+        worker_a, worker_b = AuthService(), AuthService()
+        payload = {'userId': 1, 'username': 'ali', 'role': 'admin'}
+
+        with mock.patch('app_rttm.auth_service.requests.Session.get',
+                        return_value=make_auth_response(200, payload)) as upstream:
+            self.assertEqual(worker_a.get_current_user_role('token-1'), payload)
+            self.assertEqual(worker_b.get_current_user_role('token-1'), payload)
+
+        self.assertEqual(upstream.call_count, 1)
+
+
+@override_settings(CACHES=AUTH_TEST_CACHES, AUTH_CACHE_ALIAS='auth')
+class AuthSingleFlightTestCase(SimpleTestCase):
+    """Bir token uchun parallel tekshiruvlarni birlashtirish testlari"""
+
+    payload = {'userId': 7, 'username': 'vali', 'role': 'user'}
+
+    def setUp(self):
+        caches['auth'].clear()
+
+    def test_parallel_misses_share_one_upstream_call(self):
+        service = AuthService()
+
+        def slow_get(*args, **kwargs):
+            time.sleep(0.2)
+            return make_auth_response(200, self.payload)
+
+        results = []
+        with mock.patch('app_rttm.auth_service.requests.Session.get', side_effect=slow_get) as upstream:
+            threads = [
+                threading.Thread(target=lambda: results.append(service.get_current_user_role('fresh-token')))
+                for _ in range(10)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(upstream.call_count, 1)
+        self.assertEqual(results, [self.payload] * 10)
+        self.assertEqual(service.single_flight.in_flight(), 0)
+
+    def test_waits_for_other_worker_result(self):
+        """Lock boshqa worker da bo'lsa, uning natijasi umumiy cache dan olinadi"""
+        owner, waiter = AuthService(), AuthService()
+        cache_key = owner._get_cache_key('auth_user_role', 'shared-token')
+        owner.cache.shared.add(f'{cache_key}_lock', 1, 5)
+
+        def finish_owner():
+            time.sleep(0.1)
+            owner._store(cache_key, self.payload, 60)
+            owner.cache.shared.delete(f'{cache_key}_lock')
+
+        threading.Thread(target=finish_owner).start()
+        with mock.patch('app_rttm.auth_service.requests.Session.get') as upstream:
+            self.assertEqual(waiter.get_current_user_role('shared-token'), self.payload)
+
+        upstream.assert_not_called()
+
+
+class _FakeAuthHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_GET(self):
+        body = json.dumps({'userId': 1, 'username': 'pool', 'role': 'admin'}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(CACHES=AUTH_TEST_CACHES, AUTH_CACHE_ALIAS='auth')
+class AuthConnectionPoolTestCase(SimpleTestCase):
+    """Auth API uchun keep-alive connection pool testlari"""
+
+    def setUp(self):
+        caches['auth'].clear()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _FakeAuthHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_connections_are_reused(self):
+        with self.settings(AUTH_BASE_URL=f'http://127.0.0.1:{self.server.server_port}'):
+            service = AuthService()
+        for token in ('token-a', 'token-b', 'token-c'):
+            self.assertEqual(service.get_current_user_role(token)['username'], 'pool')
+
+        stats = service.get_pool_stats()
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['connections'], 1)
+        self.assertEqual(stats['reused'], 2)
+
+    def test_timeouts_are_split(self):
+        with self.settings(AUTH_CONNECT_TIMEOUT=1, AUTH_READ_TIMEOUT=4):
+            service = AuthService()
+        with mock.patch('app_rttm.auth_service.requests.Session.get',
+                        return_value=make_auth_response(200, {'role': 'user'})) as upstream:
+            service.get_current_user_role('timeout-token')
+        self.assertEqual(upstream.call_args.kwargs['timeout'], (1, 4))
+
+
+@skipIf(jwt is None, "PyJWT o'rnatilmagan")
+@override_settings(CACHES=AUTH_TEST_CACHES, AUTH_CACHE_ALIAS='auth', AUTH_JWT_VERIFY=True,
+                   AUTH_JWKS_URL='https://auth.test/.well-known/jwks.json', AUTH_JWT_ALGORITHMS=['RS256'])
+class AuthJWTVerificationTestCase(SimpleTestCase):
+    """JWT larni lokal (offline) tekshirish testlari"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        cls.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        cls.other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        jwk = jwt.algorithms.RSAAlgorithm.to_jwk(cls.private_key.public_key(), as_dict=True)
+        jwk.update({'kid': 'test-key', 'use': 'sig', 'alg': 'RS256'})
+        cls.jwks = {'keys': [jwk]}
+
+    def setUp(self):
+        caches['auth'].clear()
+        self.service = AuthService()
+
+    def make_token(self, key=None, expires_in=300, **claims):
+        payload = {'userId': 5, 'username': 'jwt-user', 'role': 'admin', 'permissions': ['read'],
+                   'exp': int(time.time()) + expires_in}
+        payload.update(claims)
+        return jwt.encode(payload, key or self.private_key, algorithm='RS256', headers={'kid': 'test-key'})
+
+    def fake_get(self, url, **kwargs):
+        if url.endswith('/jwks.json'):
+            return make_auth_response(200, self.jwks)
+        return make_auth_response(200, {'userId': 5, 'username': 'online', 'role': 'user'})
+
+    def test_valid_token_is_verified_locally(self):
+        with mock.patch('app_rttm.auth_service.requests.Session.get', side_effect=self.fake_get) as upstream:
+            first = self.service.get_current_user_role(self.make_token())
+            second = self.service.get_current_user_role(self.make_token(userId=6))
+
+        self.assertEqual(first['username'], 'jwt-user')
+        self.assertEqual(first['permissions'], ['read'])
+        self.assertEqual(second['userId'], 6)
+        # Faqat bitta JWKS so'rovi, my-role ga murojaat yo'q
+        self.assertEqual([c.args[0] for c in upstream.call_args_list], ['https://auth.test/.well-known/jwks.json'])
+
+    @override_settings(AUTH_CACHE_SOFT_TIMEOUT=0)
+    def test_cached_token_is_not_revalidated_remotely(self):
+        service = AuthService()
+        token = self.make_token()
+        with mock.patch('app_rttm.auth_service.requests.Session.get', side_effect=self.fake_get) as upstream, \
+                mock.patch.object(service, '_schedule_refresh') as refresh:
+            service.get_current_user_role(token)
+            self.assertEqual(service.get_current_user_role(token)['username'], 'jwt-user')
+        refresh.assert_not_called()
+        self.assertFalse(any('my-role' in c.args[0] for c in upstream.call_args_list))
+
+    def test_expired_token_is_rejected_without_round_trip(self):
+        with mock.patch('app_rttm.auth_service.requests.Session.get', side_effect=self.fake_get) as upstream:
+            self.assertIsNone(self.service.get_current_user_role(self.make_token(expires_in=-3600)))
+        self.assertFalse(any('my-role' in c.args[0] for c in upstream.call_args_list))
+
+    def test_wrong_signature_is_rejected(self):
+        with mock.patch('app_rttm.auth_service.requests.Session.get', side_effect=self.fake_get):
+            self.assertIsNone(self.service.get_current_user_role(self.make_token(key=self.other_key)))
+
+    def test_missing_claims_fall_back_to_role_endpoint(self):
+        token = self.make_token(role=None)
+        with mock.patch('app_rttm.auth_service.requests.Session.get', side_effect=self.fake_get) as upstream:
+            self.assertEqual(self.service.get_current_user_role(token)['username'], 'online')
+        self.assertTrue(upstream.call_args_list[-1].args[0].endswith('/api/auth/my-role'))
+
+    def test_malformed_jwks_falls_back_to_role_endpoint(self):
+        not_json = make_auth_response(200)
+        not_json.json.side_effect = ValueError('Expecting value')
+        for jwks_response in (not_json, make_auth_response(200, {'keys': 'x'}), make_auth_response(200, ['x'])):
+            caches['auth'].clear()
+            service = AuthService()
+
+            def fake_get(url, **kwargs):
+                if url.endswith('/jwks.json'):
+                    return jwks_response
+                return self.fake_get(url, **kwargs)
+
+            with mock.patch('app_rttm.auth_service.requests.Session.get', side_effect=fake_get):
+                self.assertEqual(service.get_current_user_role(self.make_token())['username'], 'online')
+
+
+@override_settings(CACHES=AUTH_TEST_CACHES, AUTH_CACHE_ALIAS='auth')
+class AuthNegativeCacheTestCase(SimpleTestCase):
+    """Rad etilgan token lar uchun negative cache testlari"""
+
+    def setUp(self):
+        caches['auth'].clear()
+
+    def test_rejected_token_is_not_sent_again(self):
+        worker_a, worker_b = AuthService(), AuthService()
+        with mock.patch('app_rttm.auth_service.requests.Session.get',
+                        return_value=make_auth_response(401)) as upstream:
+            for _ in range(5):
+                self.assertIsNone(worker_a.get_current_user_role('expired-token'))
+            self.assertIsNone(worker_b.get_current_user_role('expired-token'))
+            self.assertIsNone(worker_b.get_user_info('expired-token'))
+
+        self.assertEqual(upstream.call_count, 1)
+        self.assertTrue(worker_b.is_token_rejected('expired-token'))
+
+    def test_rejection_expires(self):
+        with self.settings(AUTH_NEGATIVE_CACHE_TIMEOUT=0):
+            service = AuthService()
+        with mock.patch('app_rttm.auth_service.requests.Session.get',
+                        return_value=make_auth_response(401)) as upstream:
+            service.get_current_user_role('expired-token')
+            service.get_current_user_role('expired-token')
+
+        self.assertEqual(upstream.call_count, 2)
+
+
+@override_settings(CACHES=AUTH_TEST_CACHES, AUTH_CACHE_ALIAS='auth', AUTH_CACHE_SOFT_TIMEOUT=0)
+class AuthStaleWhileRevalidateTestCase(SimpleTestCase):
+    """Soft TTL dan keyin fonda yangilash testlari"""
+
+    def setUp(self):
+        caches['auth'].clear()
+        self.service = AuthService()
+
+    def test_stale_role_is_served_and_refreshed_in_background(self):
+        old = {'userId': 1, 'username': 'ali', 'role': 'user'}
+        new = {'userId': 1, 'username': 'ali', 'role': 'admin'}
+        with mock.patch('app_rttm.auth_service.requests.Session.get',
+                        side_effect=[make_auth_response(200, old), make_auth_response(200, new)]) as upstream:
+            self.assertEqual(self.service.get_current_user_role('swr-token'), old)
+            # Soft TTL o'tgan - eski qiymat darhol qaytadi, yangilash fonda
+            self.assertEqual(self.service.get_current_user_role('swr-token'), old)
+            self.service.refresh_executor.shutdown(wait=True)
+
+        self.assertEqual(upstream.call_count, 2)
+        cache_key = self.service._get_cache_key('auth_user_role', 'swr-token')
+        self.assertEqual(self.service.cache.get(cache_key).data, new)
+
+    def test_token_rejected_during_refresh_is_dropped(self):
+        payload = {'userId': 1, 'username': 'ali', 'role': 'user'}
+        with mock.patch('app_rttm.auth_service.requests.Session.get',
+                        side_effect=[make_auth_response(200, payload), make_auth_response(401)]):
+            self.service.get_current_user_role('revoked-token')
+            self.service.get_current_user_role('revoked-token')
+            self.service.refresh_executor.shutdown(wait=True)
+            self.assertIsNone(self.service.get_current_user_role('revoked-token'))
+
+
+@override_settings(CACHES=AUTH_TEST_CACHES, AUTH_CACHE_ALIAS='auth', AUTH_RETRY_BACKOFF=0,
+                   AUTH_CIRCUIT_FAILURE_THRESHOLD=3, AUTH_CIRCUIT_RECOVERY_TIMEOUT=30)
+class AuthCircuitBreakerTestCase(SimpleTestCase):
+    """Circuit breaker va deadline budget testlari"""
+
+    def setUp(self):
+        caches['auth'].clear()
+        self.service = AuthService()
+
+    def test_breaker_opens_and_fails_fast(self):
+        error = requests.exceptions.ConnectionError('down')
+        with mock.patch('app_rttm.auth_service.requests.Session.get', side_effect=error) as upstream:
+            self.assertIsNone(self.service.get_current_user_role('token-1'))
+            self.assertEqual(upstream.call_count, 3)
+            self.assertEqual(self.service.circuit_breaker.get_state(), CircuitBreaker.OPEN)
+
+            # Boshqa worker ham ochiq holatni ko'radi va so'rov yubormaydi
+            self.assertIsNone(AuthService().get_current_user_role('token-2'))
+        self.assertEqual(upstream.call_count, 3)
+
+    def test_non_json_200_counts_as_failure(self):
+        html = make_auth_response(200)
+        html.json.side_effect = ValueError('Expecting value')
+        html.text = '<html>502 Bad Gateway</html>'
+        with mock.patch('app_rttm.auth_service.requests.Session.get', return_value=html) as upstream:
+            self.assertIsNone(self.service.get_current_user_role('token-1'))
+            self.assertIsNone(self.service.get_user_info('token-2'))
+        self.assertEqual(upstream.call_count, 3)
+        self.assertEqual(self.service.circuit_breaker.get_state(), CircuitBreaker.OPEN)
+
+    def test_half_open_allows_single_probe(self):
+        breaker = CircuitBreaker('probe', cache_alias='auth', failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+        self.assertEqual(breaker.get_state(), CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.get_state(), CircuitBreaker.CLOSED)
+
+    def test_half_open_persists_until_probe_succeeds(self):
+        breaker = CircuitBreaker('stuck', cache_alias='auth', failure_threshold=1, recovery_timeout=5,
+                                 failure_window=10)
+        breaker.record_failure()
+        # Uzoq vaqt o'tdi, sinov so'rovi yuborilmadi - circuit o'zi yopilmaydi
+        with mock.patch('time.time', return_value=time.time() + 3600):
+            self.assertEqual(breaker.get_state(), CircuitBreaker.HALF_OPEN)
+            self.assertTrue(breaker.allow_request())
+            breaker.record_failure()
+            self.assertEqual(breaker.get_state(), CircuitBreaker.OPEN)
+
+    def test_expired_entry_served_when_breaker_open(self):
+        payload = {'userId': 1, 'username': 'ali', 'role': 'admin'}
+        cache_key = self.service._get_cache_key('auth_user_role', 'known-token')
+        self.service._store(cache_key, payload, timeout=0)
+        self.service.circuit_breaker._open()
+
+        with mock.patch('app_rttm.auth_service.requests.Session.get') as upstream:
+            self.assertEqual(self.service.get_current_user_role('known-token'), payload)
+        upstream.assert_not_called()
+
+    def test_deadline_caps_total_auth_time(self):
+        def slow_timeout(*args, **kwargs):
+            time.sleep(0.3)
+            raise requests.exceptions.Timeout()
+
+        with self.settings(AUTH_DEADLINE=0.5):
+            service = AuthService()
+        started = time.monotonic()
+        with mock.patch('app_rttm.auth_service.requests.Session.get', side_effect=slow_timeout) as upstream:
+            self.assertIsNone(service.get_current_user_role('slow-token'))
+
+        self.assertLess(time.monotonic() - started, 0.9)
+        self.assertEqual(upstream.call_count, 2)
+
+
+
+@override_settings(CACHES=AUTH_TEST_CACHES, AUTH_CACHE_ALIAS='auth', AUTH_HEDGE_ENABLED=True,
+                   AUTH_HEDGE_DELAY=0.05, AUTH_RETRY_BACKOFF=0)
+class AuthHedgedRequestTestCase(SimpleTestCase):
+    """/me va role endpoint larini hedged so'rash testlari"""
+
+    def setUp(self):
+        caches['auth'].clear()
+        self.service = AuthService()
+        self.role = {'userId': 7, 'username': 'vali', 'role': 'manager'}
+        self.info = dict(self.role, email='vali@example.com')
+
+    def _upstream(self, me_delay):
+        def fake_get(url, **kwargs):
+            if url.endswith('/api/auth/me'):
+                time.sleep(me_delay)
+                return make_auth_response(200, self.info)
+            return make_auth_response(200, self.role)
+        return fake_get
+
+    def test_fast_me_does_not_hedge(self):
+        with mock.patch('app_rttm.auth_service.requests.Session.get',
+                        side_effect=self._upstream(0)) as upstream:
+            self.assertEqual(self.service.get_user_info('hedge-token'), self.info)
+        self.assertEqual(upstream.call_count, 1)
+
+    def test_slow_me_returns_role_and_caches_both(self):
+        started = time.monotonic()
+        with mock.patch('app_rttm.auth_service.requests.Session.get',
+                        side_effect=self._upstream(0.5)) as upstream:
+            self.assertEqual(self.service.get_user_info('hedge-token'), self.role)
+            self.assertLess(time.monotonic() - started, 0.4)
+            self.service.hedge_executor.shutdown(wait=True)
+
+        self.assertEqual(upstream.call_count, 2)
+        # Kechikkan /me javobi ham cache ga yozildi
+        self.assertEqual(self.service.get_user_info('hedge-token'), self.info)
+        self.assertEqual(self.service.get_current_user_role('hedge-token'), self.role)
+
+class AuthPrincipalTestCase(APITestCase):
+    """So'rov principal i bir marta aniqlanishi testlari"""
+
+    admin_payload = {'userId': 42, 'username': 'admin-user', 'role': 'Admin', 'permissions': ['read', 'write']}
+
+    def test_principal_is_immutable(self):
+        principal = AuthPrincipal.from_user_data(self.admin_payload, 'token')
+        self.assertEqual(principal.role, 'admin')
+        self.assertEqual(principal.permissions, frozenset({'read', 'write'}))
+        with self.assertRaises(Exception):
+            principal.role = 'user'
+
+    def test_single_auth_lookup_per_request_and_audit_fields(self):
+        with mock.patch.object(auth_service, 'get_current_user_role', return_value=self.admin_payload) as lookup:
+            response = self.client.post('/api/buildings/', {'name': 'Bosh bino'}, format='json',
+                                        HTTP_AUTHORIZATION='Bearer admin-token')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(lookup.call_count, 1)
+        building = Building.objects.get(pk=response.data['id'])
+        self.assertEqual(building.created_by_id, '42')
+        self.assertEqual(building.created_by_name, 'admin-user')
+
+    def test_advanced_permissions_share_resolved_principal(self):
+        request = Request(APIRequestFactory().get('/api/devices/', HTTP_AUTHORIZATION='Bearer tech-token'))
+        payload = {'userId': 3, 'username': 'tech', 'role': 'technician'}
+        with mock.patch.object(auth_service, 'get_current_user_role', return_value=payload) as lookup:
+            self.assertTrue(AdvancedAuthPermission().has_permission(request, None))
+            self.assertTrue(TechnicianOnlyPermission().has_permission(request, None))
+
+        self.assertEqual(lookup.call_count, 1)
+        self.assertEqual(get_principal(request).username, 'tech')
+
+
+class RolePermissionMatrixTestCase(SimpleTestCase):
+    """Kompilyatsiya qilingan role/endpoint matritsasi testlari"""
+
+    paths = ['/api/', '/api/buildings/', '/api/buildings/5/', '/api/buildings', '/api/devices/1/move/',
+             '/api/device-types/', '/api/repair-requests/', '/api/service-logs/3/', '/admin/']
+    methods = ['GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE', 'TRACE']
+
+    @staticmethod
+    def reference(role, path, method):
+        """Chiziqli qidiruvli eski algoritm"""
+        info = ROLE_PERMISSIONS.get(role, {})
+        endpoints = info.get('endpoints', [])
+        permissions = info.get('permissions', [])
+        endpoint_ok = bool(info) and ('*' in endpoints or any(path.startswith(e) for e in endpoints))
+        methods = []
+        if 'read' in permissions:
+            methods += ['GET', 'HEAD', 'OPTIONS']
+        if 'write' in permissions:
+            methods += ['POST', 'PUT', 'PATCH']
+        if 'delete' in permissions:
+            methods.append('DELETE')
+        return endpoint_ok and method in methods
+
+    def test_matches_linear_scan(self):
+        for role in list(ROLE_PERMISSIONS) + ['unknown']:
+            for path in self.paths:
+                for method in self.methods:
+                    with self.subTest(role=role, path=path, method=method):
+                        self.assertEqual(is_request_allowed(role, path, method), self.reference(role, path, method))
+
+    def test_creater_alias_has_creator_rights(self):
+        self.assertTrue(check_endpoint_permission('creater', '/api/anything/'))
+        self.assertEqual(get_allowed_methods('creater'), get_allowed_methods('creator'))
+
+
+
+class DeviceCursorPaginationTestCase(AuthenticatedTestCase):
+    """Keyset (cursor) pagination testlari"""
+
+    def setUp(self):
+        super().setUp()
+        category = Category.objects.create(name='Kompyuterlar')
+        device_type = DeviceType.objects.create(category=category, name='Noutbuk')
+        Device.objects.bulk_create([
+            Device(device_type=device_type, inventory_number=f'INV-{i:03d}', purchase_date='2024-01-01')
+            for i in range(7)
+        ])
+        # Bir xil created_at - tie lar id bo'yicha ajratiladi
+        Device.objects.filter(inventory_number__in=['INV-002', 'INV-003', 'INV-004']).update(
+            created_at=Device.objects.get(inventory_number='INV-002').created_at
+        )
+
+    def get(self, url):
+        return self.client.get(url, HTTP_AUTHORIZATION='Bearer admin-token')
+
+    def test_cursor_pages_cover_all_rows_without_count(self):
+        expected = list(Device.objects.order_by('-created_at', 'id').values_list('id', flat=True))
+        seen = []
+        url = '/api/devices/?cursor=&page_size=2'
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            self.assertFalse(any('COUNT(' in q['sql'].upper() for q in queries.captured_queries))
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(seen, expected)
+
+    def test_service_log_modes_share_ordering(self):
+        devices = list(Device.objects.all()[:2])
+        ServiceLog.objects.bulk_create([
+            ServiceLog(device=devices[i % 2], service_type='inspection', service_date=f'2024-0{1 + i % 3}-01')
+            for i in range(5)
+        ])
+        page = [item['id'] for item in self.get('/api/service-logs/?page_size=10').data['results']]
+        seen, url = [], '/api/service-logs/?cursor=&page_size=2'
+        while url:
+            response = self.get(url)
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, page)
+
+    def test_page_number_mode_and_page_size_cap(self):
+        response = self.get('/api/devices/?page_size=3')
+        self.assertEqual(response.data['count'], 7)
+        self.assertEqual(len(response.data['results']), 3)
+
+        with mock.patch.object(HybridPagination, 'max_page_size', 4), \
+                mock.patch.object(KeysetCursorPagination, 'max_page_size', 5):
+            self.assertEqual(len(self.get('/api/devices/?page_size=1000').data['results']), 4)
+            self.assertEqual(len(self.get('/api/devices/?cursor=&page_size=1000').data['results']), 5)
+
+
+class FullTextSearchTestCase(AuthenticatedTestCase):
+    """tsvector ustuni va FullTextSearchFilter testlari"""
+
+    def setUp(self):
+        super().setUp()
+        category = Category.objects.create(name='Tarmoq')
+        self.device_type = DeviceType.objects.create(category=category, name='Switch')
+
+    def search(self, query):
+        response = self.client.get('/api/devices/', {'search': query}, HTTP_AUTHORIZATION='Bearer admin-token')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['inventory_number'] for item in response.data['results']]
+
+    def test_vector_is_kept_current_on_save_and_bulk_writes(self):
+        Device.objects.create(device_type=self.device_type, inventory_number='SW-100', purchase_date='2024-01-01')
+        Device.objects.bulk_create([
+            Device(device_type=self.device_type, inventory_number='SW-200', purchase_date='2024-01-01',
+                   notes='Cisco kommutator'),
+        ])
+        self.assertEqual(self.search('cisco'), ['SW-200'])
+
+        Device.objects.filter(inventory_number='SW-100').update(notes='Cisco zaxira')
+        self.assertEqual(sorted(self.search('cisco')), ['SW-100', 'SW-200'])
+        self.assertEqual(self.search('sw-10'), ['SW-100'])
+
+    def test_results_are_ranked_by_weight(self):
+        Device.objects.bulk_create([
+            Device(device_type=self.device_type, inventory_number='NET-1', purchase_date='2024-01-01',
+                   notes='huawei'),
+            Device(device_type=self.device_type, inventory_number='NET-2', purchase_date='2024-01-01',
+                   serial_number='HUAWEI-77'),
+        ])
+        # serial_number (A) notes (C) dan yuqori turadi
+        self.assertEqual(self.search('huawei'), ['NET-2', 'NET-1'])
+        # Qidiriladigan so'z yo'q - filtr qo'llanmaydi
+        self.assertEqual(len(self.search('!!!')), 2)
+
+
+class DeviceLookupTestCase(AuthenticatedTestCase):
+    """Inventar/seriya raqami bo'yicha tezkor lookup testlari"""
+
+    auth_payload = {'userId': 5, 'username': 'texnik', 'role': 'user'}
+
+    def setUp(self):
+        super().setUp()
+        category = Category.objects.create(name='Monitorlar')
+        device_type = DeviceType.objects.create(category=category, name='Dell monitor')
+        Device.objects.bulk_create([
+            Device(device_type=device_type, inventory_number='MON-1001', serial_number='CN-0X1234',
+                   purchase_date='2024-01-01'),
+            Device(device_type=device_type, inventory_number='MON-1002', serial_number='CN-0Y5678',
+                   purchase_date='2024-01-01'),
+            Device(device_type=device_type, inventory_number='PC-2001', serial_number='SN-MON-1009',
+                   purchase_date='2024-01-01'),
+        ])
+
+    def lookup(self, **params):
+        return self.client.get('/api/devices/lookup/', params, HTTP_AUTHORIZATION='Bearer user-token')
+
+    def test_prefix_matches_come_first_with_compact_payload(self):
+        response = self.lookup(q='mon-100')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['inventory_number'] for row in response.data], ['MON-1001', 'MON-1002', 'PC-2001'])
+        self.assertEqual([row['match'] for row in response.data], ['prefix', 'prefix', 'fuzzy'])
+        self.assertEqual(set(response.data[0]), {'id', 'inventory_number', 'serial_number', 'condition', 'match'})
+
+    def test_serial_prefix_and_limit(self):
+        response = self.lookup(q='cn-0', limit=1)
+        self.assertEqual([row['serial_number'] for row in response.data], ['CN-0X1234'])
+
+    def test_query_is_validated(self):
+        self.assertEqual(self.lookup(q='m').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.lookup(q='mon', limit=500).status_code, status.HTTP_400_BAD_REQUEST)
+
+    @skipIf(connection.vendor != 'postgresql', "pg_trgm faqat PostgreSQL uchun")
+    def test_fuzzy_match_tolerates_typos(self):
+        if not trigram_available():
+            self.skipTest("pg_trgm o'rnatilmagan")
+        response = self.lookup(q='MOM-1001')
+        self.assertEqual(response.data[0]['inventory_number'], 'MON-1001')
+        self.assertEqual(response.data[0]['match'], 'fuzzy')
+
+
+class SparseFieldsetTestCase(AuthenticatedTestCase):
+    """?fields= / ?omit= JSON va SQL ni toraytirishi testlari"""
+
+    def setUp(self):
+        super().setUp()
+        category = Category.objects.create(name='Proyektorlar')
+        device_type = DeviceType.objects.create(category=category, name='Epson')
+        Device.objects.create(device_type=device_type, inventory_number='PRJ-1', purchase_date='2024-01-01',
+                              notes='Katta matn ' * 100)
+
+    def get_devices(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/devices/', params, HTTP_AUTHORIZATION='Bearer admin-token')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        select = [q['sql'] for q in queries.captured_queries if 'FROM "app_rttm_device"' in q['sql']][-1]
+        return response.data['results'][0], select
+
+    def test_fields_trims_json_and_columns(self):
+        row, sql = self.get_devices(fields='id,inventory_number')
+        self.assertEqual(set(row), {'id', 'inventory_number'})
+        self.assertNotIn('JOIN', sql)
+        self.assertNotIn('"notes"', sql)
+
+    def test_omit_keeps_required_joins(self):
+        row, sql = self.get_devices(omit='notes,device_type_name')
+        self.assertNotIn('notes', row)
+        self.assertEqual(row['category_name'], 'Proyektorlar')
+        self.assertNotIn('"app_rttm_device"."notes"', sql)
+        self.assertIn('"app_rttm_category"."name"', sql)
+        self.assertNotIn('"app_rttm_devicetype"."manufacturer"', sql)
+
+    def test_full_response_without_params(self):
+        row, sql = self.get_devices()
+        self.assertIn('notes', row)
+        self.assertNotIn('search_vector', sql)
+
+    def test_writes_ignore_fieldsets(self):
+        device = Device.objects.get()
+        response = self.client.patch(f'/api/devices/{device.pk}/?fields=id', {'notes': 'Yangi'},
+                                     content_type='application/json', HTTP_AUTHORIZATION='Bearer admin-token')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['notes'], 'Yangi')
+        self.assertIn('inventory_number', response.data)
+
+    def test_cursor_with_fields_and_ordering(self):
+        device_type = DeviceType.objects.get()
+        Device.objects.bulk_create([
+            Device(device_type=device_type, inventory_number=f'PRJ-{i}', purchase_date='2024-01-01')
+            for i in range(2, 6)
+        ])
+        seen = []
+        url = '/api/devices/?fields=id&ordering=-inventory_number&cursor=&page_size=2'
+        while url:
+            response = self.client.get(url, HTTP_AUTHORIZATION='Bearer admin-token')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(all(set(row) == {'id'} for row in response.data['results']))
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        expected = list(Device.objects.order_by('-inventory_number').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class FastListParityTestCase(AuthenticatedTestCase):
+    """values() asosidagi tezkor list rejimi serializer bilan bayt-bayt bir xil JSON berishi testlari"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='usta', password='testpass123')
+        parent = Category.objects.create(name='Texnika', code='TX')
+        category = Category.objects.create(name='Kompyuter', parent=parent, description='Ish stoli')
+        device_type = DeviceType.objects.create(category=category, name='HP ProDesk', manufacturer='HP')
+        building = Building.objects.create(name='B bino', description='Asosiy')
+        room = Room.objects.create(building=building, name='205')
+        responsible = ResponsiblePerson.objects.create(user=user, building=building, position='Laborant')
+        first = Device.objects.create(
+            device_type=device_type, inventory_number='PC-001', serial_number='SN-1', condition='broken',
+            purchase_date='2023-05-17', purchase_price='1234567.50', ip_address='10.0.0.15',
+            mac_address='00:1B:44:11:3A:B7', notes='Monitor bilan',
+        )
+        second = Device.objects.create(device_type=device_type, inventory_number='PC-002', purchase_date='2024-02-01')
+        DeviceLocation.objects.create(device=first, room=room, responsible_person=responsible)
+        DeviceLocation.objects.create(device=second, room=room)
+        DeviceLocationHistory.objects.create(device=first, new_building=building, new_room=room, moved_by=user,
+                                             reason="Ko'chirildi")
+        DeviceLocationHistory.objects.create(device=second, old_building=building, old_room=room,
+                                             new_building=building, new_room=room)
+        DeviceConditionHistory.objects.create(device=first, old_condition='working', new_condition='broken',
+                                              changed_by=user)
+        repair = RepairRequest.objects.create(device=first, requested_by=user, problem_description='Yoqilmaydi',
+                                              priority='high', cost='99.90')
+        RepairRequest.objects.create(device=second, problem_description='Sekin', assigned_to=user,
+                                     request_status='assigned', work_description='Tozalandi')
+        ServiceLog.objects.create(device=first, service_type='repair', service_date='2024-03-01',
+                                  description="Blok almashtirildi", repair_request=repair, cost='15',
+                                  next_service_date='2025-03-01')
+        ServiceLog.objects.create(device=second, service_type='cleaning', service_date='2024-04-01',
+                                  description='Changdan tozalash', performed_by=user)
+
+    def get_content(self, url, fast):
+        with mock.patch.object(FastListMixin, 'fast_list', fast):
+            response = self.client.get(url, HTTP_AUTHORIZATION='Bearer admin-token')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+        return response.content
+
+    def test_byte_for_byte_parity(self):
+        urls = [
+            '/api/buildings/', '/api/rooms/', '/api/responsibles/', '/api/categories/',
+            '/api/device-types/?omit=picture', '/api/devices/', '/api/device-locations/',
+            '/api/device-location-history/', '/api/device-condition-history/', '/api/repair-requests/',
+            '/api/service-logs/', '/api/devices/?search=pc', '/api/devices/?cursor=&page_size=1',
+            '/api/repair-requests/?fields=id,assigned_to_username,created_at', '/api/devices/?ordering=inventory_number',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                fast = self.get_content(url, True)
+                self.assertEqual(fast, self.get_content(url, False))
+                self.assertIn(b'"results"', fast)
+
+    def test_unsupported_fields_fall_back_to_serializer(self):
+        view = DeviceViewSet(request=None, format_kwarg=None, action='list')
+        self.assertIsNotNone(view.get_row_reader())
+        view = DeviceTypeViewSet(request=None, format_kwarg=None, action='list')
+        self.assertIsNone(view.get_row_reader())
+
+
+class FastJSONTestCase(SimpleTestCase):
+    """orjson asosidagi renderer/parser standart DRF JSON bilan mosligi testlari"""
+
+    payload = {
+        'price': Decimal('1234567.50'),
+        'created_at': datetime.datetime(2024, 5, 17, 9, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+        'purchase_date': datetime.date(2024, 5, 17),
+        'condition_label': Device.CONDITION_CHOICES[2][1],
+        'uid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'by_id': {1: 'bir', 2: 'ikki'},
+        'text': "Xona \u2028 o'qituvchi — №5",
+        'items': [1, 2.5, None, True],
+    }
+
+    def test_renderer_matches_default_renderer(self):
+        self.assertEqual(FastJSONRenderer().render(self.payload), JSONRenderer().render(self.payload))
+
+    def test_renderer_falls_back_for_indent(self):
+        context = {'indent': 4}
+        self.assertEqual(FastJSONRenderer().render(self.payload, 'application/json', context),
+                         JSONRenderer().render(self.payload, 'application/json', context))
+
+    def test_parser(self):
+        body = '{"name": "Bosh bino", "rooms": [1, 2], "price": 10.5}'.encode()
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), {'name': 'Bosh bino', 'rooms': [1, 2], 'price': 10.5})
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"name": '))
+
+    def test_benchmark_command(self):
+        out = io.StringIO()
+        err = io.StringIO()
+        call_command('benchmark_json', rows=20, repeat=1, stdout=out, stderr=err)
+        self.assertIn('render', out.getvalue())
+        self.assertEqual(err.getvalue(), '')
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class ConditionalRequestTestCase(AuthenticatedTestCase):
+    """ETag / Last-Modified, 304 va If-Match (412) testlari"""
+
+    auth = {'HTTP_AUTHORIZATION': 'Bearer admin-token'}
+
+    def setUp(self):
+        super().setUp()
+        self.building = Building.objects.create(name='A blok')
+        Building.objects.create(name='B blok')
+
+    def test_list_not_modified_skips_serialization(self):
+        response = self.client.get('/api/buildings/', **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/buildings/', HTTP_IF_NONE_MATCH=etag, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(len([q for q in queries.captured_queries if 'app_rttm_building' in q['sql']]), 1)
+
+    def test_list_etag_changes_on_write_and_filter(self):
+        etag = self.client.get('/api/buildings/', **self.auth)['ETag']
+        filtered = self.client.get('/api/buildings/', {'search': 'A blok'}, **self.auth)['ETag']
+        self.assertNotEqual(etag, filtered)
+
+        Building.objects.create(name='C blok')
+        response = self.client.get('/api/buildings/', HTTP_IF_NONE_MATCH=etag, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_etag_changes_on_related_write(self):
+        Room.objects.create(building=self.building, name='101')
+        response = self.client.get('/api/rooms/', **self.auth)
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+
+        self.building.name = 'Bosh bino'
+        self.building.save()
+        response = self.client.get('/api/rooms/', HTTP_IF_NONE_MATCH=etag, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['results'][0]['building_name'], 'Bosh bino')
+
+    def test_etag_identifies_representation(self):
+        first = self.client.get('/api/buildings/', {'page_size': 1, 'page': 1}, **self.auth)['ETag']
+        second = self.client.get('/api/buildings/', {'page_size': 1, 'page': 2}, **self.auth)
+        ids = self.client.get('/api/buildings/', {'fields': 'id'}, **self.auth)['ETag']
+        self.assertEqual(len({first, second['ETag'], ids}), 3)
+
+        response = self.client.get('/api/buildings/', {'page_size': 1, 'page': 2}, HTTP_IF_NONE_MATCH=first,
+                                   **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.auth_payload = {'userId': 2, 'username': 'muallif', 'role': 'creator'}
+        response = self.client.get('/api/buildings/', {'page_size': 1, 'page': 1}, HTTP_IF_NONE_MATCH=first,
+                                   **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_detail_etag_with_fields(self):
+        url = f'/api/buildings/{self.building.pk}/'
+        etag = self.client.get(url, **self.auth)['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'id'}, HTTP_IF_NONE_MATCH=etag, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {'id': self.building.pk})
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len([q for q in queries.captured_queries if 'app_rttm_building' in q['sql']]), 1)
+
+        response = self.client.get(url, {'fields': 'id'}, HTTP_IF_NONE_MATCH=response['ETag'], **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_if_modified_since(self):
+        url = f'/api/buildings/{self.building.pk}/'
+        response = self.client.get(url, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'], **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_if_match_on_update(self):
+        url = f'/api/buildings/{self.building.pk}/'
+        etag = self.client.get(url, **self.auth)['ETag']
+
+        response = self.client.patch(url, {'description': 'Birinchi'}, content_type='application/json',
+                                     HTTP_IF_MATCH=etag, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        new_etag = response['ETag']
+        self.assertNotEqual(new_etag, etag)
+
+        # Eski versiya bilan yozish rad etiladi
+        response = self.client.patch(url, {'description': 'Ikkinchi'}, content_type='application/json',
+                                     HTTP_IF_MATCH=etag, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.building.refresh_from_db()
+        self.assertEqual(self.building.description, 'Birinchi')
+
+        response = self.client.delete(url, HTTP_IF_MATCH=new_etag, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTestCase(AuthenticatedTestCase):
+    """Ma'lumotnoma endpoint lari javob cache i: role bo'yicha kalit, yozishda invalidatsiya, counter lar"""
+
+    user_payload = {'userId': 2, 'username': 'oddiy', 'role': 'user'}
+
+    def setUp(self):
+        super().setUp()
+        caches['responses'].clear()
+        self.building = Building.objects.create(name='A blok')
+        Room.objects.create(building=self.building, name='101')
+
+    def role_for_token(self, token):
+        return self.auth_payload if token == 'admin-token' else self.user_payload
+
+    def get(self, url, token='admin-token', **extra):
+        return self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}', **extra)
+
+    def test_hit_skips_database(self):
+        stats = get_response_cache_stats()
+        self.assertEqual(self.get('/api/buildings/')['X-Cache'], 'MISS')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get('/api/buildings/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.json()['results'][0]['name'], 'A blok')
+        self.assertFalse([q for q in queries.captured_queries if 'app_rttm_' in q['sql']])
+
+        after = get_response_cache_stats()
+        self.assertEqual(after['hits'] - stats['hits'], 1)
+        self.assertEqual(after['misses'] - stats['misses'], 1)
+
+    def test_key_includes_role_and_normalized_query(self):
+        self.get('/api/buildings/?ordering=name&page=1')
+        self.assertEqual(self.get('/api/buildings/?page=1&ordering=name')['X-Cache'], 'HIT')
+        self.assertEqual(self.get('/api/buildings/?page=1&ordering=name', token='user-token')['X-Cache'], 'MISS')
+        self.assertEqual(self.get('/api/buildings/?page=1&ordering=-name')['X-Cache'], 'MISS')
+
+    def test_related_model_write_invalidates(self):
+        self.get('/api/rooms/')
+        self.building.name = 'Bosh bino'
+        self.building.save()
+
+        response = self.get('/api/rooms/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['results'][0]['building_name'], 'Bosh bino')
+
+        Room.objects.get().delete()
+        self.assertEqual(self.get('/api/rooms/').json()['count'], 0)
+
+    def test_signals_connected_only_to_dependencies(self):
+        self.assertTrue(post_delete.has_listeners(Building))
+        self.assertTrue(post_save.has_listeners(Category))
+        # Tarix qatorlari hech bir cache langan javobda yo'q - cascade da fast-delete saqlanadi
+        self.assertFalse(post_delete.has_listeners(DeviceLocationHistory))
+        self.assertFalse(post_delete.has_listeners(ServiceLog))
+
+    def test_hit_honours_if_none_match(self):
+        etag = self.get(f'/api/buildings/{self.building.pk}/')['ETag']
+        response = self.get(f'/api/buildings/{self.building.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+
+class DeviceExportTestCase(AuthenticatedTestCase):
+    """Qurilmalar inventarini CSV / NDJSON oqimi sifatida eksport qilish testlari"""
+
+    auth_payload = {'userId': 5, 'username': 'moliya', 'role': 'user'}
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='mas_ul', password='testpass123')
+        building = Building.objects.create(name='Bosh bino')
+        room = Room.objects.create(building=building, name='204')
+        responsible = ResponsiblePerson.objects.create(user=user, building=building, room=room)
+        category = Category.objects.create(name='Kompyuterlar')
+        device_type = DeviceType.objects.create(category=category, name='ThinkCentre', manufacturer='Lenovo')
+        cls.located = Device.objects.create(device_type=device_type, inventory_number='PC-001',
+                                            purchase_date='2024-02-01', purchase_price=Decimal('1250.50'),
+                                            warranty_until='2027-02-01')
+        DeviceLocation.objects.create(device=cls.located, room=room, responsible_person=responsible)
+        Device.objects.create(device_type=device_type, inventory_number='PC-002', condition='broken',
+                              purchase_date='2024-03-01')
+
+    def export(self, **params):
+        response = self.client.get('/api/devices/export/', params, HTTP_AUTHORIZATION='Bearer user-token')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv_contains_joined_inventory_columns(self):
+        response, content = self.export()
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        self.assertIn('attachment; filename="devices-', response['Content-Disposition'])
+
+        rows = {row['inventory_number']: row for row in csv.DictReader(io.StringIO(content.lstrip('\ufeff')))}
+        self.assertEqual(set(rows), {'PC-001', 'PC-002'})
+        self.assertEqual(rows['PC-001']['building'], 'Bosh bino')
+        self.assertEqual(rows['PC-001']['room'], '204')
+        self.assertEqual(rows['PC-001']['responsible_person'], 'mas_ul')
+        self.assertEqual(rows['PC-001']['category'], 'Kompyuterlar')
+        self.assertEqual(rows['PC-001']['purchase_price'], '1250.50')
+        self.assertEqual(rows['PC-001']['warranty_until'], '2027-02-01')
+        self.assertEqual(rows['PC-002']['room'], '')
+
+    def test_ndjson_honours_filters(self):
+        response, content = self.export(export_format='ndjson', condition='broken')
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+        lines = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]['inventory_number'], 'PC-002')
+        self.assertIsNone(lines[0]['building'])
+        self.assertIsNone(lines[0]['purchase_price'])
+
+    def test_rows_are_streamed_in_chunks(self):
+        with mock.patch('app_rttm.export.ROWS_PER_CHUNK', 1):
+            response = self.client.get('/api/devices/export/', HTTP_AUTHORIZATION='Bearer user-token')
+            chunks = list(response.streaming_content)
+        # Har bir qator alohida bo'lak (sarlavha birinchisi bilan birga)
+        self.assertEqual(len(chunks), 2)
+
+    def test_invalid_format(self):
+        response = self.client.get('/api/devices/export/', {'export_format': 'xlsx'},
+                                   HTTP_AUTHORIZATION='Bearer user-token')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DeviceImportTestCase(AuthenticatedTestCase):
+    """Qurilmalarni ommaviy import qilish testlari"""
+
+    auth_payload = {'userId': 7, 'username': 'importchi', 'role': 'admin'}
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='mas_ul', password='testpass123')
+        building = Building.objects.create(name='Yangi bino')
+        cls.room = Room.objects.create(building=building, name='301')
+        cls.responsible = ResponsiblePerson.objects.create(user=user, building=building, room=cls.room)
+        category = Category.objects.create(name='Kompyuterlar')
+        cls.device_type = DeviceType.objects.create(category=category, name='OptiPlex')
+        Device.objects.create(device_type=cls.device_type, inventory_number='OLD-1', purchase_date='2023-01-01')
+
+    def post(self, data, **params):
+        url = '/api/devices/import/'
+        if params:
+            url += '?' + '&'.join(f'{key}={value}' for key, value in params.items())
+        return self.client.post(url, data, content_type='application/json', HTTP_AUTHORIZATION='Bearer admin-token')
+
+    def make_rows(self, count, start=1):
+        return [
+            {'inventory_number': f'LAB-{i:04d}', 'device_type': 'OptiPlex', 'purchase_date': '2025-09-01',
+             'purchase_price': '900.00', 'room': self.room.pk, 'responsible_person': self.responsible.pk}
+            for i in range(start, start + count)
+        ]
+
+    def test_query_count_does_not_grow_with_rows(self):
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(self.post(self.make_rows(2)).status_code, status.HTTP_201_CREATED)
+        with CaptureQueriesContext(connection) as large:
+            response = self.post(self.make_rows(150, start=100))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 150)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+
+        device = Device.objects.get(inventory_number='LAB-0100')
+        self.assertEqual(device.created_by_name, 'importchi')
+        self.assertEqual(device.updated_by_id, '7')
+        self.assertEqual(device.location.room, self.room)
+        self.assertEqual(device.location.responsible_person, self.responsible)
+        self.assertEqual(device.location.created_by_name, 'importchi')
+
+    def test_abort_reports_per_row_errors(self):
+        rows = self.make_rows(3)
+        rows[1]['inventory_number'] = 'LAB-0001'
+        rows[2].update(inventory_number='OLD-1', device_type='Yo\'q', room=999999)
+        rows.append({'inventory_number': 'LAB-0009'})
+
+        response = self.post(rows)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = {item['row']: item['errors'] for item in response.data['errors']}
+        self.assertEqual(set(errors), {2, 3, 4})
+        self.assertIn('inventory_number', errors[2])
+        self.assertEqual(set(errors[3]), {'inventory_number', 'device_type', 'room'})
+        self.assertIn('purchase_date', errors[4])
+        self.assertFalse(Device.objects.filter(inventory_number__startswith='LAB-').exists())
+
+    def test_skip_mode_imports_valid_rows(self):
+        rows = self.make_rows(2)
+        rows[1]['inventory_number'] = 'OLD-1'
+        response = self.post(rows, on_error='skip')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['devices'][0]['inventory_number'], 'LAB-0001')
+        self.assertEqual(response.data['errors'][0]['row'], 2)
+
+    def test_csv_upload(self):
+        content = (
+            'inventory_number,device_type,purchase_date,serial_number,room\n'
+            f'CSV-1,{self.device_type.pk},2025-01-10,SN-1,{self.room.pk}\n'
+            'CSV-2,OptiPlex,2025-01-11,,\n'
+        )
+        upload = io.BytesIO(('\ufeff' + content).encode('utf-8'))
+        upload.name = 'devices.csv'
+        response = self.client.post('/api/devices/import/', {'file': upload}, HTTP_AUTHORIZATION='Bearer admin-token')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(response.data['created'], 2)
+        second = Device.objects.get(inventory_number='CSV-2')
+        self.assertIsNone(second.serial_number)
+        self.assertFalse(DeviceLocation.objects.filter(device=second).exists())
+        self.assertTrue(DeviceLocation.objects.filter(device__inventory_number='CSV-1', room=self.room).exists())
+
+    def test_non_utf8_csv_is_rejected(self):
+        content = (
+            'inventory_number,device_type,purchase_date,notes\n'
+            'CSV-3,OptiPlex,2025-01-12,Garantiya ©\n'
+        )
+        upload = io.BytesIO(content.encode('latin-1'))
+        upload.name = 'devices.csv'
+        response = self.client.post('/api/devices/import/', {'file': upload}, HTTP_AUTHORIZATION='Bearer admin-token')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('file', response.data)
+        self.assertFalse(Device.objects.filter(inventory_number='CSV-3').exists())
+
+
+class DeviceBulkMoveTestCase(AuthenticatedTestCase):
+    """Bir nechta qurilmani bitta so'rovda ko'chirish testlari"""
+
+    auth_payload = {'userId': 3, 'username': 'texnik', 'role': 'admin'}
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='mas_ul', password='testpass123')
+        building = Building.objects.create(name='Bosh bino')
+        cls.old_room = Room.objects.create(building=building, name='Eski lab')
+        new_building = Building.objects.create(name='Yangi bino')
+        cls.new_room = Room.objects.create(building=new_building, name='Yangi lab')
+        cls.responsible = ResponsiblePerson.objects.create(user=user, building=new_building, room=cls.new_room)
+        category = Category.objects.create(name='Kompyuterlar')
+        device_type = DeviceType.objects.create(category=category, name='OptiPlex')
+        cls.devices = Device.objects.bulk_create([
+            Device(device_type=device_type, inventory_number=f'LAB-{i:03d}', purchase_date='2024-01-01')
+            for i in range(60)
+        ])
+        DeviceLocation.objects.bulk_create([
+            DeviceLocation(device=device, room=cls.old_room) for device in cls.devices[:40]
+        ])
+
+    def move(self, devices, **extra):
+        payload = {'devices': devices, 'room': self.new_room.pk, 'responsible_person': self.responsible.pk,
+                   'reason': "Lab ko'chishi", **extra}
+        return self.client.post('/api/devices/bulk-move/', payload, content_type='application/json',
+                                HTTP_AUTHORIZATION='Bearer admin-token')
+
+    def test_moves_all_devices_with_constant_queries(self):
+        references = [device.pk for device in self.devices[:30]] + [d.inventory_number for d in self.devices[30:]]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.move(references)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data['moved'], 60)
+        self.assertEqual(response.data['unchanged'], 0)
+        self.assertLess(len(queries.captured_queries), 15)
+
+        self.assertEqual(DeviceLocation.objects.filter(room=self.new_room, responsible_person=self.responsible).count(),
+                         60)
+        self.assertEqual(DeviceLocation.objects.filter(updated_by_name='texnik').count(), 60)
+        self.assertEqual(DeviceLocation.objects.filter(created_by_name='texnik').count(), 20)
+        self.assertEqual(DeviceLocation.objects.filter(version=2).count(), 40)
+        history = DeviceLocationHistory.objects.filter(new_room=self.new_room)
+        self.assertEqual(history.count(), 60)
+        self.assertEqual(history.filter(old_room=self.old_room, old_building=self.old_room.building).count(), 40)
+        self.assertEqual(history.filter(old_room__isnull=True).count(), 20)
+
+        # Takroriy so'rov - hammasi allaqachon shu yerda
+        response = self.move(references)
+        self.assertEqual(response.data['moved'], 0)
+        self.assertEqual(response.data['unchanged'], 60)
+        self.assertEqual(DeviceLocationHistory.objects.count(), 60)
+
+    def test_unknown_reference_moves_nothing(self):
+        response = self.move([self.devices[0].pk, 'YOQ-999'])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('YOQ-999', str(response.data['devices']))
+        self.assertFalse(DeviceLocation.objects.filter(room=self.new_room).exists())
+        self.assertFalse(DeviceLocationHistory.objects.exists())
+
+    def test_invalid_reference_type(self):
+        response = self.move([True, {'id': 1}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DeviceVersionConcurrencyTestCase(AuthenticatedTestCase):
+    """move / change_condition: versiya bo'yicha shartli UPDATE va to'g'ri tarix testlari"""
+
+    auth_payload = {'userId': 4, 'username': 'texnik', 'role': 'admin'}
+
+    @classmethod
+    def setUpTestData(cls):
+        building = Building.objects.create(name='Bosh bino')
+        cls.room_a = Room.objects.create(building=building, name='101')
+        cls.room_b = Room.objects.create(building=building, name='102')
+        category = Category.objects.create(name='Printerlar')
+        device_type = DeviceType.objects.create(category=category, name='LaserJet')
+        cls.device = Device.objects.create(device_type=device_type, inventory_number='PR-1', purchase_date='2024-01-01')
+
+    def post(self, action, payload):
+        return self.client.post(f'/api/devices/{self.device.pk}/{action}/', payload, content_type='application/json',
+                                HTTP_AUTHORIZATION='Bearer admin-token')
+
+    def test_change_condition_bumps_version(self):
+        response = self.post('change_condition', {'new_condition': 'broken', 'version': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.device.refresh_from_db()
+        self.assertEqual((self.device.condition, self.device.version), ('broken', 2))
+        self.assertEqual(self.device.updated_by_name, 'texnik')
+
+        # Eski versiya bilan ikkinchi texnik
+        response = self.post('change_condition', {'new_condition': 'repair', 'version': 1})
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['version'], 2)
+        self.assertEqual(list(DeviceConditionHistory.objects.values_list('old_condition', 'new_condition')),
+                         [('working', 'broken')])
+
+    def test_concurrent_change_does_not_write_wrong_history(self):
+        stale = Device.objects.get(pk=self.device.pk)
+        change_device_condition(Device.objects.get(pk=self.device.pk), 'repair')
+
+        with self.assertRaises(VersionConflict):
+            change_device_condition(stale, 'broken')
+        self.assertEqual(DeviceConditionHistory.objects.count(), 1)
+        self.assertEqual(Device.objects.get(pk=self.device.pk).condition, 'repair')
+
+    def test_move_with_location_version(self):
+        response = self.post('move', {'room': self.room_a.pk, 'version': 0})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data['version'], 1)
+
+        response = self.post('move', {'room': self.room_b.pk, 'version': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['version'], 2)
+        self.assertEqual(response.data['room'], self.room_b.pk)
+
+        response = self.post('move', {'room': self.room_a.pk, 'version': 1})
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        history = list(DeviceLocationHistory.objects.order_by('id').values_list('old_room', 'new_room'))
+        self.assertEqual(history, [(None, self.room_a.pk), (self.room_a.pk, self.room_b.pk)])
+        self.assertEqual(DeviceLocation.objects.get(device=self.device).updated_by_name, 'texnik')
+
+    def test_regular_update_bumps_version(self):
+        response = self.client.patch(f'/api/devices/{self.device.pk}/', {'notes': 'Kartrij almashtirildi'},
+                                     content_type='application/json', HTTP_AUTHORIZATION='Bearer admin-token')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['version'], 2)
+        self.assertEqual(self.post('change_condition', {'new_condition': 'broken', 'version': 1}).status_code,
+                         status.HTTP_409_CONFLICT)
+
+    def test_save_sets_version_without_refetch(self):
+        self.device.notes = 'Tekshirildi'
+        with CaptureQueriesContext(connection) as queries:
+            self.device.save()
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertEqual(self.device.version, 2)
+        self.device.refresh_from_db()
+        self.assertEqual(self.device.version, 2)
+
+
+class BulkOperationsTestCase(AuthenticatedTestCase):
+    """/bulk/ endpoint lari: ommaviy yaratish, yangilash va o'chirish"""
+
+    auth_payload = {'userId': 9, 'username': 'ommaviy', 'role': 'admin'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.building = Building.objects.create(name='Asosiy bino')
+        cls.other_building = Building.objects.create(name='Yotoqxona')
+        Room.objects.create(building=cls.building, name='100')
+        category = Category.objects.create(name='Printerlar')
+        cls.device_type = DeviceType.objects.create(category=category, name='LaserJet')
+        Device.objects.create(device_type=cls.device_type, inventory_number='BULK-OLD', purchase_date='2024-01-01')
+
+    def send(self, method, url, data, **params):
+        if params:
+            url += '?' + '&'.join(f'{key}={value}' for key, value in params.items())
+        return getattr(self.client, method)(url, data, content_type='application/json',
+                                            HTTP_AUTHORIZATION='Bearer admin-token')
+
+    def room_rows(self, count, start=1):
+        return [{'building': self.building.pk, 'name': f'B-{i}'} for i in range(start, start + count)]
+
+    def test_create_query_count_does_not_grow_with_rows(self):
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(self.send('post', '/api/rooms/bulk/', self.room_rows(2)).status_code,
+                             status.HTTP_201_CREATED)
+        with CaptureQueriesContext(connection) as large:
+            response = self.send('post', '/api/rooms/bulk/', self.room_rows(120, start=10))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 120)
+        self.assertEqual(len(response.data['results']), 120)
+        self.assertEqual(response.data['results'][0]['building_name'], 'Asosiy bino')
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+
+        room = Room.objects.get(name='B-10')
+        self.assertEqual(room.created_by_name, 'ommaviy')
+        self.assertEqual(room.updated_by_id, '9')
+
+    def test_abort_writes_nothing_and_skip_writes_valid_rows(self):
+        rows = self.room_rows(3)
+        rows[1]['name'] = 'B-1'  # paket ichida takror (building + name)
+        rows.append({'building': self.building.pk, 'name': '100'})  # bazada bor
+        rows.append({'building': 999999, 'name': 'X'})
+
+        response = self.send('post', '/api/rooms/bulk/', rows)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = {item['row']: item['errors'] for item in response.data['errors']}
+        self.assertEqual(set(errors), {2, 4, 5})
+        self.assertIn('non_field_errors', errors[2])
+        self.assertIn('building', errors[5])
+        self.assertFalse(Room.objects.filter(name__startswith='B-').exists())
+
+        response = self.send('post', '/api/rooms/bulk/', rows, on_error='skip')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(len(response.data['errors']), 3)
+        self.assertEqual(set(Room.objects.filter(name__startswith='B-').values_list('name', flat=True)),
+                         {'B-1', 'B-3'})
+
+    def test_unique_field_checked_in_batch(self):
+        rows = [
+            {'device_type': self.device_type.pk, 'inventory_number': 'BULK-1', 'purchase_date': '2025-01-01'},
+            {'device_type': self.device_type.pk, 'inventory_number': 'BULK-1', 'purchase_date': '2025-01-01'},
+            {'device_type': self.device_type.pk, 'inventory_number': 'BULK-OLD', 'purchase_date': '2025-01-01'},
+        ]
+        response = self.send('post', '/api/devices/bulk/', rows)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = {item['row']: item['errors'] for item in response.data['errors']}
+        self.assertEqual(set(errors), {2, 3})
+        self.assertIn('inventory_number', errors[3])
+
+    def test_partial_update_bumps_audit_and_version(self):
+        rooms = Room.objects.bulk_create([Room(building=self.building, name=f'U-{i}') for i in range(5)])
+        device = Device.objects.get(inventory_number='BULK-OLD')
+
+        rows = [{'id': room.pk, 'status': 'archived'} for room in rooms]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.send('patch', '/api/rooms/bulk/', rows)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 5)
+        self.assertLess(len(queries.captured_queries), 10)
+        for room in Room.objects.filter(pk__in=[room.pk for room in rooms]):
+            self.assertEqual(room.status, 'archived')
+            self.assertEqual(room.name[:2], 'U-')
+            self.assertEqual(room.updated_by_name, 'ommaviy')
+
+        response = self.send('patch', '/api/devices/bulk/', [{'id': device.pk, 'notes': 'Kartrij almashtirildi'}])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['version'], device.version + 1)
+
+        response = self.send('patch', '/api/rooms/bulk/', [{'id': rooms[0].pk, 'name': 'U-1'}, {'status': 'active'}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([item['row'] for item in response.data['errors']], [1, 2])
+
+    def test_partial_update_checks_row_versions(self):
+        first = Device.objects.get(inventory_number='BULK-OLD')
+        second = Device.objects.create(device_type=self.device_type, inventory_number='BULK-2',
+                                       purchase_date='2024-01-01')
+        first.notes = 'Parallel tahrir'
+        first.save()  # version 2
+
+        rows = [{'id': first.pk, 'notes': 'Eski nusxa', 'version': 1},
+                {'id': second.pk, 'notes': 'Yangi', 'version': second.version}]
+        response = self.send('patch', '/api/devices/bulk/', rows)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['errors'][0]['row'], 1)
+        self.assertEqual(response.data['errors'][0]['version'], 2)
+        second.refresh_from_db()
+        self.assertIsNone(second.notes)
+
+        response = self.send('patch', '/api/devices/bulk/', rows, on_error='skip')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(response.data['results'][0]['version'], 2)
+        first.refresh_from_db()
+        self.assertEqual((first.notes, first.version), ('Parallel tahrir', 2))
+
+    def test_bulk_delete(self):
+        rooms = Room.objects.bulk_create([Room(building=self.other_building, name=f'D-{i}') for i in range(3)])
+        ids = [room.pk for room in rooms]
+
+        response = self.send('delete', '/api/rooms/bulk/', ids + [999999])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Room.objects.filter(pk__in=ids).count(), 3)
+
+        response = self.send('delete', '/api/rooms/bulk/', ids + [999999], on_error='skip')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['deleted'], 3)
+        self.assertFalse(Room.objects.filter(pk__in=ids).exists())
+
+        response = self.send('delete', '/api/device-types/bulk/', [self.device_type.pk])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_read_only_role_cannot_write(self):
+        with mock.patch.object(auth_service, 'get_current_user_role',
+                               return_value={'userId': 3, 'username': 'oddiy', 'role': 'user'}):
+            response = self.send('post', '/api/rooms/bulk/', self.room_rows(1))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class AuditQuerySetTestCase(TestCase):
+    """save() dan tashqari yozishlarda (update, bulk_create, bulk_update) audit maydonlari"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.building = Building.objects.create(name='Audit bino')
+
+    def setUp(self):
+        principal = AuthPrincipal.from_user_data({'userId': 12, 'username': 'auditor', 'role': 'admin'}, 'token')
+        patcher = mock.patch('app_rttm.models.get_current_principal', return_value=principal)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_bulk_create_sets_audit_fields(self):
+        rooms = Room.objects.bulk_create([
+            Room(building=self.building, name='A-1'),
+            Room(building=self.building, name='A-2', created_by_id='1', created_by_name='import'),
+        ])
+        rooms = Room.objects.filter(pk__in=[room.pk for room in rooms]).order_by('name')
+        self.assertEqual([room.created_by_name for room in rooms], ['auditor', 'import'])
+        self.assertEqual([room.updated_by_id for room in rooms], ['12', '12'])
+
+    def test_update_and_bulk_update_set_updated_fields(self):
+        room = Room.objects.create(building=self.building, name='A-3')
+        before = room.updated_at
+        with mock.patch('app_rttm.models.get_current_principal', return_value=AuthPrincipal.from_user_data(
+                {'userId': 13, 'username': 'boshqa', 'role': 'admin'}, 'token')):
+            Room.objects.filter(pk=room.pk).update(status='archived')
+        room.refresh_from_db()
+        self.assertEqual((room.status, room.updated_by_name, room.created_by_name), ('archived', 'boshqa', 'auditor'))
+        self.assertGreater(room.updated_at, before)
+
+        room.description = 'Bulk'
+        with CaptureQueriesContext(connection) as queries:
+            Room.objects.bulk_update([room], ['description'])
+        self.assertEqual(len(queries.captured_queries), 1)
+        room.refresh_from_db()
+        self.assertEqual((room.description, room.updated_by_name), ('Bulk', 'auditor'))
+
+    def test_save_with_update_fields_keeps_audit(self):
+        room = Room.objects.create(building=self.building, name='A-4')
+        Room.objects.filter(pk=room.pk).update(updated_by_id=None, updated_by_name=None)
+        room.status = 'inactive'
+        room.save(update_fields=['status'])
+        room.refresh_from_db()
+        self.assertEqual(room.updated_by_name, 'auditor')
+
+
+@skipIf(connection.vendor != 'postgresql', "EXPLAIN tekshiruvi faqat PostgreSQL uchun")
+class ListQueryIndexTestCase(AuthenticatedTestCase):
+    """Ro'yxat endpoint lari so'rovlari indeks bilan bajarilishi (Seq Scan yo'qligi) testlari"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='texnik', password='testpass123')
+        category = Category.objects.create(name='Printerlar')
+        device_type = DeviceType.objects.create(category=category, name='Lazer printer')
+        building = Building.objects.create(name='A bino')
+        room = Room.objects.create(building=building, name='101')
+        devices = Device.objects.bulk_create([
+            Device(device_type=device_type, inventory_number=f'PRN-{i:04d}', purchase_date='2024-01-01',
+                   condition='broken' if i % 10 == 0 else 'working')
+            for i in range(300)
+        ])
+        DeviceLocationHistory.objects.bulk_create([
+            DeviceLocationHistory(device=device, new_building=building, new_room=room) for device in devices
+        ])
+        DeviceConditionHistory.objects.bulk_create([
+            DeviceConditionHistory(device=device, new_condition=device.condition) for device in devices
+        ])
+        statuses = [status for status, _ in RepairRequest.REQUEST_STATUS_CHOICES]
+        RepairRequest.objects.bulk_create([
+            RepairRequest(device=device, problem_description='Ishlamayapti', assigned_to=cls.user,
+                          request_status=statuses[i % len(statuses)])
+            for i, device in enumerate(devices)
+        ])
+        ServiceLog.objects.bulk_create([
+            ServiceLog(device=device, service_type='inspection', service_date='2024-06-01', description='Tekshiruv')
+            for device in devices
+        ])
+        cls.device = devices[0]
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def assert_no_seq_scan(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_AUTHORIZATION='Bearer admin-token')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+
+        selects = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertTrue(selects, url)
+        with connection.cursor() as cursor:
+            # Kichik jadvalda ham planner mavjud indeksni tanlashi uchun
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            for sql in selects:
+                cursor.execute('EXPLAIN ' + sql)
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+                self.assertNotIn('Seq Scan', plan, f"{url}\n{sql}\n{plan}")
+
+    def test_list_endpoints_use_indexes(self):
+        device_id = self.device.pk
+        urls = [
+            '/api/devices/',
+            '/api/devices/?condition=broken',
+            f'/api/devices/?device_type={self.device.device_type_id}',
+            '/api/devices/?cursor=',
+            '/api/repair-requests/',
+            '/api/repair-requests/?request_status=new',
+            '/api/repair-requests/?request_status__in=new,assigned,in_progress',
+            '/api/repair-requests/?priority=high',
+            f'/api/repair-requests/?assigned_to={self.user.pk}',
+            '/api/repair-requests/?cursor=',
+            '/api/device-location-history/',
+            f'/api/device-location-history/?device={device_id}',
+            '/api/device-location-history/?cursor=',
+            '/api/device-condition-history/',
+            f'/api/device-condition-history/?device={device_id}',
+            '/api/device-condition-history/?new_condition=broken',
+            '/api/service-logs/',
+            f'/api/service-logs/?device={device_id}',
+            '/api/service-logs/?service_type=inspection',
+            '/api/service-logs/?cursor=',
+            '/api/devices/?search=PRN-00',
+            '/api/repair-requests/?search=ishlamay',
+            '/api/devices/lookup/?q=prn-00&limit=5',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assert_no_seq_scan(url)
@@ -1,4 +1,3 @@
-from django.db import transaction
 from django.utils import timezone
 from drf_spectacular.utils import (
     extend_schema_view, extend_schema, OpenApiExample,
@@ -8,9 +7,19 @@ from drf_spectacular.types import OpenApiTypes
 from rest_framework import viewsets, permissions, status, filters, serializers
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.parsers import MultiPartParser, FormParser
 from django_filters.rest_framework import DjangoFilterBackend
 
+from .bulk import BulkModelMixin
+from .conditional import ConditionalGetMixin
+from .device_moves import bulk_move_devices, change_device_condition, move_device
+from .device_import import ON_ERROR_ABORT, DeviceImporter, ImportConflict, read_rows
+from .export import DEVICE_EXPORT_COLUMNS, EXPORT_FORMATS, export_response
+from .fast_read import FastListMixin
+from .parsers import FastJSONParser
+from .response_cache import ResponseCacheMixin
+from .fieldsets import SparseFieldsetViewMixin
+from .search import FullTextSearchFilter, lookup_devices
 from .permissions import AuthPermission, AdminOnlyPermission, ReadOnlyPermission, SmartPermission
 
 from .models import (
@@ -32,7 +41,9 @@ from .serializers import (
     DeviceSerializer, DeviceImageSerializer,
     DeviceLocationSerializer, DeviceLocationHistorySerializer, DeviceConditionHistorySerializer,
     RepairRequestSerializer, ServiceLogSerializer,
-    RoomFilterSerializer, DeviceMoveSerializer, DeviceChangeConditionSerializer,
+    RoomFilterSerializer, DeviceMoveSerializer, DeviceBulkMoveSerializer, DeviceChangeConditionSerializer,
+    DeviceLookupQuerySerializer, DeviceLookupSerializer, DeviceExportQuerySerializer,
+    DeviceImportQuerySerializer, DeviceImportRowSerializer,
 )
 
 
@@ -93,13 +104,14 @@ class ReadOnlyPermissions(ReadOnlyPermission):
         tags=['Buildings']
     ),
 )
-class BuildingViewSet(viewsets.ModelViewSet):
+class BuildingViewSet(ResponseCacheMixin, ConditionalGetMixin, FastListMixin, SparseFieldsetViewMixin,
+                      BulkModelMixin, viewsets.ModelViewSet):
     queryset = Building.objects.all()
     serializer_class = BuildingSerializer
     permission_classes = [DefaultPermissions]
 
     # MUHIM: Bu parsers qo'shildi - form-data va JSON formatlarini qabul qilish uchun
-    parser_classes = [JSONParser, MultiPartParser, FormParser]
+    parser_classes = [FastJSONParser, MultiPartParser, FormParser]
 
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description']
@@ -169,8 +181,9 @@ class BuildingViewSet(viewsets.ModelViewSet):
         tags=['Buildings'],
     ),
 )
-class BuildingImageViewSet(viewsets.ModelViewSet):
+class BuildingImageViewSet(ConditionalGetMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = BuildingImage.objects.all()
+    last_modified_field = 'uploaded_at'
     serializer_class = BuildingImageSerializer
     permission_classes = [DefaultPermissions]
 
@@ -287,13 +300,14 @@ class BuildingImageViewSet(viewsets.ModelViewSet):
     ),
     destroy=extend_schema(tags=['Rooms']),
 )
-class RoomViewSet(viewsets.ModelViewSet):
+class RoomViewSet(ResponseCacheMixin, ConditionalGetMixin, FastListMixin, SparseFieldsetViewMixin,
+                  BulkModelMixin, viewsets.ModelViewSet):
     queryset = Room.objects.select_related('building').all()
     serializer_class = RoomSerializer
     permission_classes = [DefaultPermissions]
 
     # JSON va form-data formatlarini qabul qilish
-    parser_classes = [JSONParser, MultiPartParser, FormParser]
+    parser_classes = [FastJSONParser, MultiPartParser, FormParser]
 
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['building']
@@ -376,8 +390,9 @@ class RoomViewSet(viewsets.ModelViewSet):
     ),
     destroy=extend_schema(tags=['Rooms']),
 )
-class RoomImageViewSet(viewsets.ModelViewSet):
+class RoomImageViewSet(ConditionalGetMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = RoomImage.objects.select_related('room').all()
+    last_modified_field = 'uploaded_at'
     serializer_class = RoomImageSerializer
     permission_classes = [DefaultPermissions]
 
@@ -493,12 +508,13 @@ class RoomImageViewSet(viewsets.ModelViewSet):
     ),
     destroy=extend_schema(tags=['Responsible Persons']),
 )
-class ResponsiblePersonViewSet(viewsets.ModelViewSet):
-    queryset = ResponsiblePerson.objects.select_related('user', 'building', 'room').all()
+class ResponsiblePersonViewSet(ConditionalGetMixin, FastListMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
+    # Model da Meta.ordering yo'q - sahifalash barqaror bo'lishi uchun
+    queryset = ResponsiblePerson.objects.select_related('user', 'building', 'room').order_by('id')
     serializer_class = ResponsiblePersonSerializer
     permission_classes = [AdminOnlyPermissions]
 
-    parser_classes = [JSONParser, MultiPartParser, FormParser]
+    parser_classes = [FastJSONParser, MultiPartParser, FormParser]
 
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['building', 'room', 'user']
@@ -514,12 +530,13 @@ class ResponsiblePersonViewSet(viewsets.ModelViewSet):
     partial_update=extend_schema(tags=['Categories'], request=CategorySerializer),
     destroy=extend_schema(tags=['Categories']),
 )
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ResponseCacheMixin, ConditionalGetMixin, FastListMixin, SparseFieldsetViewMixin,
+                      BulkModelMixin, viewsets.ModelViewSet):
     queryset = Category.objects.select_related('parent').all()
     serializer_class = CategorySerializer
     permission_classes = [DefaultPermissions]
 
-    parser_classes = [JSONParser, MultiPartParser, FormParser]
+    parser_classes = [FastJSONParser, MultiPartParser, FormParser]
 
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'code', 'description']
@@ -574,13 +591,14 @@ class CategoryViewSet(viewsets.ModelViewSet):
     ),
     destroy=extend_schema(tags=['Device Types']),
 )
-class DeviceTypeViewSet(viewsets.ModelViewSet):
+class DeviceTypeViewSet(ResponseCacheMixin, ConditionalGetMixin, FastListMixin, SparseFieldsetViewMixin,
+                        BulkModelMixin, viewsets.ModelViewSet):
     queryset = DeviceType.objects.select_related('category').all()
     serializer_class = DeviceTypeSerializer
     permission_classes = [DefaultPermissions]
 
     # DeviceType da picture maydoni bor, shuning uchun multipart kerak
-    parser_classes = [MultiPartParser, FormParser, JSONParser]
+    parser_classes = [MultiPartParser, FormParser, FastJSONParser]
 
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['category']
@@ -596,24 +614,105 @@ class DeviceTypeViewSet(viewsets.ModelViewSet):
     partial_update=extend_schema(tags=['Devices'], request=DeviceSerializer),
     destroy=extend_schema(tags=['Devices']),
 )
-class DeviceViewSet(viewsets.ModelViewSet):
-    queryset = Device.objects.select_related('device_type', 'device_type__category').all()
+class DeviceViewSet(ConditionalGetMixin, FastListMixin, SparseFieldsetViewMixin, BulkModelMixin,
+                    viewsets.ModelViewSet):
+    queryset = Device.objects.select_related('device_type', 'device_type__category').defer('search_vector')
     serializer_class = DeviceSerializer
     permission_classes = [DefaultPermissions]
 
-    parser_classes = [JSONParser, MultiPartParser, FormParser]
+    parser_classes = [FastJSONParser, MultiPartParser, FormParser]
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # ?search= - search_vector (GIN) bo'yicha full-text qidiruv, natijalar rank bo'yicha
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['device_type', 'device_type__category', 'condition']
     search_fields = ['inventory_number', 'serial_number', 'notes']
     ordering_fields = ['inventory_number', 'created_at']
+    cursor_ordering = ('-created_at', 'id')
+
+    @extend_schema(
+        summary="Qurilmani tezkor qidirish",
+        description="Inventar yoki seriya raqami bo'yicha prefiks va xatoga chidamli (trigram) qidiruv. "
+                    "Eng mos `limit` ta qurilma qisqa ko'rinishda qaytariladi",
+        tags=['Devices'],
+        parameters=[DeviceLookupQuerySerializer],
+        responses={200: DeviceLookupSerializer(many=True)}
+    )
+    @action(detail=False, methods=['get'], pagination_class=None, filter_backends=[])
+    def lookup(self, request):
+        serializer = DeviceLookupQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        results = lookup_devices(serializer.validated_data['q'], serializer.validated_data['limit'])
+        return Response(results)
+
+    @extend_schema(
+        summary="Qurilmalar inventarini eksport qilish",
+        description="Ro'yxatdagi filtrlar (device_type, condition, search, ordering) bo'yicha barcha qurilmalar - "
+                    "turi, kategoriyasi, joylashuvi, mas'ul shaxsi, narxi va kafolati bilan. "
+                    "Javob sahifalanmaydi, CSV yoki NDJSON oqimi sifatida yuboriladi",
+        tags=['Devices'],
+        parameters=[DeviceExportQuerySerializer],
+        responses={(200, media_type.split(';')[0]): OpenApiTypes.BINARY for media_type in EXPORT_FORMATS.values()}
+    )
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def export(self, request):
+        serializer = DeviceExportQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(queryset, DEVICE_EXPORT_COLUMNS, serializer.validated_data['export_format'], 'devices')
+
+    @extend_schema(
+        summary="Qurilmalarni ommaviy import qilish",
+        description="JSON massiv yoki multipart `file` (CSV, sarlavhali) orqali ko'p qurilma yaratish. "
+                    "device_type - ID yoki nom; room berilsa joylashuv ham yaratiladi. "
+                    "on_error=abort (standart) - birorta xato bo'lsa hech narsa yozilmaydi, "
+                    "on_error=skip - yaroqli qatorlar yoziladi, xatolilar javobda qaytariladi",
+        tags=['Devices'],
+        parameters=[DeviceImportQuerySerializer],
+        request={
+            'application/json': DeviceImportRowSerializer(many=True),
+            'multipart/form-data': {
+                'type': 'object',
+                'properties': {'file': {'type': 'string', 'format': 'binary'}},
+                'required': ['file'],
+            },
+        },
+        responses={201: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT, 409: OpenApiTypes.OBJECT}
+    )
+    @action(detail=False, methods=['post'], url_path='import')
+    def bulk_import(self, request):
+        query = DeviceImportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        importer = DeviceImporter(read_rows(request))
+        importer.validate()
+        errors = importer.get_errors()
+        if errors and query.validated_data['on_error'] == ON_ERROR_ABORT:
+            return Response({'created': 0, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            created = importer.save()
+        except ImportConflict:
+            return Response({'detail': "Inventar raqamlari import paytida boshqa so'rov tomonidan band qilindi, "
+                                       "qayta urinib ko'ring"}, status=status.HTTP_409_CONFLICT)
+
+        return Response({
+            'created': len(created),
+            'devices': [
+                {'row': index + 1, 'id': device.pk, 'inventory_number': device.inventory_number}
+                for index, device in created
+            ],
+            'errors': errors,
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST)
 
     @extend_schema(
         summary="Qurilmani ko'chirish",
-        description="Qurilmani yangi xonaga ko'chirish va mas'ul shaxsni tayinlash",
+        description="Qurilmani yangi xonaga ko'chirish va mas'ul shaxsni tayinlash. "
+                    "version (joylashuv versiyasi) berilsa va oradan joylashuv o'zgargan bo'lsa 409 qaytadi",
         tags=['Devices'],
         request=DeviceMoveSerializer,
-        responses={200: DeviceLocationSerializer}
+        responses={200: DeviceLocationSerializer, 409: OpenApiTypes.OBJECT}
     )
     @action(detail=True, methods=['post'])
     def move(self, request, pk=None):
@@ -622,41 +721,54 @@ class DeviceViewSet(viewsets.ModelViewSet):
         
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-        
-        room = serializer.validated_data['room']
-        responsible = serializer.validated_data.get('responsible_person')
-        reason = serializer.validated_data.get('reason', '')
-
-        with transaction.atomic():
-            old_building = device.location.room.building if hasattr(device, 'location') else None
-            old_room = device.location.room if hasattr(device, 'location') else None
-
-            location, _ = DeviceLocation.objects.update_or_create(
-                device=device,
-                defaults={
-                    'room': room,
-                    'responsible_person': responsible,
-                }
-            )
-
-            DeviceLocationHistory.objects.create(
-                device=device,
-                old_building=old_building,
-                old_room=old_room,
-                new_building=room.building,
-                new_room=room,
-                moved_by=request.user if request.user.is_authenticated else None,
-                reason=reason,
-            )
 
+        location = move_device(
+            device,
+            room=serializer.validated_data['room'],
+            responsible_person=serializer.validated_data.get('responsible_person'),
+            reason=serializer.validated_data.get('reason', ''),
+            moved_by=request.user if request.user.is_authenticated else None,
+            expected_version=serializer.validated_data.get('version'),
+        )
         return Response(DeviceLocationSerializer(location).data)
 
+    @extend_schema(
+        summary="Bir nechta qurilmani ko'chirish",
+        description="ID (son) yoki inventar raqami (satr) bo'yicha berilgan qurilmalarni bitta tranzaksiyada "
+                    "yangi xonaga ko'chirish. Birorta qurilma topilmasa hech biri ko'chirilmaydi. "
+                    "Allaqachon shu xona va mas'ul shaxsda turganlari tarixga yozilmaydi",
+        tags=['Devices'],
+        request=DeviceBulkMoveSerializer,
+        responses={200: inline_serializer('DeviceBulkMoveResult', fields={
+            'room': serializers.IntegerField(),
+            'responsible_person': serializers.IntegerField(allow_null=True),
+            'moved': serializers.IntegerField(),
+            'unchanged': serializers.IntegerField(),
+            'devices': serializers.ListField(child=serializers.IntegerField()),
+        })}
+    )
+    @action(detail=False, methods=['post'], url_path='bulk-move')
+    def bulk_move(self, request):
+        serializer = DeviceBulkMoveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        summary = bulk_move_devices(
+            data['devices'],
+            room=data['room'],
+            responsible_person=data.get('responsible_person'),
+            reason=data.get('reason', ''),
+            moved_by=request.user if request.user.is_authenticated else None,
+        )
+        return Response(summary)
+
     @extend_schema(
         summary="Qurilma holatini o'zgartirish",
-        description="Qurilma holatini o'zgartirish va tarixda saqlash",
+        description="Qurilma holatini o'zgartirish va tarixda saqlash. "
+                    "version (qurilma versiyasi) berilsa va oradan qurilma o'zgargan bo'lsa 409 qaytadi",
         tags=['Devices'],
         request=DeviceChangeConditionSerializer,
-        responses={200: DeviceConditionHistorySerializer}
+        responses={200: DeviceConditionHistorySerializer, 409: OpenApiTypes.OBJECT}
     )
     @action(detail=True, methods=['post'])
     def change_condition(self, request, pk=None):
@@ -667,22 +779,16 @@ class DeviceViewSet(viewsets.ModelViewSet):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
         new_condition = serializer.validated_data['new_condition']
-        reason = serializer.validated_data.get('reason', '')
-
-        with transaction.atomic():
-            old = device.condition
-            if old == new_condition:
-                return Response({'detail': 'condition unchanged'}, status=status.HTTP_400_BAD_REQUEST)
-            device.condition = new_condition
-            device.save(update_fields=['condition', 'updated_at', 'updated_by'])
-            history = DeviceConditionHistory.objects.create(
-                device=device,
-                old_condition=old,
-                new_condition=new_condition,
-                changed_by=request.user if request.user.is_authenticated else None,
-                reason=reason,
-            )
-
+        if device.condition == new_condition:
+            return Response({'detail': 'condition unchanged'}, status=status.HTTP_400_BAD_REQUEST)
+
+        history = change_device_condition(
+            device,
+            new_condition,
+            reason=serializer.validated_data.get('reason', ''),
+            changed_by=request.user if request.user.is_authenticated else None,
+            expected_version=serializer.validated_data.get('version'),
+        )
         return Response(DeviceConditionHistorySerializer(history).data)
 
 
@@ -732,8 +838,9 @@ class DeviceViewSet(viewsets.ModelViewSet):
     ),
     destroy=extend_schema(tags=['Devices']),
 )
-class DeviceImageViewSet(viewsets.ModelViewSet):
+class DeviceImageViewSet(ConditionalGetMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = DeviceImage.objects.select_related('device').all()
+    last_modified_field = 'uploaded_at'
     serializer_class = DeviceImageSerializer
     permission_classes = [DefaultPermissions]
 
@@ -840,12 +947,13 @@ class DeviceImageViewSet(viewsets.ModelViewSet):
     partial_update=extend_schema(tags=['Device Locations']),
     destroy=extend_schema(tags=['Device Locations']),
 )
-class DeviceLocationViewSet(viewsets.ModelViewSet):
-    queryset = DeviceLocation.objects.select_related('device', 'room').all()
+class DeviceLocationViewSet(ConditionalGetMixin, FastListMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
+    # Model da Meta.ordering yo'q - sahifalash barqaror bo'lishi uchun
+    queryset = DeviceLocation.objects.select_related('device', 'room').order_by('id')
     serializer_class = DeviceLocationSerializer
     permission_classes = [DefaultPermissions]
 
-    parser_classes = [JSONParser, MultiPartParser, FormParser]
+    parser_classes = [FastJSONParser, MultiPartParser, FormParser]
 
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['room', 'responsible_person']
@@ -855,24 +963,30 @@ class DeviceLocationViewSet(viewsets.ModelViewSet):
     list=extend_schema(tags=['Device History']),
     retrieve=extend_schema(tags=['Device History']),
 )
-class DeviceLocationHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+class DeviceLocationHistoryViewSet(ConditionalGetMixin, FastListMixin, SparseFieldsetViewMixin,
+                                   viewsets.ReadOnlyModelViewSet):
     queryset = DeviceLocationHistory.objects.select_related('device', 'new_room', 'old_room').all()
+    last_modified_field = 'moved_at'
     serializer_class = DeviceLocationHistorySerializer
     permission_classes = [ReadOnlyPermissions]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['device', 'new_room', 'old_room']
+    cursor_ordering = ('-moved_at', 'id')
 
 
 @extend_schema_view(
     list=extend_schema(tags=['Device History']),
     retrieve=extend_schema(tags=['Device History']),
 )
-class DeviceConditionHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+class DeviceConditionHistoryViewSet(ConditionalGetMixin, FastListMixin, SparseFieldsetViewMixin,
+                                    viewsets.ReadOnlyModelViewSet):
     queryset = DeviceConditionHistory.objects.select_related('device').all()
+    last_modified_field = 'changed_at'
     serializer_class = DeviceConditionHistorySerializer
     permission_classes = [ReadOnlyPermissions]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['device', 'new_condition']
+    cursor_ordering = ('-changed_at', 'id')
 
 
 @extend_schema_view(
@@ -883,17 +997,25 @@ class DeviceConditionHistoryViewSet(viewsets.ReadOnlyModelViewSet):
     partial_update=extend_schema(tags=['Repairs'], request=RepairRequestSerializer),
     destroy=extend_schema(tags=['Repairs']),
 )
-class RepairRequestViewSet(viewsets.ModelViewSet):
-    queryset = RepairRequest.objects.select_related('device', 'requested_by', 'assigned_to').all()
+class RepairRequestViewSet(ConditionalGetMixin, FastListMixin, SparseFieldsetViewMixin, BulkModelMixin,
+                           viewsets.ModelViewSet):
+    queryset = RepairRequest.objects.select_related('device', 'requested_by', 'assigned_to').defer('search_vector')
     serializer_class = RepairRequestSerializer
     permission_classes = [DefaultPermissions]
 
-    parser_classes = [JSONParser, MultiPartParser, FormParser]
+    parser_classes = [FastJSONParser, MultiPartParser, FormParser]
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['device', 'priority', 'request_status', 'assigned_to']
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
+    # request_status__in=new,assigned,in_progress - ochiq so'rovlar (qisman indeks ishlatiladi)
+    filterset_fields = {
+        'device': ['exact'],
+        'priority': ['exact'],
+        'request_status': ['exact', 'in'],
+        'assigned_to': ['exact'],
+    }
     search_fields = ['problem_description', 'work_description']
     ordering_fields = ['created_at', 'priority']
+    cursor_ordering = ('-created_at', 'id')
 
 
 @extend_schema_view(
@@ -904,16 +1026,19 @@ class RepairRequestViewSet(viewsets.ModelViewSet):
     partial_update=extend_schema(tags=['Service Logs'], request=ServiceLogSerializer),
     destroy=extend_schema(tags=['Service Logs']),
 )
-class ServiceLogViewSet(viewsets.ModelViewSet):
+class ServiceLogViewSet(ConditionalGetMixin, FastListMixin, SparseFieldsetViewMixin, BulkModelMixin,
+                        viewsets.ModelViewSet):
     queryset = ServiceLog.objects.select_related('device', 'performed_by', 'repair_request').all()
     serializer_class = ServiceLogSerializer
     permission_classes = [DefaultPermissions]
 
-    parser_classes = [JSONParser, MultiPartParser, FormParser]
+    parser_classes = [FastJSONParser, MultiPartParser, FormParser]
 
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['device', 'service_type', 'service_date']
     ordering_fields = ['service_date', 'created_at']
+    # Model ordering i bilan bir xil - ?cursor= va ?page= rejimlarida tartib bir xil
+    cursor_ordering = ('-service_date', 'id')
 
 
 # Health check endpoint
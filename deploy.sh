@@ -112,6 +112,7 @@ sleep 30
 # Run database migrations
 echo "🗄️ Running database migrations..."
 docker-compose -f docker-compose.prod.yml exec -T web python manage.py migrate
+docker-compose -f docker-compose.prod.yml exec -T web python manage.py createcachetable
 
 # Create superuser if not exists
 echo "👤 Creating superuser..."
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # Third-party
     'rest_framework',
     'drf_spectacular',
@@ -140,6 +141,18 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # ... existing code until REST_FRAMEWORK ...
 
 # DRF / Spectacular / Filters
+# ?page_size= bilan so'ralishi mumkin bo'lgan eng katta sahifa hajmi
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '100'))
+# Bitta bulk so'rovdagi (masalan, bir nechta qurilmani ko'chirish) eng ko'p element
+API_BULK_MAX_ITEMS = int(os.getenv('API_BULK_MAX_ITEMS', '1000'))
+# /bulk/ endpoint lari: bitta INSERT / UPDATE dagi qatorlar soni
+API_BULK_BATCH_SIZE = int(os.getenv('API_BULK_BATCH_SIZE', '500'))
+# Eksport: server-side cursor dan bir martada o'qiladigan qatorlar soni
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+# Qurilmalar importi: bitta so'rovdagi eng ko'p qator va bulk_create INSERT hajmi
+DEVICE_IMPORT_MAX_ROWS = int(os.getenv('DEVICE_IMPORT_MAX_ROWS', '10000'))
+DEVICE_IMPORT_BATCH_SIZE = int(os.getenv('DEVICE_IMPORT_BATCH_SIZE', '1000'))
+
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_FILTER_BACKENDS': [
@@ -147,7 +160,17 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
         'rest_framework.filters.SearchFilter',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # orjson o'rnatilgan bo'lsa tezkor JSON, aks holda DRF ning standart JSON renderer/parser i
+    'DEFAULT_RENDERER_CLASSES': [
+        'app_rttm.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'app_rttm.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'app_rttm.pagination.HybridPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_AUTHENTICATION_CLASSES': [],
     'DEFAULT_PERMISSION_CLASSES': [],
@@ -189,14 +212,88 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Auth settings
 AUTH_BASE_URL = os.getenv('AUTH_BASE_URL', 'https://auth.uzswlu.uz')
 AUTH_TIMEOUT = int(os.getenv('AUTH_TIMEOUT', '10'))
+# AUTH_TIMEOUT ni connect/read ga ajratish (soniya)
+AUTH_CONNECT_TIMEOUT = float(os.getenv('AUTH_CONNECT_TIMEOUT', '3'))
+AUTH_READ_TIMEOUT = float(os.getenv('AUTH_READ_TIMEOUT', str(AUTH_TIMEOUT)))
+# Auth API uchun keep-alive connection pool: host lar soni va har bir host uchun connection lar
+AUTH_POOL_CONNECTIONS = int(os.getenv('AUTH_POOL_CONNECTIONS', '4'))
+AUTH_POOL_MAXSIZE = int(os.getenv('AUTH_POOL_MAXSIZE', '10'))
 AUTH_CACHE_TIMEOUT = int(os.getenv('AUTH_CACHE_TIMEOUT', '300'))  # 5 minut
+# Soft TTL: shundan keyin cache dagi role darhol qaytariladi va fonda yangilanadi.
+# AUTH_CACHE_TIMEOUT (hard TTL) tugagandagina so'rov auth API javobini kutadi
+AUTH_CACHE_SOFT_TIMEOUT = int(os.getenv('AUTH_CACHE_SOFT_TIMEOUT', str(int(AUTH_CACHE_TIMEOUT * 0.8))))
+AUTH_REFRESH_WORKERS = int(os.getenv('AUTH_REFRESH_WORKERS', '2'))
+# Rad etilgan (401) token lar qancha vaqt auth API ga qayta yuborilmaydi (soniya)
+AUTH_NEGATIVE_CACHE_TIMEOUT = int(os.getenv('AUTH_NEGATIVE_CACHE_TIMEOUT', '30'))
+AUTH_REJECTED_TOKENS_SIZE = int(os.getenv('AUTH_REJECTED_TOKENS_SIZE', '4096'))
+# JWT larni lokal tekshirish (PyJWT kerak). Role/userId/username claim lari bo'lmasa
+# /api/auth/my-role ga murojaat qilinadi
+AUTH_JWT_VERIFY = bool(int(os.getenv('AUTH_JWT_VERIFY', '0')))
+AUTH_JWKS_URL = os.getenv('AUTH_JWKS_URL', f'{AUTH_BASE_URL}/.well-known/jwks.json')
+AUTH_JWKS_CACHE_TIMEOUT = int(os.getenv('AUTH_JWKS_CACHE_TIMEOUT', '3600'))
+AUTH_JWT_ALGORITHMS = os.getenv('AUTH_JWT_ALGORITHMS', 'RS256').split(',')
+AUTH_JWT_ISSUER = os.getenv('AUTH_JWT_ISSUER') or None
+AUTH_JWT_AUDIENCE = os.getenv('AUTH_JWT_AUDIENCE') or None
+AUTH_JWT_LEEWAY = int(os.getenv('AUTH_JWT_LEEWAY', '30'))
+# Bitta so'rovda auth ga sarflanadigan umumiy vaqt (barcha retry lar bilan), nginx
+# proxy_read_timeout (30s) dan ancha kichik bo'lishi kerak
+AUTH_DEADLINE = float(os.getenv('AUTH_DEADLINE', '5'))
+AUTH_RETRY_BACKOFF = float(os.getenv('AUTH_RETRY_BACKOFF', '0.1'))
+# Circuit breaker: AUTH_CIRCUIT_FAILURE_WINDOW ichida shuncha xatolikdan keyin
+# AUTH_CIRCUIT_RECOVERY_TIMEOUT soniya auth API ga so'rov yuborilmaydi
+AUTH_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('AUTH_CIRCUIT_FAILURE_THRESHOLD', '5'))
+AUTH_CIRCUIT_FAILURE_WINDOW = int(os.getenv('AUTH_CIRCUIT_FAILURE_WINDOW', '60'))
+AUTH_CIRCUIT_RECOVERY_TIMEOUT = int(os.getenv('AUTH_CIRCUIT_RECOVERY_TIMEOUT', '30'))
+# Auth API ishlamayotganda hard TTL o'tgan natija yana shuncha vaqt ishlatilishi mumkin
+AUTH_CACHE_STALE_IF_ERROR = int(os.getenv('AUTH_CACHE_STALE_IF_ERROR', '300'))
+# get_user_info: /api/auth/me javobi AUTH_HEDGE_DELAY soniyada kelmasa /api/auth/my-role ham
+# parallel so'raladi va birinchi yaroqli javob olinadi (0 - ikkalasi darhol)
+AUTH_HEDGE_ENABLED = bool(int(os.getenv('AUTH_HEDGE_ENABLED', '0')))
+AUTH_HEDGE_DELAY = float(os.getenv('AUTH_HEDGE_DELAY', '0.3'))
+AUTH_HEDGE_WORKERS = int(os.getenv('AUTH_HEDGE_WORKERS', '4'))
+# Bir token uchun parallel so'rovlar bitta upstream chaqiruvni kutadigan maksimal vaqt (soniya)
+AUTH_SINGLE_FLIGHT_WAIT = float(os.getenv('AUTH_SINGLE_FLIGHT_WAIT', str(AUTH_DEADLINE)))
+
+# Auth natijalari uchun ikki darajali cache:
+# L1 - har bir worker ichidagi kichik LRU, L2 - barcha worker lar uchun umumiy 'auth' cache.
+# L2 backend: DatabaseCache (default, jadvallar: python manage.py createcachetable).
+# Worker lar orasidagi fetch lock va circuit breaker ning yagona half_open sinovi cache.add() ga tayanadi:
+# DatabaseCache da add() unique kalitli INSERT - atomar. FileBasedCache (bitta process li dev uchun)
+# da add() atomar emas va har set() da katalog skanerlanadi - u holda bu kafolatlar yo'q (best-effort).
+# incr() ikkala backend da ham atomar emas - circuit breaker xatolar soni taxminiy
+AUTH_CACHE_ALIAS = 'auth'
+AUTH_LOCAL_CACHE_SIZE = int(os.getenv('AUTH_LOCAL_CACHE_SIZE', '1024'))
+AUTH_LOCAL_CACHE_TIMEOUT = int(os.getenv('AUTH_LOCAL_CACHE_TIMEOUT', '30'))
+
+# Ma'lumotnoma endpoint lari (bino, xona, kategoriya, qurilma turi) javoblari uchun cache.
+# Barcha worker lar uchun umumiy bo'lishi kerak - aks holda boshqa worker dagi yozish
+# faqat RESPONSE_CACHE_TIMEOUT o'tgach ko'rinadi
+RESPONSE_CACHE_ENABLED = bool(int(os.getenv('RESPONSE_CACHE_ENABLED', '1')))
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', '300'))
 
 # Cache settings for auth
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'unique-snowflake',
-    }
+    },
+    'auth': {
+        'BACKEND': os.getenv('AUTH_SHARED_CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.getenv('AUTH_SHARED_CACHE_LOCATION', 'auth_cache'),
+        'TIMEOUT': AUTH_CACHE_TIMEOUT,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('AUTH_SHARED_CACHE_MAX_ENTRIES', '10000')),
+        },
+    },
+    'responses': {
+        'BACKEND': os.getenv('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.getenv('RESPONSE_CACHE_LOCATION', 'response_cache'),
+        'TIMEOUT': RESPONSE_CACHE_TIMEOUT,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '5000')),
+        },
+    },
 }
 
 CSRF_TRUSTED_ORIGINS = os.getenv('CSRF_TRUSTED_ORIGINS', 'https://front.uzswlu.uz,https://building.api.uzswlu.uz,https://api.uzswlu.uz,https://uzswlu.uz,http://localhost:3003').split(',')
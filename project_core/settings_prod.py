@@ -107,7 +107,10 @@ CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'unique-snowflake',
-    }
+    },
+    # Auth natijalari barcha gunicorn worker lar uchun umumiy
+    'auth': CACHES['auth'],
+    'responses': CACHES['responses'],
 }
 
 # Email settings (configure for production)
@@ -122,10 +125,10 @@ DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@yourdomain.com')
 # DRF settings for production
 REST_FRAMEWORK.update({
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'app_rttm.renderers.FastJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'app_rttm.parsers.FastJSONParser',
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.FormParser',
     ],